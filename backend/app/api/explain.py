@@ -1,15 +1,23 @@
 # app/api/explain.py
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException, Depends, Path
+from fastapi import APIRouter, HTTPException, Depends, Path, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import httpx
 import os
 import json
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.services.providers.spotify_auth import get_app_token
+from app.settings import settings
+from app.services.catalog import track_metadata
+from app.services.payload import compact_explain_raw, parse_fields, select_fields
+from app.services.providers import http
+from app.services.resilience import CircuitOpen
 from app.services.search import search_artist_news
+from app.services.telemetry import stage
+from app.services.metrics import record_llm
 from app.services.db import get_db
 from app.models.playlist import Playlist, PlaylistTrack
 
@@ -29,28 +37,6 @@ class PlaylistExplanationOut(BaseModel):
     playlist_id: str
     explanation: dict
 
-SPOTIFY_BASE = "https://api.spotify.com/v1"
-
-async def _fetch_spotify_track(track_id: str, token: str) -> dict:
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.get(f"{SPOTIFY_BASE}/tracks/{track_id}", headers={"Authorization": f"Bearer {token}"})
-        r.raise_for_status()
-        return r.json()
-
-async def _fetch_spotify_artist(artist_id: str, token: str) -> dict | None:
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.get(f"{SPOTIFY_BASE}/artists/{artist_id}", headers={"Authorization": f"Bearer {token}"})
-        if r.status_code != 200:
-            return None
-        return r.json()
-
-async def _fetch_spotify_features(track_id: str, token: str) -> dict | None:
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.get(f"{SPOTIFY_BASE}/audio-features/{track_id}", headers={"Authorization": f"Bearer {token}"})
-        if r.status_code != 200:
-            return None
-        return r.json()
-
 def _build_prompt(track: dict, artist: dict | None, features: dict | None, lyrics: str | None, news: list[str] | None) -> str:
     title = track.get("name")
     artist_name = ", ".join(a.get("name", "") for a in track.get("artists", [])) or (artist or {}).get("name", "")
@@ -143,10 +129,13 @@ async def _call_llm(prompt: str) -> dict:
             "artist_context": "Artist is popular and active."
         }
 
-    # call OpenAI
-    async with httpx.AsyncClient(timeout=30) as c:
-        r = await c.post(
-            "https://api.openai.com/v1/chat/completions",
+    # call OpenAI; an open circuit (or a transport error) takes the same
+    # fail-soft path as a bad status instead of surfacing a 500
+    t0 = time.perf_counter()
+    try:
+        r = await http.post(
+            "openai",
+            f"{settings.OPENAI_BASE_URL}/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
@@ -160,7 +149,9 @@ async def _call_llm(prompt: str) -> dict:
                 "response_format": {"type": "json_object"},
             },
         )
-    if r.status_code != 200:
+    except (CircuitOpen, httpx.HTTPError):
+        r = None
+    if r is None or r.status_code != 200:
         # fail soft
         return {
             "summary": "Could not fetch a rich explanation right now.",
@@ -173,6 +164,7 @@ async def _call_llm(prompt: str) -> dict:
         }
 
     data = r.json()
+    record_llm("explain", model, time.perf_counter() - t0, data.get("usage"))
     content = data["choices"][0]["message"]["content"]
     try:
         return json.loads(content)
@@ -188,38 +180,49 @@ async def _call_llm(prompt: str) -> dict:
         }
 
 @router.post("/explain/track", response_model=ExplainTrackOut)
-async def explain_track(payload: ExplainTrackIn):
+async def explain_track(
+    payload: ExplainTrackIn,
+    compact: bool = Query(False, description="Only headline features / artist / track fields in `raw`"),
+    fields: str | None = Query(None, description="Comma-separated response fields to keep, dotted for nested"),
+    db: AsyncSession = Depends(get_db),
+):
     if payload.provider != "spotify":
         raise HTTPException(status_code=400, detail="Only spotify supported right now")
 
     sp_id = payload.track_id.split(":")[-1]
 
-    token = await get_app_token()
+    # local catalog first; Spotify only for what we don't have yet
+    with stage("explain.metadata"):
+        meta = await track_metadata(db, sp_id)
+    track, artist, features = meta["track"], meta["artist"], meta["features"]
+    if track is None:
+        raise HTTPException(status_code=404, detail="Track not found")
 
-    track = await _fetch_spotify_track(sp_id, token)
-    artist_id = track.get("artists", [{}])[0].get("id")
-    artist = await _fetch_spotify_artist(artist_id, token) if artist_id else None
-    features = await _fetch_spotify_features(sp_id, token)
-    
     # Fetch news
     artist_name = (artist or {}).get("name")
     news = []
     if artist_name:
-        news = await search_artist_news(artist_name)
+        news = await search_artist_news(artist_name)  # own tavily.search span
 
     prompt = _build_prompt(track, artist, features, payload.lyrics, news)
-    llm_resp = await _call_llm(prompt)
+    with stage("explain.llm"):
+        llm_resp = await _call_llm(prompt)
 
-    return ExplainTrackOut(
-        track_id=payload.track_id,
-        explanation=llm_resp,
-        raw={
+    if compact:
+        raw = compact_explain_raw(track, artist, features)
+    else:
+        raw = {
             "track": track,
             "audio_features": features or {},
             "artist": artist or {},
             "news": news
-        },
-    )
+        }
+    out = ExplainTrackOut(track_id=payload.track_id, explanation=llm_resp, raw=raw)
+
+    paths = parse_fields(fields)
+    if paths:
+        return ORJSONResponse(select_fields(out.model_dump(), paths))
+    return out
 
 @router.post("/explain/playlist/{playlist_id}", response_model=PlaylistExplanationOut)
 async def explain_playlist(
@@ -3,14 +3,21 @@ from __future__ import annotations
 
 from typing import List, Optional, Any
 from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
-import ast
 import logging
+import numpy as np
 
+from app.settings import settings
 from app.services.db import get_db
-from app.repositories.sessions import get_session
+from app.services.session_cache import load_session
+from app.services.payload import compact_card, parse_fields, select_fields
+from app.services.telemetry import stage
+from app.services.metrics import FEED_SOURCE
+from app.services.recsys.diversify import mmr_select, session_lambda
+from app.services.recsys.seen_filter import seen_track_ids, backfill_seen, mark_seen
+from app.services.recsys.retrieval import get_candidates, seed_feature_ranges
 
 # our Spotify helpers
 from app.services.providers.spotify_simple import (
@@ -19,6 +26,7 @@ from app.services.providers.spotify_simple import (
     recommend_tracks,
 )
 from app.services.providers.spotify_features import get_audio_features
+from app.services.providers.spotify_batch import get_artists
 from app.services.providers.spotify_auth import get_app_token
 
 # playlist helpers (the ones we added)
@@ -44,210 +52,344 @@ class FeedCard(BaseModel):
     meta: Optional[dict] = None
 
 
-def _coerce_seed(value) -> dict:
-    """Accept dict or stringified dict and return dict."""
-    if isinstance(value, dict):
-        return value
-    if isinstance(value, str):
-        # try JSON first
-        try:
-            return json.loads(value)
-        except Exception:
-            # then try python literal
-            try:
-                v = ast.literal_eval(value)
-                return v if isinstance(v, dict) else {}
-            except Exception:
-                return {}
-    return {}
+# audio features the diversification stage compares tracks on
+MMR_FEATURE_KEYS = ("energy", "valence", "danceability", "acousticness", "instrumentalness", "tempo")
+
+
+def _feature_matrix(tracks: List[dict], feats_by_id: dict[str, dict]) -> np.ndarray:
+    rows = np.zeros((len(tracks), len(MMR_FEATURE_KEYS)), dtype=float)
+    for i, t in enumerate(tracks):
+        f = feats_by_id.get(t.get("id")) or {}
+        for j, key in enumerate(MMR_FEATURE_KEYS):
+            v = f.get(key)
+            if isinstance(v, (int, float)):
+                rows[i, j] = v
+    return rows
+
+
+def _primary_artist_id(t: dict) -> Optional[str]:
+    raw = t.get("artists_raw") or []
+    if isinstance(raw, list) and raw and isinstance(raw[0], dict):
+        return raw[0].get("id")
+    return None
 
 
+def _primary_artist(t: dict) -> Optional[str]:
+    raw = t.get("artists_raw") or t.get("artists") or []
+    if isinstance(raw, list) and raw and isinstance(raw[0], dict):
+        return raw[0].get("id") or raw[0].get("name")
+    return (t.get("artist") or "").split(",")[0].strip() or None
+
+
+async def _catalog_candidates(db: AsyncSession, seed: dict, user_id: str, session_id: str,
+                              limit: int) -> List[dict]:
+    """Spotify-shaped track dicts from the tracks table, narrowed by the seed's bpm/energy."""
+    ranges = seed_feature_ranges(seed)
+    cands = await get_candidates(db, user_id, session_id, limit=limit, ranges=ranges)
+    if not cands and ranges:
+        cands = await get_candidates(db, user_id, session_id, limit=limit)
+    out: List[dict] = []
+    for c in cands:
+        if c.provider != "spotify":
+            continue
+        meta = c.features_json if isinstance(c.features_json, dict) else {}
+        out.append({
+            "id": c.id,
+            "provider_track_uri": c.provider_track_id,
+            "title": c.title,
+            "artist": c.artist,
+            "artwork_url": c.artwork_url,
+            "duration_ms": c.duration_ms,
+            "popularity": meta.get("popularity"),
+            "album": c.album,
+            "catalog_features": meta or None,
+        })
+    return out
+
+
+def build_card(t: dict, reason: str, f: Optional[dict]) -> dict:
+    """A FeedCard-shaped dict for one normalized track (f = its audio features, if any)."""
+    base = to_feed_card(t, reason)
+
+    # attach features
+    features = None
+    if f:
+        features = {
+            "energy": f.get("energy"),
+            "valence": f.get("valence"),
+            "tempo": f.get("tempo"),
+            "instrumentalness": f.get("instrumentalness"),
+        }
+
+    # robust artist extraction
+    artist_name = base.get("artist")
+    artist_id = None
+
+    raw_artists: Any = (
+        t.get("artists_raw")
+        or t.get("artists")
+        or []
+    )
+
+    # normalize to a list
+    if isinstance(raw_artists, (dict, str)):
+        raw_artists = [raw_artists]
+
+    if isinstance(raw_artists, list) and raw_artists:
+        first = raw_artists[0]
+        if isinstance(first, dict):
+            artist_id = first.get("id")
+            artist_name = first.get("name") or artist_name
+        elif isinstance(first, str):
+            artist_name = first or artist_name
+
+    # discovery score
+    pop = t.get("popularity")
+    try:
+        pop_int = int(pop) if pop is not None else 50
+    except Exception:
+        pop_int = 50
+    discovery = max(0, 100 - pop_int)
+
+    base["meta"] = {
+        "features": features,
+        "discovery_score": discovery,
+        "artist": {
+            "id": artist_id,
+            "name": artist_name,
+            "genres": t.get("artist_genres") or [],
+            "popularity": pop_int,
+        },
+    }
+    return base
+
+
+# response_model documents the shape; the handler returns an ORJSONResponse itself
 @router.get("/feed", response_model=List[FeedCard])
 async def get_feed(
     session_id: str = Query(...),
     user_id: str = Query(...),
     cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=50),
+    compact: bool = Query(False, description="Trim card meta to what the app renders"),
+    fields: Optional[str] = Query(None, description="Comma-separated card fields to keep, dotted for nested (meta.features)"),
     db: AsyncSession = Depends(get_db),
 ):
     # -------------------------------------------------
     # 1) load session and natural-language seed
     # -------------------------------------------------
-    s = await get_session(db, session_id)
+    # cached (LRU -> Redis -> Postgres); sessions never change after creation
+    with stage("feed.session"):
+        s = await load_session(db, session_id)
     if not s:
       raise HTTPException(status_code=404, detail="Session not found")
 
-    seed = _coerce_seed(getattr(s, "seed_json", {}))
+    seed = s["seed"]
     query = (seed.get("query") or "").strip()
     if not query:
       raise HTTPException(status_code=400, detail="Session is missing a query")
 
-    cards: List[FeedCard] = []
+    cards: List[dict] = []
     reason: str = ""
     candidate_tracks: List[dict] = []
+    source = "empty"  # which branch filled candidate_tracks (sampler_feed_source_total)
 
     # -------------------------------------------------
     # 2) playlist-first, but NEVER crash if Spotify returns odd data
     # -------------------------------------------------
     got_from_playlists = False
-    try:
-        playlists = await search_playlists(query, limit=10)
-        if playlists:
-            # how many playlists to sample from
-            max_playlists = max(1, min(len(playlists), max(1, limit // 4)))
-            target_total_samples = limit * 2  # we'll dedupe later
-            sampled_tracks: List[dict] = []
-
-            for idx, pl in enumerate(playlists[:max_playlists]):
-                pl_id = pl.get("id")
-                if not pl_id:
-                    continue
-
-                remaining_playlists = max_playlists - idx
-                remaining_budget = max(0, target_total_samples - len(sampled_tracks))
-                per_playlist = max(1, remaining_budget // max(1, remaining_playlists))
-
-                try:
-                    trks = await get_playlist_tracks(pl_id, limit=per_playlist)
-                except Exception as e:
-                    logger.warning("playlist tracks failed for %s: %s", pl_id, e)
-                    continue
-
-                if not trks:
-                    continue
-
-                for t in trks:
-                    # mark where it came from
-                    t["_src_playlist"] = pl.get("name")
-                    sampled_tracks.append(t)
-
-            if sampled_tracks:
-                candidate_tracks = sampled_tracks
-                got_from_playlists = True
-                if max_playlists > 1:
-                    reason = f"From playlists matching “{query}”"
-                else:
-                    reason = f"From playlist “{sampled_tracks[0].get('_src_playlist') or query}”"
-    except Exception as e:
-        # playlist branch failed → we’ll just fall through to recs/search
-        logger.warning("playlist-first branch failed: %s", e)
+    with stage("feed.playlists"):
+        try:
+            playlists = await search_playlists(query, limit=10)
+            if playlists:
+                # how many playlists to sample from
+                max_playlists = max(1, min(len(playlists), max(1, limit // 4)))
+                target_total_samples = limit * 2  # we'll dedupe later
+                sampled_tracks: List[dict] = []
+
+                for idx, pl in enumerate(playlists[:max_playlists]):
+                    pl_id = pl.get("id")
+                    if not pl_id:
+                        continue
+
+                    remaining_playlists = max_playlists - idx
+                    remaining_budget = max(0, target_total_samples - len(sampled_tracks))
+                    per_playlist = max(1, remaining_budget // max(1, remaining_playlists))
+
+                    try:
+                        trks = await get_playlist_tracks(pl_id, limit=per_playlist)
+                    except Exception as e:
+                        logger.warning("playlist tracks failed for %s: %s", pl_id, e)
+                        continue
+
+                    if not trks:
+                        continue
+
+                    for t in trks:
+                        # mark where it came from
+                        t["_src_playlist"] = pl.get("name")
+                        sampled_tracks.append(t)
+
+                if sampled_tracks:
+                    candidate_tracks = sampled_tracks
+                    got_from_playlists = True
+                    source = "playlist"
+                    if max_playlists > 1:
+                        reason = f"From playlists matching “{query}”"
+                    else:
+                        reason = f"From playlist “{sampled_tracks[0].get('_src_playlist') or query}”"
+        except Exception as e:
+            # playlist branch failed → we’ll just fall through to recs/search
+            logger.warning("playlist-first branch failed: %s", e)
 
     # -------------------------------------------------
     # 3) if no playlist tracks, try recommendations (LLM-ish seed → recs)
     # -------------------------------------------------
     if not candidate_tracks:
-        try:
-            recs = await recommend_tracks(seed, limit=limit)
-            if recs:
-                candidate_tracks = recs
-                reason = f"Because you asked for “{query}”"
-        except Exception as e:
-            logger.warning("recommend_tracks failed: %s", e)
+        with stage("feed.recs"):
+            try:
+                recs = await recommend_tracks(seed, limit=limit)
+                if recs:
+                    candidate_tracks = recs
+                    source = "recs"
+                    reason = f"Because you asked for “{query}”"
+            except Exception as e:
+                logger.warning("recommend_tracks failed: %s", e)
 
     # -------------------------------------------------
     # 4) if still nothing, do plain search
     # -------------------------------------------------
     if not candidate_tracks:
-        try:
-            sr = await search_tracks(query, limit=limit)
-            candidate_tracks = sr or []
-            reason = f"Search results for “{query}”"
-        except Exception as e:
-            logger.error("search_tracks failed completely: %s", e)
-            # at this point, just return empty – 200 OK
-            return []
+        with stage("feed.search"):
+            try:
+                sr = await search_tracks(query, limit=limit)
+                candidate_tracks = sr or []
+                source = "search"
+                reason = f"Search results for “{query}”"
+            except Exception as e:
+                logger.error("search_tracks failed completely: %s", e)
+
+    # -------------------------------------------------
+    # 4a) Spotify down (circuit open / errors): serve from the local catalog
+    # -------------------------------------------------
+    if not candidate_tracks:
+        with stage("feed.catalog_fallback"):
+            try:
+                candidate_tracks = await _catalog_candidates(db, seed, user_id, session_id, limit * 2)
+                source = "catalog"
+                reason = f"From our catalog for “{query}”"
+            except Exception as e:
+                logger.error("catalog fallback failed: %s", e)
 
     if not candidate_tracks:
+        # at this point, just return empty – 200 OK
+        FEED_SOURCE.labels(source="empty").inc()
         return []
+    FEED_SOURCE.labels(source=source).inc()
 
     # -------------------------------------------------
-    # 5) try to get audio features in bulk; don't fail feed if it errors
+    # 4b) drop tracks this user was already served in earlier sessions,
+    #     before we spend audio-feature lookups and card building on them
     # -------------------------------------------------
-    feats_by_id: dict[str, dict] = {}
-    try:
-        app_token = await get_app_token()
-    except Exception:
-        app_token = None
-
-    if app_token:
+    with stage("feed.seen_filter"):
         try:
-            ids_for_feats = [t.get("id") for t in candidate_tracks if t.get("id")]
-            if ids_for_feats:
-                feats_by_id = await get_audio_features(ids_for_feats, app_token)
+            cand_ids = [t.get("id") for t in candidate_tracks if t.get("id")]
+            seen, warm = await seen_track_ids(user_id, cand_ids)
+            if not warm:
+                seen = (await backfill_seen(db, user_id)).intersection(cand_ids)
+            if seen:
+                fresh = [t for t in candidate_tracks if t.get("id") not in seen]
+                # everything already seen → a repeat beats an empty feed
+                if fresh:
+                    candidate_tracks = fresh
         except Exception as e:
-            logger.warning("audio-features failed: %s", e)
-            feats_by_id = {}
+            logger.warning("seen filter unavailable: %s", e)
 
     # -------------------------------------------------
-    # 6) build response cards, dedupe, defensive artist parsing
+    # 5) try to get audio features in bulk; don't fail feed if it errors
     # -------------------------------------------------
-    seen_ids: set[str] = set()
-    for t in candidate_tracks:
-        tid = t.get("id")
-        if not tid:
-            continue
-        if tid in seen_ids:
-            continue
-        seen_ids.add(tid)
-
-        base = to_feed_card(t, reason)
-
-        # attach features
-        f = feats_by_id.get(tid)
-        features = None
-        if f:
-            features = {
-                "energy": f.get("energy"),
-                "valence": f.get("valence"),
-                "tempo": f.get("tempo"),
-                "instrumentalness": f.get("instrumentalness"),
-            }
-
-        # robust artist extraction
-        artist_name = base.get("artist")
-        artist_id = None
-
-        raw_artists: Any = (
-            t.get("artists_raw")
-            or t.get("artists")
-            or []
-        )
-
-        # normalize to a list
-        if isinstance(raw_artists, (dict, str)):
-            raw_artists = [raw_artists]
-
-        if isinstance(raw_artists, list) and raw_artists:
-            first = raw_artists[0]
-            if isinstance(first, dict):
-                artist_id = first.get("id")
-                artist_name = first.get("name") or artist_name
-            elif isinstance(first, str):
-                artist_name = first or artist_name
-
-        # discovery score
-        pop = t.get("popularity")
+    with stage("feed.features"):
+        feats_by_id: dict[str, dict] = {}
         try:
-            pop_int = int(pop) if pop is not None else 50
+            app_token = await get_app_token()
         except Exception:
-            pop_int = 50
-        discovery = max(0, 100 - pop_int)
-
-        meta = {
-            "features": features,
-            "discovery_score": discovery,
-            "artist": {
-                "id": artist_id,
-                "name": artist_name,
-                "genres": t.get("artist_genres") or [],
-                "popularity": pop_int,
-            },
-        }
+            app_token = None
 
-        base["meta"] = meta
-        cards.append(FeedCard(**base))
+        if app_token:
+            try:
+                ids_for_feats = [t.get("id") for t in candidate_tracks if t.get("id") and not t.get("catalog_features")]
+                if ids_for_feats:
+                    feats_by_id = await get_audio_features(ids_for_feats, app_token)
+            except Exception as e:
+                logger.warning("audio-features failed: %s", e)
+                feats_by_id = {}
+        for t in candidate_tracks:
+            if t.get("catalog_features"):
+                feats_by_id.setdefault(t["id"], t["catalog_features"])
 
-        if len(cards) >= limit:
-            break
+    # -------------------------------------------------
+    # 6) dedupe, then diversify: MMR trades upstream rank against
+    #    similarity in audio-feature space and shared artist/album
+    # -------------------------------------------------
+    with stage("feed.diversify"):
+        unique_tracks: List[dict] = []
+        seen_ids: set[str] = set()
+        for t in candidate_tracks:
+            tid = t.get("id")
+            if not tid or tid in seen_ids:
+                continue
+            seen_ids.add(tid)
+            unique_tracks.append(t)
+
+        if len(unique_tracks) > 1:
+            try:
+                order = mmr_select(
+                    relevance=np.linspace(1.0, 0.0, len(unique_tracks)),
+                    features=_feature_matrix(unique_tracks, feats_by_id),
+                    k=limit,
+                    lam=session_lambda(seed, settings.FEED_DIVERSITY_LAMBDA),
+                    artists=[_primary_artist(t) for t in unique_tracks],
+                    albums=[t.get("album") for t in unique_tracks],
+                )
+                unique_tracks = [unique_tracks[i] for i in order]
+            except Exception as e:
+                logger.warning("diversification failed, keeping upstream order: %s", e)
+
+    # -------------------------------------------------
+    # 6b) artist genres for the page: one /artists?ids= call per 50 artists
+    # -------------------------------------------------
+    page = unique_tracks[:limit]
+    with stage("feed.artists"):
+        if app_token and page:
+            try:
+                artist_ids = [a for a in (_primary_artist_id(t) for t in page) if a]
+                artists_by_id = await get_artists(artist_ids, app_token)
+                for t in page:
+                    ar = artists_by_id.get(_primary_artist_id(t) or "")
+                    if ar:
+                        t["artist_genres"] = ar.get("genres") or []
+            except Exception as e:
+                logger.warning("artist genres failed: %s", e)
+
+    # -------------------------------------------------
+    # 7) build response cards, defensive artist parsing
+    # -------------------------------------------------
+    # cards are plain dicts shaped like FeedCard and go straight to ORJSONResponse:
+    # no per-card model construction, no second pass through response_model
+    # (tests/test_feed_cards.py keeps them valid against FeedCard)
+    with stage("feed.cards", cards=len(page)):
+        for t in page:
+            cards.append(build_card(t, reason, feats_by_id.get(t["id"])))
 
-    return cards
+    try:
+        await mark_seen(user_id, [c["track_id"] for c in cards])
+    except Exception as e:
+        logger.warning("mark_seen failed: %s", e)
+
+    out = cards
+    if compact:
+        out = [compact_card(c) for c in out]
+    paths = parse_fields(fields)
+    if paths:
+        out = [select_fields(c, paths) for c in out]
+    return ORJSONResponse(out)
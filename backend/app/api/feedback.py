@@ -1,6 +1,6 @@
 # app/api/feedback.py
 from __future__ import annotations
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 import logging
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
@@ -8,20 +8,28 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.db import get_db
 
-# record_event may enforce enums/constraints in your DB; keep calls guarded
+# record_events may enforce enums/constraints in your DB; keep calls guarded
 try:
-    from app.repositories.events import record_event
+    from app.repositories.events import record_events
+    from app.services.event_sink import event_row, get_event_sink, write_isolating_bad_rows
     have_events_repo = True
 except Exception:
     have_events_repo = False
 
 # bandit is optional during bring-up
 try:
-    from app.services.recsys.bandit_state import nudge
+    from app.services.recsys.bandit_state import nudge, nudge_many
     have_bandit = True
 except Exception:
     have_bandit = False
 
+# cross-session "already seen" filter for /feed
+try:
+    from app.services.recsys.seen_filter import mark_seen, mark_seen_many
+    have_seen_filter = True
+except Exception:
+    have_seen_filter = False
+
 log = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -38,35 +46,112 @@ class FeedbackIn(BaseModel):
 class FeedbackOut(BaseModel):
     ok: bool
 
+class FeedbackBatchIn(BaseModel):
+    events: List[FeedbackIn]
+
+class FeedbackBatchOut(BaseModel):
+    ok: bool
+    accepted: int
+
+
+def _safe_event(event: str) -> str:
+    # If your DB has a strict enum for event_type (e.g. only like/skip),
+    # map non-core events to a safe label to avoid integrity errors.
+    return event if event in ("like", "skip") else "view"
+
+
+def _bandit_event(event: str) -> Optional[str]:
+    # the bandit only understands like/skip
+    if event == "like":
+        return "like"
+    if event in ("skip", "dislike"):
+        return "skip"
+    return None
+
+
+def _row(ev: FeedbackIn) -> dict:
+    return event_row(
+        user_id=ev.user_id,
+        session_id=ev.session_id,
+        track_id=ev.track_id,
+        event_type=_safe_event(ev.event),
+        dwell_ms=ev.dwell_ms,
+        position=ev.position,
+    )
+
+
+async def _store_events(db: AsyncSession, rows: List[dict]) -> int:
+    """
+    Hand rows to the write-behind sink; whatever it can't take (sink off, queue
+    full) is written directly in one multi-row INSERT, bisected on constraint
+    violations like the sink does. Returns how many rows were queued or written.
+    """
+    queued = 0
+    sink = get_event_sink()
+    if sink is not None:
+        queued = await sink.put_many(rows)
+        rows = rows[queued:]
+        if not rows:
+            return queued
+    return queued + await write_isolating_bad_rows(lambda batch: record_events(db, batch), rows)
+
+
 @router.post("/feedback", response_model=FeedbackOut)
 async def post_feedback(payload: FeedbackIn, db: AsyncSession = Depends(get_db)):
     # Try to write to events table; never fail the request
     if have_events_repo:
         try:
-            # If your DB has a strict enum for event_type (e.g. only like/skip),
-            # map non-core events to a safe label to avoid integrity errors.
-            db_event = payload.event
-            safe_event = db_event if db_event in ("like", "skip") else "view"
-            await record_event(
-                db,
-                user_id=payload.user_id,
-                session_id=payload.session_id,
-                track_id=payload.track_id,
-                event_type=safe_event,
-                dwell_ms=payload.dwell_ms,
-                position=payload.position,
-            )
+            await _store_events(db, [_row(payload)])
         except Exception as e:
-            log.exception("record_event failed: %s", e)
+            log.exception("record_events failed: %s", e)
 
     # Optional: nudge bandit only for signals it understands
     if have_bandit:
         try:
-            if payload.event == "like":
-                await nudge(payload.user_id, payload.track_id, "like")
-            elif payload.event in ("skip", "dislike"):
-                await nudge(payload.user_id, payload.track_id, "skip")
+            bandit_event = _bandit_event(payload.event)
+            if bandit_event:
+                await nudge(payload.user_id, payload.track_id, bandit_event)
         except Exception as e:
             log.exception("bandit nudge failed: %s", e)
 
+    if have_seen_filter:
+        try:
+            await mark_seen(payload.user_id, [payload.track_id])
+        except Exception as e:
+            log.exception("mark_seen failed: %s", e)
+
     return FeedbackOut(ok=True)
+
+
+@router.post("/feedback/batch", response_model=FeedbackBatchOut)
+async def post_feedback_batch(payload: FeedbackBatchIn, db: AsyncSession = Depends(get_db)):
+    """
+    Many swipes at once (e.g. flushed from the client every few seconds).
+    Events are stored together and bandit state is updated in one Redis round
+    trip for the whole batch.
+    """
+    events = payload.events
+    accepted = 0  # rows actually queued or written, not just received
+    if have_events_repo and events:
+        try:
+            accepted = await _store_events(db, [_row(ev) for ev in events])
+        except Exception as e:
+            log.exception("record_events failed: %s", e)
+
+    if have_bandit:
+        try:
+            await nudge_many(
+                (ev.user_id, ev.track_id, be)
+                for ev in events
+                if (be := _bandit_event(ev.event))
+            )
+        except Exception as e:
+            log.exception("bandit nudge_many failed: %s", e)
+
+    if have_seen_filter:
+        try:
+            await mark_seen_many((ev.user_id, ev.track_id) for ev in events)
+        except Exception as e:
+            log.exception("mark_seen_many failed: %s", e)
+
+    return FeedbackBatchOut(ok=True, accepted=accepted)
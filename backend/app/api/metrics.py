@@ -0,0 +1,15 @@
+# app/api/metrics.py
+from fastapi import APIRouter, Response
+
+from app.services import metrics
+from app.services.db import pool_status
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    if not metrics.AVAILABLE:
+        return Response("prometheus-client not installed\n", status_code=503, media_type="text/plain")
+    metrics.observe_pool(pool_status())
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
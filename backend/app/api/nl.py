@@ -36,6 +36,7 @@ Return JSON:
         data = await call_llm_json(
             "You clean up user music queries for a music discovery app.",
             user_prompt,
+            caller="nl",
         )
     except LLMUnavailable:
         data = {
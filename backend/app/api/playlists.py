@@ -1,19 +1,43 @@
 # app/api/playlists.py
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
 from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+import base64
+import json
 import time
 
 from app.services.db import get_db
 from app.models.playlist import Playlist, PlaylistTrack
 from app.models.track import Track
 from app.models.base import gen_uuid
+from app.repositories.playlists import (
+    get_playlist_page,
+    list_playlists_page,
+    add_track,
+    bulk_add_tracks,
+    move_track,
+    upsert_track_stubs,
+)
 
 router = APIRouter()
 
+# Postgres' default name for playlist_tracks.playlist_id -> playlists.id
+PLAYLIST_FK = "playlist_tracks_playlist_id_fkey"
+
+
+def _violated_constraint(e: IntegrityError) -> Optional[str]:
+    """Constraint name behind an IntegrityError (asyncpg, or psycopg's diag)."""
+    for err in (e.orig, getattr(e.orig, "__cause__", None)):
+        name = getattr(err, "constraint_name", None) or getattr(getattr(err, "diag", None), "constraint_name", None)
+        if name:
+            return name
+    return None
+
 
 # ---------- schemas ----------
 class PlaylistOut(BaseModel):
@@ -28,6 +52,8 @@ class PlaylistOut(BaseModel):
 
 class PlaylistDetailOut(PlaylistOut):
     tracks: list[dict]
+    # pass back as ?cursor= to get the next page of tracks; None on the last page
+    next_cursor: Optional[str] = None
 
 
 class CreatePlaylistIn(BaseModel):
@@ -45,7 +71,40 @@ class AddTrackIn(BaseModel):
     artwork_url: Optional[str] = None
 
 
+class BulkAddTracksIn(BaseModel):
+    # e.g. "save whole feed to playlist"; appended in the given order
+    tracks: List[AddTrackIn] = Field(..., max_length=500)
+
+
+class BulkAddTracksOut(BaseModel):
+    ok: bool
+    added: int
+    skipped: int
+
+
+class MoveTrackIn(BaseModel):
+    track_id: str
+    # place right after this track; None moves it to the top
+    after_track_id: Optional[str] = None
+
+
 # ---------- helpers ----------
+def _encode_cursor(*key: Any) -> str:
+    raw = json.dumps([k.isoformat() if isinstance(k, datetime) else k for k in key])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, list) or len(key) != 2:
+            raise ValueError
+        return key
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 async def _ensure_track_exists(
     db: AsyncSession,
     *,
@@ -58,37 +117,50 @@ async def _ensure_track_exists(
 ) -> None:
     """
     Ensures the track exists in the database before adding it to a playlist.
-    If the track is missing, a minimal record is created.
+    If the track is missing, a minimal record is created (INSERT ... ON CONFLICT DO NOTHING,
+    so concurrent adds of the same track can't race each other).
     """
-    res = await db.execute(select(Track).where(Track.id == track_id))
-    existing = res.scalar_one_or_none()
-    if existing:
-      return
-
-    t = Track(
-        id=track_id,
-        provider=provider,
-        provider_track_id=provider_track_id,
-        title=title or "",
-        artist=artist or "",
-        artwork_url=artwork_url,
-    )
-    db.add(t)
-    await db.flush()
+    await upsert_track_stubs(db, [{
+        "track_id": track_id,
+        "provider": provider,
+        "provider_track_id": provider_track_id,
+        "title": title,
+        "artist": artist,
+        "artwork_url": artwork_url,
+    }])
 
 
 # ---------- routes ----------
 
 @router.get("/playlists", response_model=list[PlaylistOut])
 async def list_playlists(
+    response: Response,
     user_id: str = Query(...),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    res = await db.execute(
-        select(Playlist).where(Playlist.user_id == user_id).order_by(Playlist.created_at)
-    )
-    rows = res.scalars().all()
-    return rows
+    """
+    Keyset-paginated on (created_at, id). The body stays a plain list; when there
+    are more playlists the next cursor is returned in the X-Next-Cursor header.
+    """
+    after = None
+    if cursor:
+        created_at, pl_id = _decode_cursor(cursor)
+        try:
+            after = (datetime.fromisoformat(created_at), str(pl_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = await list_playlists_page(db, user_id, limit, after)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [
+        PlaylistOut(id=r.id, user_id=r.user_id, name=r.name, kind=r.kind)
+        for r in rows
+    ]
 
 
 @router.post("/playlists", response_model=PlaylistOut)
@@ -108,40 +180,52 @@ async def create_playlist(payload: CreatePlaylistIn, db: AsyncSession = Depends(
 @router.get("/playlists/{playlist_id}", response_model=PlaylistDetailOut)
 async def get_playlist(
     playlist_id: str = Path(...),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    # get playlist
-    res_pl = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
-    pl = res_pl.scalar_one_or_none()
-    if not pl:
+    """
+    Playlist header + one page of tracks (ordered by position) in one query.
+    Follow next_cursor for the rest of a long playlist.
+    """
+    after = None
+    if cursor:
+        position, pt_id = _decode_cursor(cursor)
+        if not isinstance(position, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (position, str(pt_id))
+
+    rows = await get_playlist_page(db, playlist_id, limit, after)
+    if not rows:
         raise HTTPException(status_code=404, detail="Playlist not found")
 
-    # get tracks
-    res_tracks = await db.execute(
-        select(PlaylistTrack).where(PlaylistTrack.playlist_id == playlist_id)
-    )
-    pts = res_tracks.scalars().all()
-
-    tracks = []
-    for pt in pts:
-        tracks.append(
-            {
-                "track_id": pt.track_id,
-                "provider": pt.provider,
-                "provider_track_id": pt.provider_track_id,
-                "title": pt.title,
-                "artist": pt.artist,
-                "artwork_url": pt.artwork_url,
-                "added_at": pt.created_at,
-            }
-        )
+    head = rows[0]
+    page = [r for r in rows if r.pt_id is not None]
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_cursor(page[-1].position, page[-1].pt_id)
+
+    tracks = [
+        {
+            "track_id": r.track_id,
+            "provider": r.provider,
+            "provider_track_id": r.provider_track_id,
+            "title": r.title,
+            "artist": r.artist,
+            "artwork_url": r.artwork_url,
+            "added_at": r.added_at,
+        }
+        for r in page
+    ]
 
     return PlaylistDetailOut(
-        id=pl.id,
-        user_id=pl.user_id,
-        name=pl.name,
-        kind=pl.kind,
+        id=head.id,
+        user_id=head.user_id,
+        name=head.name,
+        kind=head.kind,
         tracks=tracks,
+        next_cursor=next_cursor,
     )
 
 
@@ -151,12 +235,6 @@ async def add_track_to_playlist(
     payload: AddTrackIn,
     db: AsyncSession = Depends(get_db),
 ):
-    # check playlist
-    res_pl = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
-    pl = res_pl.scalar_one_or_none()
-    if not pl:
-        raise HTTPException(status_code=404, detail="Playlist not found")
-
     # 1) ensure track exists in tracks
     await _ensure_track_exists(
         db,
@@ -168,27 +246,52 @@ async def add_track_to_playlist(
         artwork_url=payload.artwork_url,
     )
 
-    # 2) insert into playlist_tracks (avoid duplicates)
-    res_existing = await db.execute(
-        select(PlaylistTrack).where(
-            PlaylistTrack.playlist_id == playlist_id,
-            PlaylistTrack.track_id == payload.track_id,
-        )
-    )
-    existing = res_existing.scalar_one_or_none()
-    if not existing:
-        pt = PlaylistTrack(
-            id=gen_uuid(),
-            playlist_id=playlist_id,
-            track_id=payload.track_id,
+    # 2) insert into playlist_tracks; duplicates are absorbed by the unique constraint
+    #    and a missing playlist surfaces as a foreign key violation
+    try:
+        await add_track(
+            db,
+            playlist_id,
+            payload.track_id,
             provider=payload.provider,
             provider_track_id=payload.provider_track_id,
             title=payload.title,
             artist=payload.artist,
             artwork_url=payload.artwork_url,
         )
-        db.add(pt)
+    except IntegrityError as e:
+        await db.rollback()
+        if _violated_constraint(e) == PLAYLIST_FK:
+            raise HTTPException(status_code=404, detail="Playlist not found")
+        raise
+    return {"ok": True}
+
 
+@router.post("/playlists/{playlist_id}/tracks/bulk", response_model=BulkAddTracksOut)
+async def add_tracks_to_playlist(
+    playlist_id: str,
+    payload: BulkAddTracksIn,
+    db: AsyncSession = Depends(get_db),
+):
+    """Append up to 500 tracks in a single transaction."""
+    result = await bulk_add_tracks(db, playlist_id, [t.model_dump() for t in payload.tracks])
+    if result is None:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    await db.commit()
+    added, skipped = result
+    return BulkAddTracksOut(ok=True, added=added, skipped=skipped)
+
+
+@router.post("/playlists/{playlist_id}/tracks/move")
+async def move_track_in_playlist(
+    playlist_id: str,
+    payload: MoveTrackIn,
+    db: AsyncSession = Depends(get_db),
+):
+    """Reorder one track; only the moved row is rewritten (gap-based positions)."""
+    ok = await move_track(db, playlist_id, payload.track_id, payload.after_track_id)
+    if not ok:
+        raise HTTPException(status_code=404, detail="Track not found in playlist")
     await db.commit()
     return {"ok": True}
 
@@ -2,15 +2,14 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import json
-import httpx
 
 from app.services.db import get_db
-from app.repositories.sessions import create_session, get_session
-from app.services.providers.spotify_auth import get_app_token
+from app.repositories.sessions import create_session
+from app.services.session_cache import cache_session, load_session
+from app.services.catalog import track_metadata
 
 router = APIRouter()
 
@@ -21,6 +20,8 @@ router = APIRouter()
 class CreateSessionIn(BaseModel):
     user_id: str
     query: Optional[str] = None
+    # feed diversity knob: 0.0 = pure relevance, 1.0 = max variety (MMR lambda = 1 - diversity)
+    diversity: Optional[float] = Field(None, ge=0.0, le=1.0)
 
 
 class CreateSessionOut(BaseModel):
@@ -54,16 +55,14 @@ async def create_session_api(payload: CreateSessionIn, db: AsyncSession = Depend
         # module missing → simple seed
         seed = {"query": user_query}
 
-    # create DB session row
-    s = await create_session(db, user_id=payload.user_id, seed_json=seed)
+    if payload.diversity is not None:
+        seed["diversity"] = payload.diversity
 
-    # normalize for response
-    try:
-        seed_obj = json.loads(s.seed_json or "{}")
-    except Exception:
-        seed_obj = s.seed_json if isinstance(s.seed_json, dict) else {}
+    # create DB session row, then warm the cache so /feed skips the DB read
+    s = await create_session(db, user_id=payload.user_id, seed_json=seed)
+    await cache_session(s.id, s.user_id, s.seed_json)
 
-    return CreateSessionOut(id=s.id, user_id=s.user_id, seed=seed_obj)
+    return CreateSessionOut(id=s.id, user_id=s.user_id, seed=s.seed_json or {})
 
 
 # ----------------------------
@@ -84,7 +83,7 @@ class BranchOut(BaseModel):
 @router.post("/sessions/branch", response_model=BranchOut)
 async def branch_session(payload: BranchIn, db: AsyncSession = Depends(get_db)):
     # ensure source session exists
-    src = await get_session(db, payload.from_session_id)
+    src = await load_session(db, payload.from_session_id)
     if not src:
         raise HTTPException(status_code=404, detail="Source session not found")
 
@@ -92,53 +91,24 @@ async def branch_session(payload: BranchIn, db: AsyncSession = Depends(get_db)):
     sp_uri = payload.provider_track_id
     sp_id = sp_uri.split(":")[-1] if ":" in sp_uri else sp_uri
 
-    # try to get app token, but don’t crash if Spotify creds aren’t set
-    try:
-        token = await get_app_token()
-    except Exception:
-        token = None
-
+    # track / artist genres / audio features from the local catalog; Spotify is only
+    # asked for what's missing, and a missing token just means a thinner seed
     genres: list[str] = []
     bpm_val: int | None = None
     energy_val: float | None = None
     fallback_name = "similar"
 
-    if token:
-        async with httpx.AsyncClient(timeout=15) as c:
-            # Track detail
-            tr_resp = await c.get(
-                f"https://api.spotify.com/v1/tracks/{sp_id}",
-                headers={"Authorization": f"Bearer {token}"},
-            )
-            if tr_resp.status_code == 200:
-                tr = tr_resp.json()
-                fallback_name = tr.get("name") or fallback_name
-
-                # artist → genres
-                first_artist_id = tr.get("artists", [{}])[0].get("id")
-                if first_artist_id:
-                    ar_resp = await c.get(
-                        f"https://api.spotify.com/v1/artists/{first_artist_id}",
-                        headers={"Authorization": f"Bearer {token}"},
-                    )
-                    if ar_resp.status_code == 200:
-                        ar = ar_resp.json()
-                        genres = (ar.get("genres") or [])[:3]
-
-                # audio features
-                af_resp = await c.get(
-                    "https://api.spotify.com/v1/audio-features",
-                    params={"ids": sp_id},
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                if af_resp.status_code == 200:
-                    af = af_resp.json()
-                    feats = (af.get("audio_features") or [{}])[0]
-                    if feats:
-                        tempo_val = feats.get("tempo")
-                        if tempo_val:
-                            bpm_val = int(round(tempo_val))
-                        energy_val = feats.get("energy")
+    meta = await track_metadata(db, sp_id)
+    if meta["track"]:
+        fallback_name = meta["track"].get("name") or fallback_name
+    if meta["artist"]:
+        genres = (meta["artist"].get("genres") or [])[:3]
+    feats = meta["features"]
+    if feats:
+        tempo_val = feats.get("tempo")
+        if tempo_val:
+            bpm_val = int(round(tempo_val))
+        energy_val = feats.get("energy")
 
     # build seed for branched session
     seed = {
@@ -150,12 +120,12 @@ async def branch_session(payload: BranchIn, db: AsyncSession = Depends(get_db)):
         "from_track": sp_id,
     }
 
-    s = await create_session(db, user_id=payload.user_id, seed_json=seed)
+    # keep the source session's diversity setting
+    src_seed = src["seed"]
+    if src_seed.get("diversity") is not None:
+        seed["diversity"] = src_seed["diversity"]
 
-    # normalize for response
-    try:
-        seed_obj = json.loads(s.seed_json or "{}")
-    except Exception:
-        seed_obj = s.seed_json if isinstance(s.seed_json, dict) else {}
+    s = await create_session(db, user_id=payload.user_id, seed_json=seed)
+    await cache_session(s.id, s.user_id, s.seed_json)
 
-    return BranchOut(id=s.id, user_id=s.user_id, seed=seed_obj)
+    return BranchOut(id=s.id, user_id=s.user_id, seed=s.seed_json or {})
@@ -1,13 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.settings import settings
-from app.services.db import init_engine
+from app.services.db import init_engine, dispose_engine
 from app.services.cache import init_redis
+from app.services.event_sink import start_event_sink, stop_event_sink
+from app.services.providers.http import close_client
+from app.services.telemetry import init_telemetry, instrument_engine, shutdown_telemetry
+from app.services.metrics import mark_process_dead
 
 # import routers once
 from app.api import (
     health,
+    metrics as metrics_api,
     auth,
     feed,
     feedback,
@@ -20,7 +27,8 @@ from app.api import (
 # NEW IMPORTS — AI-powered endpoints
 from app.api import assistant, nl  # new endpoints for AI music planner + query normalizer
 
-app = FastAPI(title="Sampler API", version="0.1.0")
+# orjson for every response (routes can still return their own Response)
+app = FastAPI(title="Sampler API", version="0.1.0", default_response_class=ORJSONResponse)
 
 # -----------------------------
 # CORS configuration
@@ -35,6 +43,7 @@ if settings.APP_ENV == "dev":
         allow_credentials=False,  # must be False when allow_origins = ["*"]
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],  # playlist list pagination
     )
 else:
     app.add_middleware(
@@ -43,6 +52,32 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
+    )
+
+# tracing (no-op unless OTEL_ENABLED); must run before the app starts serving
+init_telemetry(app)
+
+# -----------------------------
+# Response compression (feed pages and explanations are mostly JSON text)
+# -----------------------------
+try:
+    from brotli_asgi import BrotliMiddleware  # optional: pip install brotli-asgi
+except ImportError:  # pragma: no cover - optional dependency
+    BrotliMiddleware = None
+
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=settings.COMPRESSION_BROTLI_QUALITY,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_fallback=True,
+    )
+else:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
     )
 
 # -----------------------------
@@ -52,11 +87,24 @@ else:
 async def startup() -> None:
     await init_engine()
     await init_redis()
+    instrument_engine()
+    await start_event_sink()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    # flush queued feedback before the pool goes away
+    await stop_event_sink()
+    await close_client()
+    await dispose_engine()
+    shutdown_telemetry()
+    mark_process_dead()
 
 # -----------------------------
 # Router mounting
 # -----------------------------
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics_api.router, tags=["metrics"])  # Prometheus scrape
 app.include_router(auth.router, prefix="/auth", tags=["auth"])  # → /auth/spotify/...
 app.include_router(feed.router, tags=["feed"])
 app.include_router(feedback.router, tags=["feedback"])
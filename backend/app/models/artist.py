@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from app.services.db import Base
+from app.models.base import Base, TimestampMixin, gen_uuid
+
+
+class Artist(Base, TimestampMixin):
+    # local copy of provider artist metadata (see app/services/catalog.py)
+    __tablename__ = "artists"
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=gen_uuid)  # provider artist id
+    provider: Mapped[str] = mapped_column(String, default="spotify")
+    name: Mapped[str] = mapped_column(String, index=True)
+    genres: Mapped[list[str]] = mapped_column(JSONB, default=list)
+    popularity: Mapped[int | None] = mapped_column(nullable=True)
+    meta_json: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
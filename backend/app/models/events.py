@@ -1,15 +1,52 @@
+from datetime import date, datetime
+
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, ForeignKey, BigInteger
+from sqlalchemy import String, ForeignKey, BigInteger, Date, DateTime, Index, func
 from app.services.db import Base
 from app.models.base import Base, TimestampMixin, gen_uuid
 
 
 class FeedEvent(Base, TimestampMixin):
+    # In Postgres this is range-partitioned by month on created_at
+    # (see ops/alembic/versions/e2a9ddc51205_partition_feed_events.py).
     __tablename__ = "feed_events"
+    __table_args__ = (
+        Index("ix_feed_events_user_created", "user_id", "created_at"),
+        Index("ix_feed_events_track_created", "track_id", "created_at"),
+        Index("ix_feed_events_session_created", "session_id", "created_at"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True, default=gen_uuid)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
     track_id: Mapped[str] = mapped_column(ForeignKey("tracks.id"))
     session_id: Mapped[str] = mapped_column(ForeignKey("sessions.id"))
-    event_type: Mapped[str] = mapped_column(String)  # "like" | "skip" | "impression"
+    event_type: Mapped[str] = mapped_column(String)  # "like" | "skip" | "view"
     dwell_ms: Mapped[int | None] = mapped_column(nullable=True)
     position: Mapped[int | None] = mapped_column(nullable=True)
+
+
+class TrackDailyStats(Base):
+    """Per-track daily rollup of feed_events (app/workers/rollup.py)."""
+    __tablename__ = "track_daily_stats"
+    track_id: Mapped[str] = mapped_column(String, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    events: Mapped[int] = mapped_column(default=0)
+    likes: Mapped[int] = mapped_column(default=0)
+    skips: Mapped[int] = mapped_column(default=0)
+    views: Mapped[int] = mapped_column(default=0)
+    users: Mapped[int] = mapped_column(default=0)
+    dwell_ms_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class UserDailyStats(Base):
+    """Per-user daily rollup of feed_events (app/workers/rollup.py)."""
+    __tablename__ = "user_daily_stats"
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    events: Mapped[int] = mapped_column(default=0)
+    likes: Mapped[int] = mapped_column(default=0)
+    skips: Mapped[int] = mapped_column(default=0)
+    views: Mapped[int] = mapped_column(default=0)
+    sessions: Mapped[int] = mapped_column(default=0)
+    dwell_ms_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
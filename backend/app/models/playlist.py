@@ -2,12 +2,15 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Integer
+from sqlalchemy import String, ForeignKey, Integer, Index, UniqueConstraint
 from app.models.base import Base, TimestampMixin, gen_uuid
 
 
 class Playlist(Base, TimestampMixin):
     __tablename__ = "playlists"
+    __table_args__ = (
+        Index("ix_playlists_user_created", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=gen_uuid)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -28,6 +31,10 @@ class Playlist(Base, TimestampMixin):
 
 class PlaylistTrack(Base, TimestampMixin):
     __tablename__ = "playlist_tracks"
+    __table_args__ = (
+        Index("ix_playlist_tracks_playlist_position", "playlist_id", "position", "id"),
+        UniqueConstraint("playlist_id", "track_id", name="uq_playlist_tracks_playlist_track"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=gen_uuid)
     playlist_id: Mapped[str] = mapped_column(ForeignKey("playlists.id"), nullable=False)
@@ -1,5 +1,8 @@
+from typing import Any
+
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, ForeignKey, Text
+from sqlalchemy import String, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from app.services.db import Base
 from app.models.base import Base, TimestampMixin, gen_uuid
 
@@ -8,4 +11,4 @@ class Session(Base, TimestampMixin):
     __tablename__ = "sessions"
     id: Mapped[str] = mapped_column(String, primary_key=True, default=gen_uuid)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
-    seed_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    seed_json: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
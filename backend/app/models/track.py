@@ -1,8 +1,15 @@
+from datetime import datetime
+from typing import Any
+
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Text
+from sqlalchemy import String, Text, Float, Index, DateTime, cast, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
 from app.services.db import Base
 from app.models.base import Base, TimestampMixin, gen_uuid
 
+# features we filter the catalog on; each gets a btree expression index
+INDEXED_FEATURE_KEYS = ("energy", "tempo", "valence", "danceability")
+
 
 class Track(Base, TimestampMixin):
     __tablename__ = "tracks"
@@ -14,4 +21,30 @@ class Track(Base, TimestampMixin):
     album: Mapped[str | None] = mapped_column(String, nullable=True)
     duration_ms: Mapped[int | None] = mapped_column(nullable=True)
     artwork_url: Mapped[str | None] = mapped_column(Text, nullable=True)
-    features_json: Mapped[str | None] = mapped_column(Text, nullable=True)  # json string
+    features_json: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    # provider track payload (trimmed) + when it / the audio features were last fetched
+    meta_json: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    features_fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+def feature_expr(key: str):
+    """
+    (features_json->>'key')::float8. The key is rendered inline rather than bound so
+    the planner can match it against the ix_tracks_feature_* expression indexes.
+    """
+    if not key.isidentifier():
+        raise ValueError(f"invalid feature key: {key!r}")
+    return cast(Track.features_json.op("->>")(literal_column(f"'{key}'")), Float)
+
+
+# containment lookups (features_json @> '{...}') use the GIN index; range
+# predicates on individual features use the expression indexes
+Index(
+    "ix_tracks_features_gin",
+    Track.features_json,
+    postgresql_using="gin",
+    postgresql_ops={"features_json": "jsonb_path_ops"},
+)
+for _key in INDEXED_FEATURE_KEYS:
+    Index(f"ix_tracks_feature_{_key}", feature_expr(_key))
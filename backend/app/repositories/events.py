@@ -1,28 +1,22 @@
 # app/repositories/events.py
 from __future__ import annotations
-from uuid import uuid4
+from typing import Any, Sequence
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.events import FeedEvent
 
-async def record_event(
-    db: AsyncSession,
-    user_id: str,
-    session_id: str,
-    track_id: str,
-    event_type: str,
-    dwell_ms: int | None = None,
-    position: int | None = None,
-) -> FeedEvent:
-    ev = FeedEvent(
-        id=str(uuid4()),
-        user_id=user_id,
-        session_id=session_id,
-        track_id=track_id,
-        event_type=event_type,
-        dwell_ms=dwell_ms,
-        position=position,
-    )
-    db.add(ev)
+async def record_events(db: AsyncSession, rows: Sequence[dict[str, Any]]) -> int:
+    """
+    Insert many events in one statement and one commit (SQLAlchemy batches the
+    executemany into multi-row INSERT ... VALUES). Rows come from event_sink.event_row.
+    """
+    if not rows:
+        return 0
+    try:
+        await db.execute(insert(FeedEvent), list(rows))
+    except IntegrityError:
+        await db.rollback()  # leave the session usable for the caller's retry of the halves
+        raise
     await db.commit()
-    await db.refresh(ev)
-    return ev
+    return len(rows)
@@ -11,11 +11,10 @@ async def create_playlist(db: AsyncSession, user_id: str, name: str, kind: str =
     await db.refresh(p)
     return p
 
-async def add_track(db: AsyncSession, playlist_id: str, track_id: str) -> None:
-    await db.execute(
-        insert(PlaylistTrack).values(playlist_id=playlist_id, track_id=track_id).prefix_with("ON CONFLICT DO NOTHING")
-    )
-    await db.commit()
+async def add_track(db: AsyncSession, playlist_id: str, track_id: str, **fields) -> bool:
+    # single implementation (atomic ON CONFLICT upsert) lives in repositories.playlists
+    from app.repositories.playlists import add_track as _add_track
+    return await _add_track(db, playlist_id, track_id, **fields)
 
 async def get_playlists(db: AsyncSession, user_id: str) -> list[Playlist]:
     res = await db.execute(select(Playlist).where(Playlist.user_id == user_id))
@@ -1,7 +1,19 @@
+from datetime import datetime
+from typing import Any, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, delete
+from sqlalchemy import select, insert, delete, update, and_, tuple_, literal, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.playlist import Playlist, PlaylistTrack
 from app.models.track import Track
+from app.models.base import gen_uuid
+
+# Positions are spaced POSITION_GAP apart so a move only rewrites the moved row
+# (it takes the midpoint of its new neighbours). When two neighbours end up
+# adjacent the playlist is renumbered once.
+POSITION_GAP = 1024
+
+# unique (playlist_id, track_id); the ON CONFLICT target for membership upserts
+MEMBERSHIP_KEY = [PlaylistTrack.playlist_id, PlaylistTrack.track_id]
 
 async def create_playlist(db: AsyncSession, user_id: str, name: str, kind: str = "vibe") -> Playlist:
     p = Playlist(user_id=user_id, name=name, kind=kind)
@@ -14,12 +26,47 @@ async def get_playlists(db: AsyncSession, user_id: str) -> list[Playlist]:
     res = await db.execute(select(Playlist).where(Playlist.user_id == user_id))
     return list(res.scalars().all())
 
-async def add_track(db: AsyncSession, playlist_id: str, track_id: str) -> None:
-    # unique(playlist_id, track_id) is enforced by DB constraint
-    await db.execute(
-        insert(PlaylistTrack).values(playlist_id=playlist_id, track_id=track_id).prefix_with("ON CONFLICT DO NOTHING")
+async def add_track(db: AsyncSession, playlist_id: str, track_id: str, **fields) -> bool:
+    """
+    Append a track unless it's already in the playlist; atomic via
+    ON CONFLICT on uq_playlist_tracks_playlist_track. Returns True if it was added.
+    `fields` are the denormalized columns (provider, provider_track_id, title, ...).
+    """
+    res = await db.execute(
+        pg_insert(PlaylistTrack)
+        .values(
+            id=gen_uuid(),
+            playlist_id=playlist_id,
+            track_id=track_id,
+            position=next_position_subquery(playlist_id),
+            **fields,
+        )
+        .on_conflict_do_nothing(index_elements=MEMBERSHIP_KEY)
+        .returning(PlaylistTrack.id)
     )
+    added = res.scalar_one_or_none() is not None
     await db.commit()
+    return added
+
+async def upsert_track_stubs(db: AsyncSession, tracks: Sequence[dict]) -> None:
+    """Make sure minimal tracks rows exist (one multi-row INSERT ... ON CONFLICT DO NOTHING)."""
+    if not tracks:
+        return
+    await db.execute(
+        pg_insert(Track)
+        .values([
+            {
+                "id": t["track_id"],
+                "provider": t["provider"],
+                "provider_track_id": t["provider_track_id"],
+                "title": t.get("title") or "",
+                "artist": t.get("artist") or "",
+                "artwork_url": t.get("artwork_url"),
+            }
+            for t in tracks
+        ])
+        .on_conflict_do_nothing(index_elements=[Track.id])
+    )
 
 async def remove_track(db: AsyncSession, playlist_id: str, track_id: str) -> None:
     await db.execute(
@@ -42,3 +89,196 @@ async def get_playlist_tracks(db: AsyncSession, playlist_id: str) -> list[Track]
     )
     res = await db.execute(q)
     return list(res.scalars().all())
+
+
+# ---------- keyset pagination (light row tuples, no ORM entities) ----------
+
+async def get_playlist_page(
+    db: AsyncSession,
+    playlist_id: str,
+    limit: int,
+    after: tuple[int, str] | None = None,
+) -> Sequence[Any]:
+    """
+    Playlist header + one page of its tracks in a single round trip.
+
+    LEFT JOIN so an empty playlist still returns one row (track columns NULL);
+    tracks are ordered by (position, id) and `after` is the last (position, id)
+    of the previous page. Returns up to limit + 1 rows so callers can tell
+    whether there is a next page. No rows => playlist doesn't exist.
+    """
+    join_on = PlaylistTrack.playlist_id == Playlist.id
+    if after is not None:
+        join_on = and_(
+            join_on,
+            tuple_(PlaylistTrack.position, PlaylistTrack.id) > tuple_(literal(after[0]), literal(after[1])),
+        )
+    q = (
+        select(
+            Playlist.id,
+            Playlist.user_id,
+            Playlist.name,
+            Playlist.kind,
+            PlaylistTrack.id.label("pt_id"),
+            PlaylistTrack.position,
+            PlaylistTrack.track_id,
+            PlaylistTrack.provider,
+            PlaylistTrack.provider_track_id,
+            PlaylistTrack.title,
+            PlaylistTrack.artist,
+            PlaylistTrack.artwork_url,
+            PlaylistTrack.created_at.label("added_at"),
+        )
+        .select_from(Playlist)
+        .outerjoin(PlaylistTrack, join_on)
+        .where(Playlist.id == playlist_id)
+        .order_by(PlaylistTrack.position, PlaylistTrack.id)
+        .limit(limit + 1)
+    )
+    return (await db.execute(q)).all()
+
+
+async def list_playlists_page(
+    db: AsyncSession,
+    user_id: str,
+    limit: int,
+    after: tuple[datetime, str] | None = None,
+) -> Sequence[Any]:
+    """A user's playlists ordered by (created_at, id); returns up to limit + 1 rows."""
+    q = select(Playlist.id, Playlist.user_id, Playlist.name, Playlist.kind, Playlist.created_at).where(
+        Playlist.user_id == user_id
+    )
+    if after is not None:
+        q = q.where(tuple_(Playlist.created_at, Playlist.id) > tuple_(literal(after[0]), literal(after[1])))
+    q = q.order_by(Playlist.created_at, Playlist.id).limit(limit + 1)
+    return (await db.execute(q)).all()
+
+
+# ---------- bulk add / reorder ----------
+
+def next_position_subquery(playlist_id: str):
+    """Scalar subquery for "one gap after the current last track" (no extra round trip)."""
+    return (
+        select(func.coalesce(func.max(PlaylistTrack.position), 0) + POSITION_GAP)
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .scalar_subquery()
+    )
+
+
+async def bulk_add_tracks(db: AsyncSession, playlist_id: str, tracks: Sequence[dict]) -> tuple[int, int] | None:
+    """
+    Append many tracks in one transaction: one statement to check the playlist and
+    read its last position, one multi-row upsert into tracks, one into playlist_tracks.
+    Tracks already in the playlist (or repeated in the input) are skipped by the
+    unique constraint. Returns (added, skipped), or None if the playlist doesn't exist.
+    Caller commits.
+    """
+    head = (
+        await db.execute(
+            select(Playlist.id, func.coalesce(func.max(PlaylistTrack.position), 0))
+            .outerjoin(PlaylistTrack, PlaylistTrack.playlist_id == Playlist.id)
+            .where(Playlist.id == playlist_id)
+            .group_by(Playlist.id)
+        )
+    ).first()
+    if head is None:
+        return None
+    last_position = int(head[1])
+
+    unique: dict[str, dict] = {}
+    for t in tracks:
+        unique.setdefault(t["track_id"], t)
+    if not unique:
+        return 0, len(tracks)
+    new = list(unique.values())
+
+    await upsert_track_stubs(db, new)
+    res = await db.execute(
+        pg_insert(PlaylistTrack)
+        .values([
+            {
+                "id": gen_uuid(),
+                "playlist_id": playlist_id,
+                "track_id": t["track_id"],
+                "provider": t["provider"],
+                "provider_track_id": t["provider_track_id"],
+                "title": t.get("title"),
+                "artist": t.get("artist"),
+                "artwork_url": t.get("artwork_url"),
+                "position": last_position + POSITION_GAP * (i + 1),
+            }
+            for i, t in enumerate(new)
+        ])
+        .on_conflict_do_nothing(index_elements=MEMBERSHIP_KEY)
+        .returning(PlaylistTrack.id)
+    )
+    added = len(res.scalars().all())
+    return added, len(tracks) - added
+
+
+async def _renumber_positions(db: AsyncSession, playlist_id: str) -> None:
+    ranked = (
+        select(
+            PlaylistTrack.id.label("pt_id"),
+            (func.row_number().over(order_by=(PlaylistTrack.position, PlaylistTrack.id)) * POSITION_GAP).label("pos"),
+        )
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .subquery()
+    )
+    await db.execute(
+        update(PlaylistTrack)
+        .where(PlaylistTrack.id == ranked.c.pt_id)
+        .values(position=ranked.c.pos)
+    )
+
+
+async def move_track(db: AsyncSession, playlist_id: str, track_id: str, after_track_id: str | None) -> bool:
+    """
+    Move `track_id` to just after `after_track_id` (None = to the top).
+    Usually a single-row UPDATE. Returns False if either track isn't in the playlist.
+    Caller commits.
+    """
+    for attempt in (1, 2):
+        rows = (
+            await db.execute(
+                select(PlaylistTrack.track_id, PlaylistTrack.position).where(
+                    PlaylistTrack.playlist_id == playlist_id,
+                    PlaylistTrack.track_id.in_([track_id] + ([after_track_id] if after_track_id else [])),
+                )
+            )
+        ).all()
+        positions = {tid: pos for tid, pos in rows}
+        if track_id not in positions or (after_track_id and after_track_id not in positions):
+            return False
+
+        lo = positions[after_track_id] if after_track_id else None
+        # first other track below the new slot
+        hi_q = select(func.min(PlaylistTrack.position)).where(
+            PlaylistTrack.playlist_id == playlist_id,
+            PlaylistTrack.track_id != track_id,
+        )
+        if lo is not None:
+            hi_q = hi_q.where(PlaylistTrack.position > lo)
+        hi = (await db.execute(hi_q)).scalar()
+
+        if lo is None and hi is None:
+            return True  # only track in the playlist
+        if lo is None:
+            new_pos = hi - POSITION_GAP
+        elif hi is None:
+            new_pos = lo + POSITION_GAP
+        elif hi - lo >= 2:
+            new_pos = (lo + hi) // 2
+        elif attempt == 1:
+            await _renumber_positions(db, playlist_id)
+            continue
+        else:
+            new_pos = lo + 1
+
+        await db.execute(
+            update(PlaylistTrack)
+            .where(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id == track_id)
+            .values(position=new_pos)
+        )
+        return True
+    return True
@@ -4,11 +4,9 @@ from uuid import uuid4
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.session import Session
-import json
 
 async def create_session(db: AsyncSession, user_id: str, seed_json: dict | None = None) -> Session:
-    json_text = json.dumps(seed_json or {})  # << serialize dict to text
-    s = Session(id=str(uuid4()), user_id=user_id, seed_json=json_text)
+    s = Session(id=str(uuid4()), user_id=user_id, seed_json=seed_json or {})
     db.add(s)
     await db.commit()
     await db.refresh(s)
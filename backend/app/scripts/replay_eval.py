@@ -0,0 +1,60 @@
+# backend/app/scripts/replay_eval.py
+"""
+Replay logged feed sessions against one or more rankers and print metrics as JSON.
+
+    python -m app.scripts.replay_eval --rankers logged,bandit --k 5 --k 10 --since 2025-11-01
+
+Needs only the database: the bandit ranks without the live Redis feedback scores,
+which would leak the replayed outcomes into the metrics.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from app.services.db import init_engine
+import app.services.db as db
+from app.services.recsys.evaluation import parse_rankers, replay
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Offline replay evaluation over feed_events")
+    p.add_argument("--rankers", default="logged,bandit", help="comma-separated ranker names")
+    p.add_argument("--k", type=int, action="append", help="cutoff(s), repeatable (default 5,10,20)")
+    p.add_argument("--since", type=datetime.fromisoformat, default=None)
+    p.add_argument("--until", type=datetime.fromisoformat, default=None)
+    p.add_argument("--chunk-size", type=int, default=10000, help="rows per server-side cursor fetch")
+    p.add_argument("--batch-sessions", type=int, default=500, help="sessions scored per vectorized batch")
+    p.add_argument("--out", default=None, help="write the JSON report here instead of stdout")
+    return p.parse_args()
+
+
+async def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO)
+    rankers = parse_rankers(args.rankers.split(","))
+
+    await init_engine()
+    async with db.SessionLocal() as stream_db, db.SessionLocal() as meta_db:  # type: ignore
+        report = await replay(
+            stream_db,
+            rankers,
+            ks=args.k or (5, 10, 20),
+            since=args.since,
+            until=args.until,
+            chunk_size=args.chunk_size,
+            batch_sessions=args.batch_sessions,
+            meta_db=meta_db,
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,40 @@
+import time
+
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
 from app.settings import settings
+from app.services.metrics import REDIS_SECONDS
 
 r: redis.Redis | None = None
 
+
+class _TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        t0 = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_SECONDS.labels(command="PIPELINE").observe(time.perf_counter() - t0)
+
+
+class TimedRedis(redis.Redis):
+    """redis.asyncio.Redis that records every round trip in sampler_redis_roundtrip_seconds."""
+
+    async def execute_command(self, *args, **options):
+        t0 = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_SECONDS.labels(command=str(args[0]).upper()).observe(time.perf_counter() - t0)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return _TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
 async def init_redis():
     global r
-    r = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    r = TimedRedis.from_url(settings.REDIS_URL, decode_responses=True)
 
 def get_redis() -> redis.Redis:
     assert r is not None, "Redis not initialized"
@@ -0,0 +1,294 @@
+# app/services/catalog.py
+"""
+Read-through metadata for a single track: the track itself, its primary artist
+(with genres) and its audio features.
+
+Each piece is looked up Redis -> local tables (tracks / artists) -> Spotify, and
+only the pieces that are still missing or stale go upstream. Whatever we fetch is
+written back to both layers with a fetched_at timestamp, so "more like this" and
+explanations stop hitting Spotify after the first time a track is seen.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, func, cast, literal, update as update_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.settings import settings
+from app.services.cache import get_redis
+from app.services.metrics import cache_result
+from app.services.providers.spotify_batch import load_artist, load_audio_features, load_track
+from app.models.track import Track
+from app.models.artist import Artist
+
+logger = logging.getLogger(__name__)
+
+EMPTY_JSONB = cast(literal("{}"), JSONB)
+
+AUDIO_FEATURE_KEYS = (
+    "danceability", "energy", "key", "loudness", "mode", "speechiness", "acousticness",
+    "instrumentalness", "liveness", "valence", "tempo", "time_signature",
+)
+
+
+def _k(kind: str, id_: str) -> str:
+    return f"catalog:{kind}:{id_}"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _fresh(ts: Optional[datetime], days: float) -> bool:
+    return ts is not None and _now() - ts < timedelta(days=days)
+
+
+# ---------------------------
+# Trimmed provider payloads
+# ---------------------------
+def trim_track(t: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a Spotify track object we use (and cache)."""
+    album = t.get("album") or {}
+    images = album.get("images") or []
+    return {
+        "id": t.get("id"),
+        "name": t.get("name"),
+        "uri": t.get("uri"),
+        "artists": [{"id": a.get("id"), "name": a.get("name")} for a in t.get("artists") or []],
+        "album": {"id": album.get("id"), "name": album.get("name"), "images": images[:1]},
+        "duration_ms": t.get("duration_ms"),
+        "popularity": t.get("popularity"),
+        "explicit": t.get("explicit"),
+    }
+
+
+def trim_artist(a: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": a.get("id"),
+        "name": a.get("name"),
+        "genres": a.get("genres") or [],
+        "popularity": a.get("popularity"),
+    }
+
+
+def audio_features(features_json: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Spotify audio features held in tracks.features_json, or None if we have none."""
+    if not isinstance(features_json, dict):
+        return None
+    out = {k: features_json[k] for k in AUDIO_FEATURE_KEYS if features_json.get(k) is not None}
+    return out or None
+
+
+def primary_artist_id(track: Optional[Dict[str, Any]]) -> Optional[str]:
+    artists = (track or {}).get("artists") or []
+    return artists[0].get("id") if artists and isinstance(artists[0], dict) else None
+
+
+# ---------------------------
+# Redis layer (fail-soft)
+# ---------------------------
+async def _cache_get_many(keys: list[str]) -> list[Optional[dict]]:
+    try:
+        raw = await get_redis().mget(keys)
+    except Exception as e:
+        logger.warning("catalog cache read failed: %s", e)
+        return [None] * len(keys)
+    out: list[Optional[dict]] = []
+    for v in raw:
+        try:
+            out.append(json.loads(v) if v else None)
+        except ValueError:
+            out.append(None)
+    return out
+
+
+async def _cache_set_many(items: Dict[str, Any]) -> None:
+    if not items:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, json.dumps(value), ex=settings.CATALOG_REDIS_TTL_S)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("catalog cache write failed: %s", e)
+
+
+# ---------------------------
+# Write-back to the local catalog
+# ---------------------------
+async def _store_track(db: AsyncSession, track_id: str, track: Optional[dict], features: Optional[dict],
+                       features_checked: bool) -> None:
+    now = _now()
+    update: Dict[str, Any] = {"updated_at": now}
+    if features_checked:
+        update["features_fetched_at"] = now
+
+    if track is None:
+        # nothing to build a row from (no title / artist): only touch an existing one,
+        # never insert a placeholder the catalog fallback would serve as a blank card
+        if features:
+            update["features_json"] = func.coalesce(Track.features_json, EMPTY_JSONB).op("||")(
+                cast(literal(json.dumps(features)), JSONB))
+        await db.execute(update_(Track).where(Track.id == track_id).values(**update))
+        return
+
+    images = (track.get("album") or {}).get("images") or []
+    meta = {
+        "title": track.get("name") or "",
+        "artist": ", ".join(a["name"] for a in track.get("artists") or [] if a.get("name")),
+        "album": (track.get("album") or {}).get("name"),
+        "duration_ms": track.get("duration_ms"),
+        "artwork_url": images[0].get("url") if images else None,
+        "meta_json": track,
+        "fetched_at": now,
+    }
+    update.update(meta)
+    values: Dict[str, Any] = {"id": track_id, "provider": "spotify", "provider_track_id": f"spotify:track:{track_id}",
+                              **meta}
+    if features_checked:
+        values["features_fetched_at"] = now
+
+    stmt = pg_insert(Track).values(**values, features_json=features or None)
+    if features:
+        # merge so ingest-time analysis / popularity survive
+        update["features_json"] = func.coalesce(Track.features_json, EMPTY_JSONB).op("||")(stmt.excluded.features_json)
+    await db.execute(stmt.on_conflict_do_update(index_elements=[Track.id], set_=update))
+
+
+async def _store_artist(db: AsyncSession, artist: dict) -> None:
+    now = _now()
+    values = {
+        "id": artist["id"],
+        "provider": "spotify",
+        "name": artist.get("name") or "",
+        "genres": artist.get("genres") or [],
+        "popularity": artist.get("popularity"),
+        "meta_json": artist,
+        "fetched_at": now,
+    }
+    stmt = pg_insert(Artist).values(**values)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[Artist.id],
+        set_={k: stmt.excluded[k] for k in ("name", "genres", "popularity", "meta_json", "fetched_at")} | {"updated_at": now},
+    ))
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+async def track_metadata(db: AsyncSession, track_id: str) -> Dict[str, Optional[dict]]:
+    """
+    {"track", "artist", "features"} for a Spotify track id; any of them may be None
+    (unknown track, no artist, Spotify has no features / is unreachable).
+    """
+    cached_track, cached_features = await _cache_get_many([_k("track", track_id), _k("features", track_id)])
+    track, features = cached_track, cached_features
+    features_known = cached_features is not None   # {} means "Spotify has none"
+
+    # local catalog for whatever Redis didn't have
+    row = None
+    if track is None or not features_known:
+        row = (await db.execute(select(Track).where(Track.id == track_id))).scalar_one_or_none()
+    if row is not None:
+        if track is None and row.meta_json and _fresh(row.fetched_at, settings.CATALOG_TRACK_TTL_DAYS):
+            track = row.meta_json
+        if not features_known:
+            feats = audio_features(row.features_json)
+            if feats:
+                features, features_known = feats, True
+            elif _fresh(row.features_fetched_at, settings.CATALOG_FEATURES_RETRY_DAYS):
+                features, features_known = {}, True
+    cache_result("catalog_track", "redis" if cached_track is not None else "db" if track is not None else "miss")
+    cache_result("catalog_features", "redis" if cached_features is not None else "db" if features_known else "miss")
+
+    artist_id = primary_artist_id(track)
+    artist: Optional[dict] = None
+    artist_cached = False
+    if artist_id:
+        artist, artist_cached = await _load_artist(db, artist_id)
+
+    # upstream only for the gaps
+    fetched_track = fetched_artist = None
+    fetched_features: Optional[dict] = None
+    need_track, need_features = track is None, not features_known
+    if need_track or need_features or (artist_id and artist is None):
+        # single-id loads are micro-batched with concurrent requests into
+        # /tracks?ids=, /audio-features?ids=, /artists?ids=
+        tr_res, af_res = await asyncio.gather(
+            load_track(track_id) if need_track else _none(),
+            load_audio_features(track_id) if need_features else _none(),
+            return_exceptions=True,
+        )
+        if isinstance(tr_res, BaseException) or isinstance(af_res, BaseException):
+            logger.warning("spotify lookup failed for %s, serving catalog only: %s", track_id,
+                           tr_res if isinstance(tr_res, BaseException) else af_res)
+        if tr_res and not isinstance(tr_res, BaseException):
+            fetched_track = track = trim_track(tr_res)
+        elif track is None and row is not None and row.meta_json:
+            track = row.meta_json  # Spotify unavailable: a stale copy beats nothing
+        if need_features and not isinstance(af_res, BaseException):
+            # Spotify answered; a null entry is recorded as {} ("has none") so we
+            # don't ask again until CATALOG_FEATURES_RETRY_DAYS. A failed lookup
+            # (timeout, 5xx, open circuit) raised instead and records nothing.
+            fetched_features = audio_features(af_res) or {}
+            features = fetched_features
+        artist_id = primary_artist_id(track)
+        if artist_id and artist is None:
+            artist, artist_cached = await _load_artist(db, artist_id)
+            if artist is None:
+                try:
+                    ar_res = await load_artist(artist_id)
+                except Exception as e:
+                    logger.warning("spotify artist lookup failed for %s: %s", artist_id, e)
+                    ar_res = None
+                if ar_res:
+                    fetched_artist = artist = trim_artist(ar_res)
+
+    # write back what we learned
+    if fetched_track is not None or fetched_features is not None or fetched_artist is not None:
+        try:
+            if fetched_track is not None or fetched_features is not None:
+                await _store_track(db, track_id, fetched_track, fetched_features, fetched_features is not None)
+            if fetched_artist is not None:
+                await _store_artist(db, fetched_artist)
+            await db.commit()
+        except Exception as e:
+            logger.warning("catalog write-back failed for %s: %s", track_id, e)
+            await db.rollback()
+
+    to_cache: Dict[str, Any] = {}
+    if track is not None and cached_track is None:
+        to_cache[_k("track", track_id)] = track
+    if features is not None and cached_features is None:
+        to_cache[_k("features", track_id)] = features
+    if artist is not None and artist_id and not artist_cached:
+        to_cache[_k("artist", artist_id)] = artist
+    await _cache_set_many(to_cache)
+
+    return {"track": track, "artist": artist, "features": features or None}
+
+
+async def _load_artist(db: AsyncSession, artist_id: str) -> tuple[Optional[dict], bool]:
+    """(artist, came_from_redis) from Redis or the artists table; (None, False) if missing/stale."""
+    (cached,) = await _cache_get_many([_k("artist", artist_id)])
+    if cached is not None:
+        cache_result("catalog_artist", "redis")
+        return cached, True
+    row = (await db.execute(select(Artist).where(Artist.id == artist_id))).scalar_one_or_none()
+    if row is not None and _fresh(row.fetched_at, settings.CATALOG_ARTIST_TTL_DAYS):
+        cache_result("catalog_artist", "db")
+        return row.meta_json or {"id": row.id, "name": row.name, "genres": row.genres, "popularity": row.popularity}, False
+    cache_result("catalog_artist", "miss")
+    return None, False
+
+
+async def _none() -> None:
+    return None
@@ -1,7 +1,8 @@
 # backend/app/services/db.py
 from __future__ import annotations
 
-from typing import Optional, AsyncIterator
+from typing import Optional, AsyncIterator, Any
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
@@ -9,9 +10,10 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
 )
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 
 from app.settings import settings
+from app.services.metrics import observe_pool
 from app.models.base import Base  # main Base registry
 
 _engine: Optional[AsyncEngine] = None
@@ -20,12 +22,40 @@ SessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
 
 def _build_async_url() -> str:
     """Build asyncpg DSN for SQLAlchemy."""
+    # SQLAlchemy-side cache of asyncpg prepared statements (per connection)
+    cache_size = 0 if settings.DB_PGBOUNCER else settings.DB_STATEMENT_CACHE_SIZE
     return (
         f"postgresql+asyncpg://{settings.PG_USER}:{settings.PG_PASSWORD}"
         f"@{settings.PG_HOST}:{settings.PG_PORT}/{settings.PG_DB}"
+        f"?prepared_statement_cache_size={cache_size}"
     )
 
 
+def _engine_kwargs() -> dict[str, Any]:
+    """Pool/driver options from Settings."""
+    connect_args: dict[str, Any] = {}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode hands us a different server connection per
+        # transaction: no statement cache, and unique names so they never collide.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    if settings.DB_POOL_MODE == "null":
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
 def _import_all_models() -> None:
     """
     Ensure all model classes are imported so that
@@ -36,6 +66,7 @@ def _import_all_models() -> None:
     import app.models.user  # noqa: F401
     import app.models.oauth  # noqa: F401
     import app.models.track  # noqa: F401
+    import app.models.artist  # noqa: F401
     import app.models.session  # noqa: F401
     import app.models.events  # noqa: F401
     import app.models.playlist  # noqa: F401
@@ -52,14 +83,43 @@ async def init_engine() -> None:
     _engine = create_async_engine(
         _build_async_url(),
         echo=False,
-        poolclass=NullPool,  # good for containers
         future=True,
+        **_engine_kwargs(),
     )
     SessionLocal = async_sessionmaker(bind=_engine, expire_on_commit=False, class_=AsyncSession)
 
 
+async def dispose_engine() -> None:
+    """Close pooled connections (on shutdown)."""
+    global _engine, SessionLocal
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    SessionLocal = None
+
+
+def get_engine() -> AsyncEngine:
+    assert _engine is not None, "Call init_engine() first"
+    return _engine
+
+
+def pool_status() -> dict[str, int]:
+    """Snapshot of pool usage; empty when not pooled / not initialized."""
+    pool = _engine.pool if _engine is not None else None
+    if pool is None or not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+    }
+
+
 async def get_db() -> AsyncIterator[AsyncSession]:
     """FastAPI dependency for database sessions."""
     assert SessionLocal is not None, "Call init_engine() first"
+    # saturation as seen by each incoming request (per worker; summed across workers)
+    observe_pool(pool_status())
     async with SessionLocal() as session:
         yield session
@@ -0,0 +1,229 @@
+# app/services/event_sink.py
+"""
+Write-behind ingestion for feed_events.
+
+/feedback enqueues rows onto an in-process bounded queue; a background task drains
+it and writes each batch with one multi-row INSERT and one commit. A batch that
+violates a constraint (e.g. a track_id not in tracks) is split in halves until the
+offending rows are isolated, so one bad event only loses itself. When the queue is
+full, put() waits briefly and then raises EventSinkFull so the caller can fall back
+to a direct write (backpressure lands on the request, not on memory). stop() drains
+whatever is queued before shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from sqlalchemy.exc import IntegrityError
+
+from app.settings import settings
+
+log = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+Writer = Callable[[List[Row]], Awaitable[None]]
+
+
+class EventSinkFull(Exception):
+    pass
+
+
+def event_row(
+    user_id: str,
+    session_id: str,
+    track_id: str,
+    event_type: str,
+    dwell_ms: int | None = None,
+    position: int | None = None,
+) -> Row:
+    """A feed_events row stamped with the time it happened, not the time it's flushed."""
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "session_id": session_id,
+        "track_id": track_id,
+        "event_type": event_type,
+        "dwell_ms": dwell_ms,
+        "position": position,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def write_isolating_bad_rows(writer: Writer, rows: List[Row]) -> int:
+    """
+    Write rows with `writer`; on an IntegrityError, bisect the batch and retry the
+    halves, dropping only the rows that fail on their own. Returns rows written.
+    Other errors propagate.
+    """
+    if not rows:
+        return 0
+    try:
+        await writer(rows)
+        return len(rows)
+    except IntegrityError as e:
+        if len(rows) == 1:
+            log.warning("dropping feed event for track %s: %s", rows[0].get("track_id"), getattr(e, "orig", e))
+            return 0
+    mid = len(rows) // 2
+    return await write_isolating_bad_rows(writer, rows[:mid]) + await write_isolating_bad_rows(writer, rows[mid:])
+
+
+async def _db_writer(rows: List[Row]) -> None:
+    import app.services.db as db
+    from app.repositories.events import record_events
+
+    assert db.SessionLocal is not None, "Call init_engine() first"
+    async with db.SessionLocal() as session:
+        await record_events(session, rows)
+
+
+class EventSink:
+    def __init__(
+        self,
+        writer: Writer = _db_writer,
+        batch_size: int = 500,
+        flush_interval_s: float = 0.25,
+        max_queue: int = 50000,
+        enqueue_timeout_s: float = 0.05,
+    ):
+        self._writer = writer
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self._queue: asyncio.Queue[Row] = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._pending: List[Row] = []   # batch being collected; survives cancellation
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-sink")
+
+    async def put(self, row: Row) -> None:
+        if not self.running:
+            raise EventSinkFull("event sink not running")
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), self.enqueue_timeout_s)
+            except asyncio.TimeoutError:
+                raise EventSinkFull("event queue full")
+
+    async def put_many(self, rows: Sequence[Row]) -> int:
+        """Enqueue rows in order; returns how many made it before the queue filled up."""
+        n = 0
+        for row in rows:
+            try:
+                await self.put(row)
+            except EventSinkFull:
+                break
+            n += 1
+        return n
+
+    async def _next_batch(self) -> List[Row]:
+        # block for the first row, then keep collecting until the batch is full
+        # or the flush interval has elapsed
+        self._pending.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(self._pending) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                self._pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _drain_nowait(self) -> List[Row]:
+        batch: List[Row] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _write(self, batch: List[Row]) -> None:
+        for attempt in (1, 2):
+            try:
+                await write_isolating_bad_rows(self._writer, batch)
+                return
+            except Exception as e:
+                if attempt == 2:
+                    log.exception("dropping %d feed events after failed write: %s", len(batch), e)
+                else:
+                    log.warning("feed event batch write failed, retrying: %s", e)
+                    await asyncio.sleep(0.2)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            # shielded so stop() never interrupts a batch halfway through its INSERT
+            self._inflight = asyncio.create_task(self._write(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def stop(self) -> None:
+        """Stop accepting rows, flush everything queued, then return."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            await self._write(batch)
+        while True:
+            batch = self._drain_nowait()
+            if not batch:
+                break
+            await self._write(batch)
+        self._task = None
+
+
+_sink: Optional[EventSink] = None
+
+
+async def start_event_sink() -> None:
+    global _sink
+    if not settings.EVENTS_WRITE_BEHIND or _sink is not None:
+        return
+    _sink = EventSink(
+        batch_size=settings.EVENTS_BATCH_SIZE,
+        flush_interval_s=settings.EVENTS_FLUSH_INTERVAL_MS / 1000.0,
+        max_queue=settings.EVENTS_QUEUE_MAX,
+        enqueue_timeout_s=settings.EVENTS_ENQUEUE_TIMEOUT_MS / 1000.0,
+    )
+    _sink.start()
+
+
+async def stop_event_sink() -> None:
+    global _sink
+    if _sink is not None:
+        await _sink.stop()
+    _sink = None
+
+
+def get_event_sink() -> Optional[EventSink]:
+    """The running sink, or None when write-behind is off / not started."""
+    return _sink if _sink is not None and _sink.running else None
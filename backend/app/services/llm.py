@@ -1,10 +1,16 @@
 # app/services/llm.py
 from __future__ import annotations
 import os
+import time
 from typing import Any, Dict, Optional
 
 import httpx
 
+from app.settings import settings
+from app.services.metrics import record_llm
+from app.services.providers import http
+from app.services.resilience import CircuitOpen
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 # You can change this to gpt-4o, gpt-4.1, etc.
@@ -13,7 +19,8 @@ DEFAULT_MODEL = "gpt-4o-mini"
 class LLMUnavailable(Exception):
     pass
 
-async def call_llm_json(system_prompt: str, user_prompt: str, model: str = DEFAULT_MODEL) -> Dict[str, Any]:
+async def call_llm_json(system_prompt: str, user_prompt: str, model: str = DEFAULT_MODEL,
+                        caller: str = "assistant") -> Dict[str, Any]:
     """
     Call OpenAI and ask for JSON. If no key is set, raise LLMUnavailable so
     the API handler can return a friendly error.
@@ -31,17 +38,24 @@ async def call_llm_json(system_prompt: str, user_prompt: str, model: str = DEFAU
         "temperature": 0.7,
     }
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.post(
-            "https://api.openai.com/v1/chat/completions",
+    # while OpenAI is failing the circuit is open and callers get their
+    # LLMUnavailable fallback immediately instead of after a timeout
+    t0 = time.perf_counter()
+    try:
+        r = await http.post(
+            "openai",
+            f"{settings.OPENAI_BASE_URL}/chat/completions",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
                 "Content-Type": "application/json",
             },
             json=payload,
         )
-    r.raise_for_status()
+        r.raise_for_status()
+    except (CircuitOpen, httpx.HTTPError) as e:
+        raise LLMUnavailable(str(e)) from e
     data = r.json()
+    record_llm(caller, model, time.perf_counter() - t0, data.get("usage"))
     content = data["choices"][0]["message"]["content"]
     # content is JSON string because we asked for json_object
     import json
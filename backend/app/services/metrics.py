@@ -0,0 +1,146 @@
+# app/services/metrics.py
+"""
+Prometheus metrics, scraped from GET /metrics (app/api/metrics.py).
+
+Multi-worker uvicorn: set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by
+the workers (wiped before start). Every worker then writes its samples there
+and /metrics aggregates them via MultiProcessCollector, whichever worker answers.
+
+prometheus-client is optional at import time: without it the metrics below
+are no-ops and /metrics answers 503, so the API itself keeps working.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Gauge = Histogram = None  # type: ignore[assignment]
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+AVAILABLE = Histogram is not None
+
+# request stages run from sub-millisecond (cache hits) to many seconds (LLM)
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REDIS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+class _Noop:
+    def labels(self, *args: Any, **kwargs: Any) -> "_Noop":
+        return self
+
+    def observe(self, *args: Any) -> None:
+        pass
+
+    def inc(self, *args: Any) -> None:
+        pass
+
+    def set(self, *args: Any) -> None:
+        pass
+
+
+def _metric(kind, *args: Any, **kwargs: Any):
+    return kind(*args, **kwargs) if AVAILABLE else _Noop()
+
+
+STAGE_SECONDS = _metric(
+    Histogram, "sampler_stage_seconds", "Time spent in a request stage (feed.*, explain.*, tavily.search)",
+    ["stage"], buckets=STAGE_BUCKETS,
+)
+UPSTREAM_SECONDS = _metric(
+    Histogram, "sampler_upstream_seconds", "Upstream call latency, hedges and retries included",
+    ["upstream", "outcome"], buckets=STAGE_BUCKETS,
+)
+CIRCUIT_REJECTIONS = _metric(
+    Counter, "sampler_circuit_rejections_total", "Calls failed fast because the upstream's circuit was open",
+    ["upstream"],
+)
+CIRCUIT_TRANSITIONS = _metric(
+    Counter, "sampler_circuit_transitions_total", "Circuit breaker state changes", ["upstream", "state"],
+)
+FEED_SOURCE = _metric(
+    Counter, "sampler_feed_source_total", "Which branch produced the /feed candidates", ["source"],
+)
+CACHE_REQUESTS = _metric(
+    Counter, "sampler_cache_requests_total", "Cache lookups by layer that answered (miss = went to the source)",
+    ["cache", "result"],
+)
+LLM_SECONDS = _metric(
+    Histogram, "sampler_llm_seconds", "LLM completion latency", ["caller", "model"], buckets=STAGE_BUCKETS,
+)
+LLM_TOKENS = _metric(
+    Counter, "sampler_llm_tokens_total", "LLM tokens used", ["caller", "model", "kind"],
+)
+REDIS_SECONDS = _metric(
+    Histogram, "sampler_redis_roundtrip_seconds", "Redis round trips (one per command or pipeline)",
+    ["command"], buckets=REDIS_BUCKETS,
+)
+# livesum: the pool is per worker, so the fleet-wide value is the sum over live workers
+DB_POOL = _metric(
+    Gauge, "sampler_db_pool_connections", "SQLAlchemy pool connections by state", ["state"],
+    multiprocess_mode="livesum",
+)
+
+
+# ---------------------------
+# Recording helpers
+# ---------------------------
+@contextmanager
+def timed(histogram, **labels: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - t0)
+
+
+def cache_result(cache: str, result: str) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result=result).inc()
+
+
+def record_llm(caller: str, model: str, seconds: float, usage: Optional[Dict[str, Any]]) -> None:
+    """usage: the OpenAI `usage` object (dict or SDK model); missing counts are skipped."""
+    LLM_SECONDS.labels(caller=caller, model=model).observe(seconds)
+    if usage is None:
+        return
+    if not isinstance(usage, dict):
+        usage = {k: getattr(usage, k, None) for k in ("prompt_tokens", "completion_tokens")}
+    for kind in ("prompt", "completion"):
+        n = usage.get(f"{kind}_tokens")
+        if n:
+            LLM_TOKENS.labels(caller=caller, model=model, kind=kind).inc(n)
+
+
+def observe_pool(status: Dict[str, int]) -> None:
+    for state in ("size", "checked_out", "overflow", "checked_in"):
+        if state in status:
+            DB_POOL.labels(state=state).set(status[state])
+
+
+# ---------------------------
+# Exposition
+# ---------------------------
+def render() -> bytes:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared directory (on shutdown)."""
+    if AVAILABLE and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
@@ -3,8 +3,13 @@ from __future__ import annotations
 
 import os
 import re
+import time
 from typing import Any, Dict, List, Optional
 
+from app.settings import settings
+from app.services.metrics import record_llm
+from app.services.resilience import breaker
+
 # we'll try to import openai client, but code should still work without it
 try:
     from openai import AsyncOpenAI
@@ -99,11 +104,13 @@ async def _llm_seed(text: str) -> Optional[Dict[str, Any]]:
     if AsyncOpenAI is None:
         return None
 
-    client = AsyncOpenAI(api_key=api_key)
+    client = AsyncOpenAI(api_key=api_key, base_url=settings.OPENAI_BASE_URL, timeout=settings.OPENAI_TIMEOUT_S)
 
+    t0 = time.perf_counter()
     try:
-        # use a small / cheap model name you actually have
-        resp = await client.chat.completions.create(
+        # use a small / cheap model name you actually have; while OpenAI is
+        # failing the breaker skips straight to the heuristic seed
+        resp = await breaker("openai").call(lambda: client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": LLM_SYSTEM_PROMPT},
@@ -112,7 +119,8 @@ async def _llm_seed(text: str) -> Optional[Dict[str, Any]]:
             # we want pure JSON
             response_format={"type": "json_object"},
             temperature=0.2,
-        )
+        ))
+        record_llm("nl_seed", "gpt-4o-mini", time.perf_counter() - t0, getattr(resp, "usage", None))
         # new SDK: parsed JSON is at .choices[0].message.parsed if response_format used
         msg = resp.choices[0].message
         if hasattr(msg, "parsed") and isinstance(msg.parsed, dict):
@@ -0,0 +1,70 @@
+# app/services/payload.py
+"""
+Response trimming for bandwidth-constrained clients.
+
+compact_card / compact_explain cut feed cards and explanations down to what
+the app renders. select_fields keeps only the comma-separated (dotted) paths
+asked for in a `fields=` query param, e.g. "track_id,title,meta.features.tempo".
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+# features the feed card / explain sheet actually show
+COMPACT_FEATURE_KEYS = ("energy", "valence", "tempo")
+
+
+def _pick(d: Optional[Dict[str, Any]], keys) -> Optional[Dict[str, Any]]:
+    if not isinstance(d, dict):
+        return None
+    return {k: d[k] for k in keys if d.get(k) is not None}
+
+
+def compact_card(card: Dict[str, Any]) -> Dict[str, Any]:
+    """Feed card without empty tags and with meta reduced to features, discovery score and artist name."""
+    out = {k: v for k, v in card.items() if k not in ("meta", "tags")}
+    if card.get("tags"):
+        out["tags"] = card["tags"]
+    meta = card.get("meta") or {}
+    out["meta"] = {
+        "features": _pick(meta.get("features"), COMPACT_FEATURE_KEYS) or None,
+        "discovery_score": meta.get("discovery_score"),
+        "artist": {"name": (meta.get("artist") or {}).get("name")},
+    }
+    return out
+
+
+def compact_explain_raw(track: Optional[dict], artist: Optional[dict], features: Optional[dict]) -> Dict[str, Any]:
+    """`raw` for /explain/track?compact=true: the headline features and who it's by, not whole Spotify objects."""
+    return {
+        "audio_features": _pick(features, COMPACT_FEATURE_KEYS) or {},
+        "artist": _pick(artist, ("id", "name", "genres")) or {},
+        "track": _pick(track, ("id", "name", "duration_ms", "popularity")) or {},
+    }
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[List[str]]]:
+    if not fields:
+        return None
+    paths = [f.strip().split(".") for f in fields.split(",") if f.strip()]
+    return paths or None
+
+
+def select_fields(obj: Dict[str, Any], paths: List[List[str]]) -> Dict[str, Any]:
+    """Copy of `obj` with only the given key paths (missing paths are ignored)."""
+    out: Dict[str, Any] = {}
+    for path in paths:
+        src: Any = obj
+        for key in path:
+            if not isinstance(src, dict) or key not in src:
+                break
+            src = src[key]
+        else:
+            dst = out
+            for key in path[:-1]:
+                nxt = dst.get(key)
+                if not isinstance(nxt, dict):
+                    nxt = dst[key] = {}
+                dst = nxt
+            dst[path[-1]] = src
+    return out
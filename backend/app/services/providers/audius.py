@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Optional, Dict, Any
-from app.services.recsys.clip_selector import choose_clip_window
+from app.services.recsys.clip_selector import clip_window_for
 
 async def resolve_preview(track) -> Optional[Dict[str, Any]]:
     if track.provider != "audius":
@@ -9,7 +9,7 @@ async def resolve_preview(track) -> Optional[Dict[str, Any]]:
     # Frontend <audio> element will seek and stop with a timer.
     if not track.stream_url:
         return None
-    start_ms, duration_ms = choose_clip_window(track.duration_ms, track.features_json)
+    start_ms, duration_ms = clip_window_for(track)
     return {
         "provider": "audius",
         "id": track.provider_track_id,
@@ -0,0 +1,236 @@
+# app/services/providers/http.py
+"""
+Shared HTTP layer for upstream providers.
+
+One pooled httpx.AsyncClient per process (instead of a client per call), and
+every request goes through the upstream's circuit breaker: while Spotify or
+OpenAI is failing, callers get CircuitOpen immediately and fall back to cached /
+catalog data instead of each waiting out a timeout. Call sites can opt small
+idempotent GETs into hedging (hedge=True) once they pass the upstream's recent
+latency percentile.
+
+get_json() adds conditional requests on top: bodies are kept with their ETag
+(process LRU + Redis) and revalidated with If-None-Match, so an unchanged
+playlist page or single track costs a 304 instead of a download and re-parse.
+Only use it for URLs that repeat; multi-id batches are arbitrary id mixes that
+would just fill the cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from app.settings import settings
+from app.services.cache import get_redis
+from app.services.metrics import UPSTREAM_SECONDS, cache_result
+from app.services.resilience import breaker, hedged, latency
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.UPSTREAM_TIMEOUT_S, connect=settings.UPSTREAM_CONNECT_TIMEOUT_S),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+
+
+def _timeout_for(upstream: str) -> Optional[float]:
+    return {
+        "spotify": settings.SPOTIFY_TIMEOUT_S,
+        "openai": settings.OPENAI_TIMEOUT_S,
+    }.get(upstream)
+
+
+def _outcome(resp: httpx.Response) -> str:
+    if resp.status_code == 429:
+        return "throttled"
+    return "ok" if resp.status_code < 500 else "error"
+
+
+def _is_failure(resp: httpx.Response) -> bool:
+    # 5xx and rate limiting count against the circuit; other 4xx are the caller's problem
+    return resp.status_code >= 500 or resp.status_code == 429
+
+
+async def request(
+    upstream: str,
+    method: str,
+    url: str,
+    *,
+    hedge: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Send one request to `upstream` ("spotify", "openai", ...). Raises CircuitOpen
+    without touching the network while the circuit is open. Responses are returned
+    as-is (callers still raise_for_status); 5xx / 429 / transport errors and
+    timeouts are recorded as failures.
+    """
+    b = breaker(upstream)
+    b.check()
+    c = client or get_client()
+    if "timeout" not in kwargs and _timeout_for(upstream) is not None:
+        kwargs["timeout"] = _timeout_for(upstream)
+
+    tracker = latency(upstream)
+
+    async def attempt() -> httpx.Response:
+        t0 = time.perf_counter()
+        resp = await c.request(method, url, **kwargs)
+        tracker.record(time.perf_counter() - t0)
+        return resp
+
+    delay = None
+    if hedge and method.upper() == "GET" and settings.HEDGE_ENABLED:
+        delay = tracker.percentile(settings.HEDGE_PERCENTILE)
+    t0 = time.perf_counter()
+    try:
+        resp = await hedged(attempt, delay)
+    except asyncio.CancelledError:
+        b.release()  # our caller gave up; says nothing about the upstream
+        raise
+    except Exception:
+        b.record_failure()
+        UPSTREAM_SECONDS.labels(upstream=upstream, outcome="error").observe(time.perf_counter() - t0)
+        raise
+    if _is_failure(resp):
+        b.record_failure()
+    else:
+        b.record_success()
+    UPSTREAM_SECONDS.labels(upstream=upstream, outcome=_outcome(resp)).observe(time.perf_counter() - t0)
+    return resp
+
+
+async def get(upstream: str, url: str, *, hedge: bool = False, **kwargs: Any) -> httpx.Response:
+    # hedging is opt-in per call site: worth it for small idempotent metadata
+    # lookups, not for large downloads where a second copy just doubles the load
+    return await request(upstream, "GET", url, hedge=hedge, **kwargs)
+
+
+async def post(upstream: str, url: str, **kwargs: Any) -> httpx.Response:
+    return await request(upstream, "POST", url, **kwargs)
+
+
+def bearer(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ---------------------------
+# Conditional GETs (ETag / If-None-Match)
+# ---------------------------
+# key -> (etag, parsed body, size); shared between callers, so treat bodies as read-only.
+# Bounded by the summed length of the response texts (ETAG_CACHE_LOCAL_MAX_BYTES).
+_etag_lru: "OrderedDict[str, Tuple[str, Any, int]]" = OrderedDict()
+_etag_lru_bytes = 0
+
+
+def _etag_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    # auth headers are deliberately not part of the key: only use this for
+    # catalog endpoints whose bodies don't depend on who asks
+    full = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+    return "etag:" + hashlib.sha1(full.encode()).hexdigest()
+
+
+def _remember_etag(key: str, etag: str, body: Any, size: int) -> None:
+    global _etag_lru_bytes
+    old = _etag_lru.pop(key, None)
+    if old is not None:
+        _etag_lru_bytes -= old[2]
+    if size > settings.ETAG_CACHE_LOCAL_MAX_BYTES // 8:
+        return  # one big body would evict everything else; Redis still has it
+    _etag_lru[key] = (etag, body, size)
+    _etag_lru_bytes += size
+    while _etag_lru_bytes > settings.ETAG_CACHE_LOCAL_MAX_BYTES:
+        _etag_lru_bytes -= _etag_lru.popitem(last=False)[1][2]
+
+
+async def _cached_etag(key: str) -> Tuple[Optional[str], Any, Optional[str]]:
+    """(etag, parsed body, raw body) - raw is only set when the body came from Redis."""
+    hit = _etag_lru.get(key)
+    if hit is not None:
+        _etag_lru.move_to_end(key)
+        return hit[0], hit[1], None
+    try:
+        raw = await get_redis().get(key)
+    except Exception as e:
+        logger.warning("etag cache read failed: %s", e)
+        return None, None, None
+    if not raw:
+        return None, None, None
+    try:
+        entry = json.loads(raw)
+        return entry["etag"], None, entry["body"]
+    except (ValueError, KeyError, TypeError):
+        return None, None, None
+
+
+async def get_json(
+    upstream: str,
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Any:
+    """
+    GET `url` and return the parsed JSON body, revalidating any cached copy with
+    If-None-Match. A 304 serves the cached body and refreshes its TTL; a 200 with
+    an ETag replaces it. Non-2xx responses raise httpx.HTTPStatusError.
+    """
+    key = _etag_key(url, params)
+    etag, body, raw = await _cached_etag(key)
+    hdrs = dict(headers or {})
+    if etag:
+        hdrs["If-None-Match"] = etag
+
+    r = await get(upstream, url, params=params, headers=hdrs, client=client)
+    if r.status_code == 304 and etag:
+        cache_result("etag", "revalidated")
+        if body is None:
+            body = json.loads(raw)
+            _remember_etag(key, etag, body, len(raw))
+        try:
+            await get_redis().expire(key, settings.ETAG_CACHE_TTL_S)
+        except Exception as e:
+            logger.warning("etag cache refresh failed: %s", e)
+        return body
+
+    r.raise_for_status()
+    cache_result("etag", "changed" if etag else "miss")
+    body = r.json()
+    new_etag = r.headers.get("ETag")
+    if new_etag:
+        _remember_etag(key, new_etag, body, len(r.content))
+        try:
+            await get_redis().set(key, json.dumps({"etag": new_etag, "body": r.text}), ex=settings.ETAG_CACHE_TTL_S)
+        except Exception as e:
+            logger.warning("etag cache write failed: %s", e)
+    return body
+
+
+def clear_etag_cache() -> None:
+    global _etag_lru_bytes
+    _etag_lru.clear()
+    _etag_lru_bytes = 0
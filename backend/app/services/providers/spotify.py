@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Optional, Dict, Any
-from app.services.recsys.clip_selector import choose_clip_window
+from app.services.recsys.clip_selector import clip_window_for
 
 # You likely already have a Track-like object with fields used below.
 # We only need to build the preview dict.
@@ -16,7 +16,7 @@ async def resolve_preview(track) -> Optional[Dict[str, Any]]:
     """
     # Spotify Web Playback SDK requires Premium and device init on the frontend.
     # We assume you’ll call /playback/token on the frontend to init the SDK.
-    start_ms, duration_ms = choose_clip_window(track.duration_ms, track.features_json)
+    start_ms, duration_ms = clip_window_for(track)
     return {
         "provider": "spotify",
         "id": track.provider_track_id,  # keep the spotify:track:... URI
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import base64
-import httpx
 from app.settings import settings
+from app.services.providers import http
 
 _app_token: str | None = None
 
@@ -18,16 +18,16 @@ async def get_app_token() -> str:
         f"{settings.SPOTIFY_CLIENT_ID}:{settings.SPOTIFY_CLIENT_SECRET}".encode()
     ).decode()
 
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.post(
-            "https://accounts.spotify.com/api/token",
-            data={"grant_type": "client_credentials"},
-            headers={
-                "Authorization": f"Basic {auth}",
-                "Content-Type": "application/x-www-form-urlencoded",
-            },
-        )
-        r.raise_for_status()
-        data = r.json()
-        _app_token = data["access_token"]
-        return _app_token
+    r = await http.post(
+        "spotify",
+        f"{settings.SPOTIFY_ACCOUNTS_BASE}/api/token",
+        data={"grant_type": "client_credentials"},
+        headers={
+            "Authorization": f"Basic {auth}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
+    )
+    r.raise_for_status()
+    data = r.json()
+    _app_token = data["access_token"]
+    return _app_token
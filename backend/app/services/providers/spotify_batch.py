@@ -0,0 +1,213 @@
+# app/services/providers/spotify_batch.py
+"""
+Multi-id Spotify lookups.
+
+fetch_many() splits any number of ids into endpoint-sized chunks (tracks 50,
+artists 50, audio-features 100), sends the chunks concurrently and merges the
+results into {id: object}. MicroBatcher sits on top for single-id callers: lookups
+from concurrent requests that arrive within a few milliseconds of each other go
+out as one multi-id call.
+
+A chunk that fails (timeout, 5xx, open circuit) is not the same as an id Spotify
+doesn't know: fetch_many raises FetchIncomplete carrying what did come back, the
+bulk helpers keep those partial results, and the batcher fails only the waiters
+whose ids were in the lost chunk.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import httpx
+
+from app.settings import settings
+from app.services.providers import http
+from app.services.providers.spotify_auth import get_app_token
+
+logger = logging.getLogger(__name__)
+
+# kind -> (path, response key, max ids per request)
+ENDPOINTS = {
+    "tracks": ("/tracks", "tracks", 50),
+    "artists": ("/artists", "artists", 50),
+    "audio-features": ("/audio-features", "audio_features", 100),
+}
+MAX_CONCURRENT_CHUNKS = 4
+
+
+class FetchIncomplete(Exception):
+    """Some chunks of a fetch_many() call failed; `found` holds the rest."""
+
+    def __init__(self, kind: str, found: Dict[str, dict], failed: Set[str], error: BaseException):
+        super().__init__(f"spotify {kind}: {len(failed)} ids in failed chunks: {error!r}")
+        self.found = found
+        self.failed = failed
+        self.error = error
+
+
+def chunked(ids: Sequence[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(ids), size):
+        yield list(ids[i:i + size])
+
+
+async def fetch_many(kind: str, ids: Iterable[str], token: str,
+                     client: Optional[httpx.AsyncClient] = None) -> Dict[str, dict]:
+    """
+    {id: object} for every id Spotify knows; unknown ids are simply absent.
+    If any chunk fails, raises FetchIncomplete with the other chunks' results and
+    the ids that went unanswered.
+    """
+    path, key, size = ENDPOINTS[kind]
+    unique = [i for i in dict.fromkeys(ids) if i]
+    if not unique:
+        return {}
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def one(chunk: List[str]) -> List[dict]:
+        async with sem:
+            # plain GET, not http.get_json: batched id mixes rarely repeat, so
+            # ETag revalidation would only fill the cache with one-off bodies
+            r = await http.get(
+                "spotify",
+                f"{settings.SPOTIFY_API_BASE}{path}",
+                params={"ids": ",".join(chunk)},
+                headers={"Authorization": f"Bearer {token}"},
+                client=client,
+                hedge=True,
+            )
+            r.raise_for_status()
+            return [o for o in (r.json().get(key) or []) if o]
+
+    chunks = list(chunked(unique, size))
+    results = await asyncio.gather(*(one(chunk) for chunk in chunks), return_exceptions=True)
+    out: Dict[str, dict] = {}
+    failed: Set[str] = set()
+    error: Optional[BaseException] = None
+    for chunk, res in zip(chunks, results):
+        if isinstance(res, BaseException):
+            failed.update(chunk)
+            error = error or res
+            continue
+        for obj in res:
+            if obj.get("id"):
+                out[obj["id"]] = obj
+    if error is not None:
+        raise FetchIncomplete(kind, out, failed, error)
+    return out
+
+
+async def _fetch_partial(kind: str, ids: Iterable[str], token: str) -> Dict[str, dict]:
+    # bulk callers (feed enrichment) are fine with whatever came back
+    try:
+        return await fetch_many(kind, ids, token)
+    except FetchIncomplete as e:
+        logger.warning("%s", e)
+        return e.found
+
+
+async def get_tracks(ids: Iterable[str], token: str) -> Dict[str, dict]:
+    return await _fetch_partial("tracks", ids, token)
+
+
+async def get_artists(ids: Iterable[str], token: str) -> Dict[str, dict]:
+    return await _fetch_partial("artists", ids, token)
+
+
+async def get_audio_features_many(ids: Iterable[str], token: str) -> Dict[str, dict]:
+    return await _fetch_partial("audio-features", ids, token)
+
+
+# ---------------------------
+# Micro-batching single lookups
+# ---------------------------
+class MicroBatcher:
+    """
+    Coalesces load(id) calls made within `window_ms` into one fetch(ids) call
+    (flushed early once `max_batch` ids are waiting). Every caller waiting on an
+    id gets the same result, None if the fetch didn't return it. Callers whose id
+    was lost to a failed fetch (or failed chunk, see FetchIncomplete) get the error.
+    """
+
+    def __init__(self, fetch: Callable[[List[str]], Awaitable[Dict[str, dict]]],
+                 max_batch: int = 50, window_ms: float = 5.0):
+        self._fetch = fetch
+        self.max_batch = max_batch
+        self.window_s = window_ms / 1000.0
+        self._waiting: Dict[str, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()  # keep flush tasks referenced until done
+
+    async def load(self, id_: str) -> Optional[dict]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._waiting.setdefault(id_, []).append(fut)
+        if len(self._waiting) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await fut
+
+    async def load_many(self, ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        unique = list(dict.fromkeys(ids))
+        results = await asyncio.gather(*(self.load(i) for i in unique))
+        return dict(zip(unique, results))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._waiting:
+            return
+        batch, self._waiting = self._waiting, {}
+        task = asyncio.ensure_future(self._resolve(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _resolve(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        failed: Set[str] = set()
+        error: Optional[BaseException] = None
+        try:
+            found = await self._fetch(list(batch))
+        except FetchIncomplete as e:
+            found, failed, error = e.found, e.failed, e.error
+        except Exception as e:
+            found, failed, error = {}, set(batch), e
+        for id_, futs in batch.items():
+            for f in futs:
+                if f.done():
+                    continue
+                if id_ in failed:
+                    f.set_exception(error)
+                else:
+                    f.set_result(found.get(id_))
+
+
+def _app_token_fetcher(kind: str) -> Callable[[List[str]], Awaitable[Dict[str, dict]]]:
+    async def fetch(ids: List[str]) -> Dict[str, dict]:
+        return await fetch_many(kind, ids, await get_app_token())
+    return fetch
+
+
+_batchers: Dict[str, MicroBatcher] = {}
+
+
+def batcher(kind: str) -> MicroBatcher:
+    """Process-wide batcher for `kind` using the app (client-credentials) token."""
+    b = _batchers.get(kind)
+    if b is None:
+        b = _batchers[kind] = MicroBatcher(_app_token_fetcher(kind), max_batch=ENDPOINTS[kind][2])
+    return b
+
+
+async def load_track(track_id: str) -> Optional[dict]:
+    return await batcher("tracks").load(track_id)
+
+
+async def load_artist(artist_id: str) -> Optional[dict]:
+    return await batcher("artists").load(artist_id)
+
+
+async def load_audio_features(track_id: str) -> Optional[dict]:
+    return await batcher("audio-features").load(track_id)
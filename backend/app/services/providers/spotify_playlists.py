@@ -1,11 +1,13 @@
 # app/services/providers/spotify_playlists.py
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 import httpx
 import time
 import base64
+import random
 
 from app.settings import settings
+from app.services.providers import http
 
 # reuse client-credentials (same pattern as spotify_simple)
 _app_token: Optional[str] = None
@@ -22,17 +24,17 @@ async def _get_app_token() -> str:
         f"{settings.SPOTIFY_CLIENT_ID}:{settings.SPOTIFY_CLIENT_SECRET}".encode("utf-8")
     ).decode("utf-8")
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.post(
-            "https://accounts.spotify.com/api/token",
-            headers={"Authorization": f"Basic {auth}"},
-            data={"grant_type": "client_credentials"},
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        _app_token = data["access_token"]
-        _app_token_exp = now + int(data.get("expires_in", 3600))
-        return _app_token
+    resp = await http.post(
+        "spotify",
+        f"{settings.SPOTIFY_ACCOUNTS_BASE}/api/token",
+        headers={"Authorization": f"Basic {auth}"},
+        data={"grant_type": "client_credentials"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    _app_token = data["access_token"]
+    _app_token_exp = now + int(data.get("expires_in", 3600))
+    return _app_token
 
 
 async def search_playlists(query: str, limit: int = 5) -> List[Dict[str, Any]]:
@@ -41,56 +43,109 @@ async def search_playlists(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     We'll use the items' IDs to fetch tracks.
     """
     token = await _get_app_token()
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.get(
-            "https://api.spotify.com/v1/search",
-            headers={"Authorization": f"Bearer {token}"},
-            params={
-                "q": query,
-                "type": "playlist",
-                "limit": min(max(limit, 1), 10),
-            },
-        )
-        r.raise_for_status()
-        return r.json().get("playlists", {}).get("items", []) or []
+    r = await http.get(
+        "spotify",
+        f"{settings.SPOTIFY_API_BASE}/search",
+        headers={"Authorization": f"Bearer {token}"},
+        params={
+            "q": query,
+            "type": "playlist",
+            "limit": min(max(limit, 1), 10),
+        },
+        hedge=True,
+    )
+    r.raise_for_status()
+    return r.json().get("playlists", {}).get("items", []) or []
 
 
-async def get_playlist_tracks(playlist_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+# only what _normalize_track reads, plus the next-page link
+PLAYLIST_TRACK_FIELDS = (
+    "next,items(track(id,name,duration_ms,popularity,"
+    "artists(id,name),album(name,release_date,images(url))))"
+)
+PAGE_SIZE_MAX = 100
+
+
+def _normalize_track(tr: Dict[str, Any]) -> Dict[str, Any]:
+    # normalize a bit so it looks like search_tracks output
+    artists = ", ".join([a.get("name", "") for a in tr.get("artists", [])])
+    album = tr.get("album", {}) or {}
+    images = album.get("images", []) or []
+    artwork = images[0]["url"] if images else None
+    return {
+        "id": tr.get("id"),
+        "provider_track_uri": f"spotify:track:{tr.get('id')}" if tr.get("id") else None,
+        "title": tr.get("name"),
+        "artist": artists,
+        "artwork_url": artwork,
+        "duration_ms": tr.get("duration_ms"),
+        "popularity": tr.get("popularity"),
+        "album": album.get("name"),
+        "album_release_date": album.get("release_date"),
+        # keep original artists list for later enrichment
+        "artists_raw": tr.get("artists", []),
+    }
+
+
+async def iter_playlist_tracks(
+    playlist_id: str,
+    max_tracks: Optional[int] = None,
+    page_size: int = PAGE_SIZE_MAX,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Fetch tracks from a playlist. We only need basic track info.
+    Stream a playlist's tracks page by page, following `next` links, with a
+    `fields=` filter so Spotify only sends what we normalize. Stops after
+    `max_tracks`, or as soon as the caller stops iterating; memory stays at one page.
+    Local files / removed tracks (track = null or no id) are skipped.
     """
     token = await _get_app_token()
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.get(
-            f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
-            headers={"Authorization": f"Bearer {token}"},
-            params={"limit": min(max(limit, 1), 100)},
-        )
-        r.raise_for_status()
-        items = r.json().get("items", []) or []
-        tracks: List[Dict[str, Any]] = []
-        for it in items:
-            tr = it.get("track")
-            if not tr:
+    page_size = min(max(page_size, 1), PAGE_SIZE_MAX)
+    if max_tracks is not None:
+        page_size = min(page_size, max(max_tracks, 1))
+
+    url: Optional[str] = f"{settings.SPOTIFY_API_BASE}/playlists/{playlist_id}/tracks"
+    params: Optional[Dict[str, Any]] = {"limit": page_size, "fields": PLAYLIST_TRACK_FIELDS}
+    yielded = 0
+    while url:
+        # unchanged pages revalidate with If-None-Match and come back as 304s
+        page = await http.get_json("spotify", url, headers={"Authorization": f"Bearer {token}"},
+                                   params=params, client=client)
+        for it in page.get("items", []) or []:
+            tr = (it or {}).get("track")
+            if not tr or not tr.get("id"):
                 continue
-            # normalize a bit so it looks like search_tracks output
-            artists = ", ".join([a.get("name", "") for a in tr.get("artists", [])])
-            album = tr.get("album", {}) or {}
-            images = album.get("images", []) or []
-            artwork = images[0]["url"] if images else None
-            tracks.append(
-                {
-                    "id": tr.get("id"),
-                    "provider_track_uri": f"spotify:track:{tr.get('id')}" if tr.get("id") else None,
-                    "title": tr.get("name"),
-                    "artist": artists,
-                    "artwork_url": artwork,
-                    "duration_ms": tr.get("duration_ms"),
-                    "popularity": tr.get("popularity"),
-                    "album": album.get("name"),
-                    "album_release_date": album.get("release_date"),
-                    # keep original artists list for later enrichment
-                    "artists_raw": tr.get("artists", []),
-                }
-            )
-        return tracks
+            yield _normalize_track(tr)
+            yielded += 1
+            if max_tracks is not None and yielded >= max_tracks:
+                return
+        # `next` already carries offset/limit/fields
+        url, params = page.get("next"), None
+
+
+async def get_playlist_tracks(playlist_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Fetch the first `limit` tracks from a playlist. We only need basic track info.
+    """
+    return [t async for t in iter_playlist_tracks(playlist_id, max_tracks=limit)]
+
+
+async def sample_playlist_tracks(
+    playlist_id: str, k: int, rng: Optional[random.Random] = None
+) -> List[Dict[str, Any]]:
+    """
+    Uniform sample of k tracks from anywhere in the playlist (reservoir sampling
+    over the stream), without holding the whole playlist in memory.
+    """
+    rng = rng or random.Random()
+    reservoir: List[Dict[str, Any]] = []
+    n = 0
+    async for t in iter_playlist_tracks(playlist_id):
+        n += 1
+        if len(reservoir) < k:
+            reservoir.append(t)
+        else:
+            j = rng.randrange(n)
+            if j < k:
+                reservoir[j] = t
+    return reservoir
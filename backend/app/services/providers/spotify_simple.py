@@ -5,9 +5,8 @@ import os
 import base64
 from typing import Any, Dict, List, Optional, Tuple
 
-import httpx
-
 from app.settings import settings
+from app.services.providers import http
 
 # ---------------------------
 # Token: client credentials
@@ -25,17 +24,17 @@ async def _get_app_token() -> str:
         f"{settings.SPOTIFY_CLIENT_ID}:{settings.SPOTIFY_CLIENT_SECRET}".encode("utf-8")
     ).decode("utf-8")
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.post(
-            "https://accounts.spotify.com/api/token",
-            headers={"Authorization": f"Basic {auth}"},
-            data={"grant_type": "client_credentials"},
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        _app_token = data["access_token"]
-        _app_token_exp = now + int(data.get("expires_in", 3600))
-        return _app_token
+    resp = await http.post(
+        "spotify",
+        f"{settings.SPOTIFY_ACCOUNTS_BASE}/api/token",
+        headers={"Authorization": f"Basic {auth}"},
+        data={"grant_type": "client_credentials"},
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    _app_token = data["access_token"]
+    _app_token_exp = now + int(data.get("expires_in", 3600))
+    return _app_token
 
 # ---------------------------
 # Search (fallback)
@@ -52,15 +51,16 @@ async def search_tracks(query: str, limit: int = 20, market: str = "US") -> List
         "limit": min(max(limit, 1), 50),
         "market": market,
     }
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.get(
-            "https://api.spotify.com/v1/search",
-            headers={"Authorization": f"Bearer {token}"},
-            params=params,
-        )
-        r.raise_for_status()
-        items = r.json().get("tracks", {}).get("items", []) or []
-        return [ _track_from_spotify_item(it) for it in items ]
+    r = await http.get(
+        "spotify",
+        f"{settings.SPOTIFY_API_BASE}/search",
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+        hedge=True,
+    )
+    r.raise_for_status()
+    items = r.json().get("tracks", {}).get("items", []) or []
+    return [ _track_from_spotify_item(it) for it in items ]
 
 # ---------------------------
 # Recommendations (preferred)
@@ -117,15 +117,16 @@ async def recommend_tracks(seed: Dict[str, Any], limit: int = 20, market: str =
     if seed.get("bpm") is not None:
         params["target_tempo"] = int(seed["bpm"])
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        r = await client.get(
-            "https://api.spotify.com/v1/recommendations",
-            headers={"Authorization": f"Bearer {token}"},
-            params=params,
-        )
-        r.raise_for_status()
-        items = r.json().get("tracks", []) or []
-        return [ _track_from_spotify_item(it) for it in items ]
+    r = await http.get(
+        "spotify",
+        f"{settings.SPOTIFY_API_BASE}/recommendations",
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+        hedge=True,
+    )
+    r.raise_for_status()
+    items = r.json().get("tracks", []) or []
+    return [ _track_from_spotify_item(it) for it in items ]
 
 # ---------------------------
 # Mapping helpers
@@ -149,6 +150,8 @@ def _track_from_spotify_item(it: Dict[str, Any]) -> Dict[str, Any]:
         "popularity": it.get("popularity"),
         "album": album.get("name"),
         "album_release_date": album.get("release_date"),
+        # keep original artists list for diversification / enrichment
+        "artists_raw": it.get("artists", []),
     }
 
 def to_feed_card(t: Dict[str, Any], reason: str) -> Dict[str, Any]:
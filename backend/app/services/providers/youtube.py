@@ -1,13 +1,13 @@
 from __future__ import annotations
 from typing import Optional, Dict, Any
-from app.services.recsys.clip_selector import choose_clip_window
+from app.services.recsys.clip_selector import clip_window_for
 
 async def resolve_preview(track) -> Optional[Dict[str, Any]]:
     if track.provider != "youtube":
         return None
     # For YouTube, the frontend uses <iframe> with start param.
     # There’s no official "end" param that hard-stops; you’ll stop via JS timer.
-    start_ms, duration_ms = choose_clip_window(track.duration_ms, track.features_json)
+    start_ms, duration_ms = clip_window_for(track)
     # provider_track_id should be the YouTube videoId like "dQw4w9WgXcQ"
     return {
         "provider": "youtube",
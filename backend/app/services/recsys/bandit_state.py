@@ -1,11 +1,14 @@
 # app/services/recsys/bandit_state.py
 from __future__ import annotations
-import json
-from typing import Literal
+from collections import defaultdict
+from typing import Iterable, Literal, Sequence, Tuple
 from app.services.cache import get_redis
 
 EventType = Literal["like", "skip"]
 
+STATE_TTL_S = 60 * 60 * 24  # 24h, keeps state fresh
+DELTAS: dict[str, float] = {"like": 1.0, "skip": -0.5}
+
 def _k_user(user_id: str) -> str:
     return f"bandit:user:{user_id}:weights"
 
@@ -14,15 +17,44 @@ async def nudge(user_id: str, track_id: str, event: EventType) -> None:
     Minimal nudge: like => +1, skip => -0.5 on per-track score (ephemeral).
     Your reranker can fetch this and add to score.
     """
-    r = await get_redis()
-    key = _k_user(user_id)
-    delta = 1.0 if event == "like" else -0.5
-    await r.zincrby(key, delta, track_id)
-    # optional TTL to keep state fresh
-    await r.expire(key, 60 * 60 * 24)  # 24h
+    await nudge_many([(user_id, track_id, event)])
+
+async def nudge_many(events: Iterable[Tuple[str, str, EventType]]) -> int:
+    """
+    Apply many (user_id, track_id, event) nudges in a single round trip.
+    Deltas for the same (user, track) are summed client-side first, so a burst of
+    swipes on one card costs one ZINCRBY. Returns the number of events applied.
+    """
+    deltas: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    n = 0
+    for user_id, track_id, event in events:
+        delta = DELTAS.get(event)
+        if delta is None or not user_id or not track_id:
+            continue
+        deltas[user_id][track_id] += delta
+        n += 1
+    if not n:
+        return 0
 
-async def get_scores(user_id: str) -> dict[str, float]:
-    r = await get_redis()
-    key = _k_user(user_id)
-    pairs = await r.zrevrange(key, 0, -1, withscores=True)
-    return {tid.decode() if isinstance(tid, bytes) else tid: float(s) for tid, s in pairs}
+    r = get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for user_id, per_track in deltas.items():
+            key = _k_user(user_id)
+            for track_id, delta in per_track.items():
+                if delta:
+                    pipe.zincrby(key, delta, track_id)
+            pipe.expire(key, STATE_TTL_S)
+        await pipe.execute()
+    return n
+
+async def get_scores(user_id: str, track_ids: Sequence[str]) -> dict[str, float]:
+    """
+    Scores for just the candidates being ranked (one ZMSCORE). Tracks without
+    any feedback are omitted from the result.
+    """
+    ids = [tid for tid in dict.fromkeys(track_ids) if tid]
+    if not ids:
+        return {}
+    r = get_redis()
+    scores = await r.zmscore(_k_user(user_id), ids)
+    return {tid: float(s) for tid, s in zip(ids, scores) if s is not None}
@@ -1,9 +1,20 @@
 # v1 heuristics + optional use of any analysis we may have in features_json
 from __future__ import annotations
+from collections import OrderedDict
 from typing import Optional, Tuple, Dict, Any
-import random
+import base64
+import json
+import zlib
+
+import numpy as np
 
 DEFAULT_MS = 20000  # 20s sampler
+MIN_CONFIDENCE = 0.3
+CLIP_CACHE_SIZE = 50000
+
+# Compact section analysis: float32 rows of (start_s, duration_s, energy, confidence),
+# base64-encoded under features_json["analysis"]["sections_packed"].
+SECTION_COLS = ("start", "duration", "energy", "confidence")
 
 def _safe_int(v, fallback):
     try:
@@ -11,14 +22,94 @@ def _safe_int(v, fallback):
     except Exception:
         return fallback
 
+def pack_sections(sections: list) -> str:
+    rows = []
+    for s in sections or []:
+        if not isinstance(s, dict):
+            continue
+        try:
+            rows.append((
+                float(s.get("start", 0.0)),
+                float(s.get("duration", 0.0)),
+                float(s.get("energy", s.get("loudness", -20.0))),
+                float(s.get("confidence", 0.0)),
+            ))
+        except (TypeError, ValueError):
+            continue
+    arr = np.asarray(rows, dtype=np.float32).reshape(-1, len(SECTION_COLS))
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+def unpack_sections(packed: str) -> np.ndarray:
+    raw = base64.b64decode(packed)
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, len(SECTION_COLS))
+
+def compact_analysis(features: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Called at ingest: replace analysis["sections"] (list of dicts) with the packed
+    array so preview resolution never re-parses per-section dicts.
+    """
+    if not isinstance(features, dict):
+        return features
+    analysis = features.get("analysis")
+    if not isinstance(analysis, dict) or not isinstance(analysis.get("sections"), list):
+        return features
+    out = dict(features)
+    out["analysis"] = {k: v for k, v in analysis.items() if k != "sections"}
+    out["analysis"]["sections_packed"] = pack_sections(analysis["sections"])
+    return out
+
+def _sections_array(features_json: Any) -> Optional[np.ndarray]:
+    if isinstance(features_json, str):
+        try:
+            features_json = json.loads(features_json)
+        except Exception:
+            return None
+    analysis = features_json.get("analysis") if isinstance(features_json, dict) else None
+    if not isinstance(analysis, dict):
+        return None
+    packed = analysis.get("sections_packed")
+    if isinstance(packed, str) and packed:
+        try:
+            return unpack_sections(packed)
+        except Exception:
+            return None
+    # legacy rows that were ingested before packing
+    sections = analysis.get("sections")
+    if isinstance(sections, list) and sections:
+        return unpack_sections(pack_sections(sections))
+    return None
+
+def best_section_start(sections: np.ndarray, desired_ms: int = DEFAULT_MS) -> Optional[int]:
+    """
+    Vectorized pick of the highest-energy section that is long enough and confident
+    enough; returns a start that centers our window in it, or None.
+    """
+    if sections.size == 0:
+        return None
+    start_s, dur_s, energy, conf = sections.T
+    ok = (dur_s * 1000 >= desired_ms) & (conf >= MIN_CONFIDENCE)
+    if not ok.any():
+        return None
+    i = int(np.argmax(np.where(ok, energy, -np.inf)))
+    center_ms = int(start_s[i] * 1000) + int((float(dur_s[i]) * 1000 - desired_ms) / 2)
+    return max(center_ms, 0)
+
+def _stable_between(track_key: Optional[str], lo: int, hi: int) -> int:
+    """Deterministic stand-in for randint(lo, hi): same track → same clip."""
+    if hi <= lo:
+        return lo
+    h = zlib.crc32((track_key or "").encode("utf-8"))
+    return lo + h % (hi - lo + 1)
+
 def choose_clip_window(track_duration_ms: Optional[int],
                        features_json: Optional[Dict[str, Any]] = None,
-                       desired_ms: int = DEFAULT_MS) -> Tuple[int, int]:
+                       desired_ms: int = DEFAULT_MS,
+                       track_key: Optional[str] = None) -> Tuple[int, int]:
     """
     Returns (start_ms, duration_ms) for a short sampler window.
     Heuristics:
-      - If we have analysis with 'sections'/'segments', pick the highest energy section (middle of it).
-      - Else fallback:
+      - If we have analysis with sections, pick the highest energy section (middle of it).
+      - Else fallback (offset derived from track_key, so it is stable per track):
          * if duration > 2:30, start at ~45–75s
          * if 1:30–2:30, start at ~30–45s
          * else start at 0–10s
@@ -26,35 +117,75 @@ def choose_clip_window(track_duration_ms: Optional[int],
     d = _safe_int(track_duration_ms, 0)
     # Try to use analysis if present
     if features_json:
-        # Example expected shapes (store these when ingesting later):
-        # features_json["analysis"]["sections"] = [{"start": sec, "duration": dur, "loudness": x, "confidence": y, "energy": z}, ...]
-        analysis = features_json.get("analysis") if isinstance(features_json, dict) else None
-        sections = (analysis or {}).get("sections") if isinstance(analysis, dict) else None
-        if sections and isinstance(sections, list):
-            # pick highest (energy or loudness) section with decent confidence and at least desired_ms
-            scored = []
-            for s in sections:
-                start_s = float(s.get("start", 0.0))
-                dur_s   = float(s.get("duration", 0.0))
-                energy  = float(s.get("energy", s.get("loudness", -20.0)))
-                conf    = float(s.get("confidence", 0.0))
-                if dur_s * 1000 >= desired_ms and conf >= 0.3:
-                    scored.append((energy, start_s, dur_s))
-            if scored:
-                scored.sort(reverse=True, key=lambda x: x[0])
-                _, start_s, dur_s = scored[0]
-                start_ms = int(start_s * 1000)
-                # center our window in the section if possible
-                center_ms = start_ms + int((dur_s * 1000 - desired_ms) / 2)
-                return max(center_ms, 0), desired_ms
+        sections = _sections_array(features_json)
+        if sections is not None:
+            start_ms = best_section_start(sections, desired_ms)
+            if start_ms is not None:
+                return start_ms, desired_ms
 
     # Fallback heuristic
     if d >= 150000:        # > 2:30
-        start_ms = random.randint(45000, min(75000, max(0, d - desired_ms)))
+        start_ms = _stable_between(track_key, 45000, min(75000, max(0, d - desired_ms)))
     elif d >= 90000:       # 1:30–2:30
-        start_ms = random.randint(30000, min(45000, max(0, d - desired_ms)))
+        start_ms = _stable_between(track_key, 30000, min(45000, max(0, d - desired_ms)))
     elif d > 0:
-        start_ms = random.randint(0, max(0, min(10000, d - desired_ms)))
+        start_ms = _stable_between(track_key, 0, max(0, min(10000, d - desired_ms)))
     else:
         start_ms = 30000  # unknown, safe default
     return start_ms, desired_ms
+
+# ---------------------------
+# Per-track clip window cache
+# ---------------------------
+_clip_cache: "OrderedDict[tuple, Tuple[int, int]]" = OrderedDict()
+
+def _analysis_version(track) -> Any:
+    """
+    Cheap stand-in for "which analysis is this", so a re-ingested track gets a new
+    window without hashing the analysis on every lookup: the row's updated_at
+    (bumped by every ingest / catalog write) when the object has one, else the size
+    and ends of the packed sections (O(1) slices), else the section count.
+    """
+    updated_at = getattr(track, "updated_at", None)
+    if updated_at is not None:
+        return updated_at
+    features_json = getattr(track, "features_json", None)
+    if isinstance(features_json, str):
+        return len(features_json)
+    analysis = features_json.get("analysis") if isinstance(features_json, dict) else None
+    if not isinstance(analysis, dict):
+        return None
+    packed = analysis.get("sections_packed")
+    if isinstance(packed, str) and packed:
+        return len(packed), packed[:24], packed[-24:]
+    sections = analysis.get("sections")
+    return len(sections) if isinstance(sections, list) else None
+
+def clip_window_for(track, desired_ms: int = DEFAULT_MS) -> Tuple[int, int]:
+    """
+    Cached choose_clip_window for a Track-like object. The result only depends on
+    the track and its section analysis, so after the first resolution this is an
+    O(1) dict lookup.
+    """
+    key = (
+        getattr(track, "provider", None),
+        getattr(track, "provider_track_id", None),
+        getattr(track, "duration_ms", None),
+        _analysis_version(track),
+        desired_ms,
+    )
+    hit = _clip_cache.get(key)
+    if hit is not None:
+        _clip_cache.move_to_end(key)
+        return hit
+
+    window = choose_clip_window(
+        track.duration_ms,
+        getattr(track, "features_json", None),
+        desired_ms=desired_ms,
+        track_key=f"{key[0]}:{key[1]}",
+    )
+    _clip_cache[key] = window
+    if len(_clip_cache) > CLIP_CACHE_SIZE:
+        _clip_cache.popitem(last=False)
+    return window
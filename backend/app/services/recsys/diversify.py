@@ -0,0 +1,102 @@
+# app/services/recsys/diversify.py
+from __future__ import annotations
+from typing import Optional, Sequence
+import numpy as np
+
+DEFAULT_LAMBDA = 0.7      # 1.0 = pure relevance, 0.0 = pure diversity
+ARTIST_WEIGHT = 0.5       # extra similarity for two tracks by the same artist
+ALBUM_WEIGHT = 0.25       # ... and again if they're off the same album
+
+
+def _normalize_relevance(rel: np.ndarray) -> np.ndarray:
+    # min-max to [0, 1] so lambda means the same thing for any scorer
+    lo, hi = float(rel.min()), float(rel.max())
+    if hi - lo < 1e-12:
+        return np.ones_like(rel)
+    return (rel - lo) / (hi - lo)
+
+
+def _unit_rows(features: np.ndarray) -> np.ndarray:
+    # center each column so cosine measures "how alike", then L2-normalize rows;
+    # all-zero rows (no features) stay zero and are similar to nothing
+    x = features - features.mean(axis=0, keepdims=True)
+    std = x.std(axis=0, keepdims=True)
+    x = x / np.where(std > 1e-12, std, 1.0)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.where(norms > 1e-12, norms, 1.0)
+
+
+def _label_codes(labels: Optional[Sequence[Optional[str]]], n: int) -> Optional[np.ndarray]:
+    """Integer codes per label; missing labels get unique negative codes so they never match."""
+    if labels is None:
+        return None
+    keys = [(lbl or "").strip().lower() for lbl in labels]
+    _, codes = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    codes = codes.astype(np.int64)
+    missing = np.array([not k for k in keys], dtype=bool)
+    codes[missing] = -np.arange(1, int(missing.sum()) + 1)
+    return codes
+
+
+def mmr_select(
+    relevance: Sequence[float] | np.ndarray,
+    features: np.ndarray,
+    k: int,
+    lam: float = DEFAULT_LAMBDA,
+    artists: Optional[Sequence[Optional[str]]] = None,
+    albums: Optional[Sequence[Optional[str]]] = None,
+    artist_weight: float = ARTIST_WEIGHT,
+    album_weight: float = ALBUM_WEIGHT,
+) -> list[int]:
+    """
+    Greedy Maximal Marginal Relevance. Returns indices of the k picked items in order.
+
+    Each step picks argmax( lam * rel_i - (1 - lam) * max_{j in picked} sim(i, j) ),
+    where sim is cosine in (standardized) feature space plus a bonus for a shared
+    artist / album. We only keep a running max-similarity vector, so a step is one
+    matrix-vector product: O(k * n * d) overall, fine for thousands of candidates.
+    """
+    rel = np.asarray(relevance, dtype=float).reshape(-1)
+    n = rel.shape[0]
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return []
+
+    lam = float(min(max(lam, 0.0), 1.0))
+    rel = _normalize_relevance(rel)
+    x = np.asarray(features, dtype=float).reshape(n, -1)
+    x = _unit_rows(x) if x.shape[1] else x
+    artist_codes = _label_codes(artists, n)
+    album_codes = _label_codes(albums, n)
+
+    max_sim = np.zeros(n, dtype=float)
+    available = np.ones(n, dtype=bool)
+    picked: list[int] = []
+
+    for _ in range(k):
+        score = lam * rel - (1.0 - lam) * max_sim
+        score[~available] = -np.inf
+        j = int(np.argmax(score))
+        picked.append(j)
+        available[j] = False
+
+        sim = x @ x[j] if x.shape[1] else np.zeros(n, dtype=float)
+        if artist_codes is not None:
+            sim = sim + artist_weight * (artist_codes == artist_codes[j])
+        if album_codes is not None:
+            sim = sim + album_weight * (album_codes == album_codes[j])
+        np.maximum(max_sim, sim, out=max_sim)
+
+    return picked
+
+
+def session_lambda(seed: dict | None, default: float = DEFAULT_LAMBDA) -> float:
+    """
+    MMR lambda for a session. The seed stores `diversity` (0..1, 1.0 = max variety),
+    which is the opposite end of lambda (1.0 = pure relevance): lam = 1 - diversity.
+    """
+    try:
+        v = (seed or {}).get("diversity")
+        return default if v is None else 1.0 - float(min(max(float(v), 0.0), 1.0))
+    except Exception:
+        return default
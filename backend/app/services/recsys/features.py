@@ -1,11 +1,26 @@
 import json
+from typing import Any, Optional
+
 import numpy as np
 
 FEATURE_KEYS = ["tempo", "energy", "valence", "danceability", "loudness", "popularity"]
 
+def features_dict(value: Any) -> Optional[dict]:
+    # features_json is JSONB (a dict); plain strings only come from callers that
+    # still serialize by hand
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    return None
+
 def feature_vector(track) -> np.ndarray:
-    if not track.features_json:
+    f = features_dict(getattr(track, "features_json", None))
+    if not f:
         return np.zeros(len(FEATURE_KEYS), dtype=float)
-    f = json.loads(track.features_json)
-    vals = [float(f.get(k, 0.0)) for k in FEATURE_KEYS]
+    vals = [float(f.get(k) or 0.0) for k in FEATURE_KEYS]
     return np.array(vals, dtype=float)
@@ -1,18 +1,41 @@
+import logging
 import numpy as np
-from typing import List
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
 from .features import feature_vector
+from .bandit_state import get_scores
+from .diversify import mmr_select, DEFAULT_LAMBDA
 
-async def rerank_bandit(user_id: str, session_id: str, candidates: List, k: int = 10):
-    scored = []
-    seen_artists = set()
-    for tr in candidates:
-        x = feature_vector(tr)
-        theta = np.array(tr.theta_user, dtype=float)
-        base = float(theta @ x)
-        explore = np.random.normal(0, 0.05)
-        div_penalty = 0.15 if tr.artist in seen_artists else 0.0
-        score = base + explore - div_penalty
-        scored.append((score, tr))
-        seen_artists.add(tr.artist)
-    scored.sort(key=lambda t: t[0], reverse=True)
-    return [t for _, t in scored[:k]]
+logger = logging.getLogger(__name__)
+
+ScoreSource = Callable[[str, Sequence[str]], Awaitable[Dict[str, float]]]
+
+
+async def rerank_bandit(user_id: str, session_id: str, candidates: List, k: int = 10,
+                        lam: float = DEFAULT_LAMBDA, scores: Optional[ScoreSource] = None):
+    """`scores` defaults to the live Redis feedback (bandit_state.get_scores)."""
+    if not candidates:
+        return []
+
+    # per-track feedback scores for just these candidates; ranking still works without Redis
+    try:
+        feedback = await (scores or get_scores)(user_id, [tr.id for tr in candidates])
+    except Exception as e:
+        logger.warning("bandit scores unavailable: %s", e)
+        feedback = {}
+
+    x = np.stack([feature_vector(tr) for tr in candidates])
+    theta = np.array([tr.theta_user for tr in candidates], dtype=float)
+    base = np.einsum("ij,ij->i", theta, x)
+    base += np.array([feedback.get(tr.id, 0.0) for tr in candidates])
+    explore = np.random.normal(0, 0.05, size=len(candidates))
+
+    # diversity is handled by MMR over features + artist/album instead of a flat penalty
+    order = mmr_select(
+        base + explore,
+        x,
+        k=k,
+        lam=lam,
+        artists=[getattr(tr, "artist", None) for tr in candidates],
+        albums=[getattr(tr, "album", None) for tr in candidates],
+    )
+    return [candidates[i] for i in order]
@@ -1,7 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from app.models.track import Track
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from app.models.track import Track, feature_expr
+
+# (low, high) per feature; either bound may be None
+FeatureRanges = Mapping[str, Tuple[Optional[float], Optional[float]]]
+
+BPM_TOLERANCE = 5.0
+ENERGY_TOLERANCE = 0.15
 
 class Cand:
     # thin wrapper used by bandit
@@ -11,12 +17,46 @@ class Cand:
         self.provider_track_id = row.provider_track_id
         self.title = row.title
         self.artist = row.artist
+        self.album = row.album
+        self.duration_ms = row.duration_ms
         self.artwork_url = row.artwork_url
         self.features_json = row.features_json
         self.tags = []
         self.theta_user = [0.1, 0.2, 0.1, 0.2, -0.1, 0.1]  # placeholder
 
-async def get_candidates(db: AsyncSession, user_id: str, session_id: str, limit: int = 50) -> List[Cand]:
-    # v1: naive – recent tracks or popular set; later: FAISS similarity
-    rows = (await db.execute(select(Track).limit(limit))).scalars().all()
+def seed_feature_ranges(seed: Optional[Dict[str, Any]]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Feature windows implied by a session seed (bpm / energy from a branched track)."""
+    ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+    if not isinstance(seed, dict):
+        return ranges
+    try:
+        if seed.get("bpm"):
+            bpm = float(seed["bpm"])
+            ranges["tempo"] = (bpm - BPM_TOLERANCE, bpm + BPM_TOLERANCE)
+        if seed.get("energy") is not None:
+            energy = float(seed["energy"])
+            ranges["energy"] = (max(0.0, energy - ENERGY_TOLERANCE), min(1.0, energy + ENERGY_TOLERANCE))
+    except (TypeError, ValueError):
+        pass
+    return ranges
+
+def feature_predicates(ranges: Optional[FeatureRanges]) -> list:
+    # e.g. energy > 0.7 AND tempo BETWEEN 120 AND 130, evaluated by Postgres
+    # against the ix_tracks_feature_* expression indexes
+    preds = []
+    for key, (lo, hi) in (ranges or {}).items():
+        expr = feature_expr(key)
+        if lo is not None and hi is not None:
+            preds.append(expr.between(lo, hi))
+        elif lo is not None:
+            preds.append(expr >= lo)
+        elif hi is not None:
+            preds.append(expr <= hi)
+    return preds
+
+async def get_candidates(db: AsyncSession, user_id: str, session_id: str, limit: int = 50,
+                         ranges: Optional[FeatureRanges] = None) -> List[Cand]:
+    # v1: naive – recent tracks or popular set, narrowed by feature ranges; later: FAISS similarity
+    stmt = select(Track).where(*feature_predicates(ranges)).limit(limit)
+    rows = (await db.execute(stmt)).scalars().all()
     return [Cand(r) for r in rows]
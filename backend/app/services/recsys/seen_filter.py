@@ -0,0 +1,99 @@
+# app/services/recsys/seen_filter.py
+from __future__ import annotations
+import time
+from collections import defaultdict
+from typing import Iterable, Sequence, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.settings import settings
+from app.services.cache import get_redis
+from app.models.events import FeedEvent
+
+# Per-user "already served / swiped" set, kept as a capped sorted set
+# (member = track_id, score = last-seen epoch seconds). Oldest entries fall off
+# once a user passes SEEN_MAX_PER_USER, so memory per user is bounded.
+
+
+def _k_seen(user_id: str) -> str:
+    return f"seen:user:{user_id}"
+
+
+def _k_empty(user_id: str) -> str:
+    # short-lived "backfill found nothing" marker, so cold users don't rescan feed_events
+    return f"seen:empty:{user_id}"
+
+
+def _ttl_s() -> int:
+    return int(settings.SEEN_TTL_DAYS * 86400)
+
+
+async def mark_seen(user_id: str, track_ids: Sequence[str], ts: float | None = None) -> None:
+    await mark_seen_many(((user_id, tid) for tid in track_ids), ts=ts)
+
+
+async def mark_seen_many(pairs: Iterable[Tuple[str, str]], ts: float | None = None) -> None:
+    """Add (user_id, track_id) pairs; one pipeline for all users."""
+    now = ts if ts is not None else time.time()
+    by_user: dict[str, dict[str, float]] = defaultdict(dict)
+    for user_id, track_id in pairs:
+        if user_id and track_id:
+            by_user[user_id][track_id] = now
+    if not by_user:
+        return
+
+    cap = settings.SEEN_MAX_PER_USER
+    r = get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for user_id, mapping in by_user.items():
+            key = _k_seen(user_id)
+            pipe.zadd(key, mapping)
+            # keep only the newest `cap` members
+            pipe.zremrangebyrank(key, 0, -(cap + 1))
+            pipe.expire(key, _ttl_s())
+        await pipe.execute()
+
+
+async def seen_track_ids(user_id: str, track_ids: Sequence[str]) -> Tuple[set[str], bool]:
+    """
+    Which of these candidates the user has already seen, in one round trip.
+    Also returns whether the user's set exists at all (False => cold, see backfill_seen);
+    a user whose backfill recently came back empty counts as existing.
+    """
+    ids = [tid for tid in dict.fromkeys(track_ids) if tid]
+    if not ids:
+        return set(), True
+    r = get_redis()
+    key = _k_seen(user_id)
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.exists(key, _k_empty(user_id))
+        pipe.zmscore(key, ids)
+        exists, scores = await pipe.execute()
+    return {tid for tid, s in zip(ids, scores) if s is not None}, bool(exists)
+
+
+async def backfill_seen(db: AsyncSession, user_id: str) -> set[str]:
+    """
+    Rebuild a cold (expired / never built) seen set from feed_events.
+    Only the newest SEEN_MAX_PER_USER tracks are loaded; returns their ids.
+    """
+    rows = await db.execute(
+        select(FeedEvent.track_id, func.max(FeedEvent.created_at).label("ts"))
+        .where(FeedEvent.user_id == user_id)
+        .group_by(FeedEvent.track_id)
+        .order_by(func.max(FeedEvent.created_at).desc())
+        .limit(settings.SEEN_MAX_PER_USER)
+    )
+    mapping = {tid: ts.timestamp() for tid, ts in rows if tid and ts is not None}
+    r = get_redis()
+    if not mapping:
+        # until the first mark_seen creates the set, remember there's nothing to load
+        await r.set(_k_empty(user_id), "1", ex=settings.SEEN_EMPTY_TTL_S)
+        return set()
+    key = _k_seen(user_id)
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.zadd(key, mapping)
+        pipe.expire(key, _ttl_s())
+        await pipe.execute()
+    return set(mapping)
@@ -0,0 +1,195 @@
+# app/services/resilience.py
+"""
+Fail-fast building blocks for upstream calls (Spotify, OpenAI, ...).
+
+- CircuitBreaker: after N consecutive failures the circuit opens and calls fail
+  immediately with CircuitOpen for `reset_timeout_s`; then a single probe is let
+  through (half-open) and its outcome closes or re-opens the circuit.
+- LatencyTracker: rolling window of recent latencies, used to pick hedge delays.
+- hedged(): run an idempotent call, and if it hasn't finished after `delay_s`,
+  fire a second attempt; the first to succeed wins and the other is cancelled.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.settings import settings
+from app.services.metrics import CIRCUIT_REJECTIONS, CIRCUIT_TRANSITIONS, UPSTREAM_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_s:
+            return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (claims the probe slot when half-open)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_inflight:
+            if self._state != HALF_OPEN:
+                CIRCUIT_TRANSITIONS.labels(upstream=self.name, state=HALF_OPEN).inc()
+            self._state = HALF_OPEN
+            self._probe_inflight = True
+            return True
+        return False
+
+    def check(self) -> None:
+        if not self.allow():
+            CIRCUIT_REJECTIONS.labels(upstream=self.name).inc()
+            raise CircuitOpen(f"{self.name} circuit open")
+
+    def record_success(self) -> None:
+        if self._state != CLOSED:
+            logger.info("%s circuit closed", self.name)
+            CIRCUIT_TRANSITIONS.labels(upstream=self.name, state=CLOSED).inc()
+        self._state = CLOSED
+        self._failures = 0
+        self._probe_inflight = False
+
+    def record_failure(self) -> None:
+        self._probe_inflight = False
+        if self._state == HALF_OPEN:
+            self._trip()
+            return
+        self._failures += 1
+        if self._state == CLOSED and self._failures >= self.failure_threshold:
+            self._trip()
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without recording an outcome."""
+        self._probe_inflight = False
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        CIRCUIT_TRANSITIONS.labels(upstream=self.name, state=OPEN).inc()
+        logger.warning("%s circuit open for %.0fs", self.name, self.reset_timeout_s)
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        self.check()
+        t0 = time.perf_counter()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self.release()  # our caller gave up; says nothing about the upstream
+            raise
+        except Exception:
+            self.record_failure()
+            UPSTREAM_SECONDS.labels(upstream=self.name, outcome="error").observe(time.perf_counter() - t0)
+            raise
+        self.record_success()
+        UPSTREAM_SECONDS.labels(upstream=self.name, outcome="ok").observe(time.perf_counter() - t0)
+        return result
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p in [0, 100]; None until there are enough samples to mean anything."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+async def hedged(fn: Callable[[], Awaitable[T]], delay_s: Optional[float]) -> T:
+    """
+    Await fn(); if it's still running after delay_s, start a second fn() and return
+    whichever succeeds first. Only for idempotent calls. delay_s=None disables hedging.
+    """
+    if delay_s is None:
+        return await fn()
+
+    first = asyncio.ensure_future(fn())
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay_s)
+    except BaseException:
+        first.cancel()  # our caller was cancelled: don't leave the request running
+        raise
+    if done:
+        return first.result()
+
+    second = asyncio.ensure_future(fn())
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    # an attempt cancelled from elsewhere (e.g. the client shut down)
+                    error = error or asyncio.CancelledError()
+                    continue
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+# ---------------------------
+# Per-upstream registry
+# ---------------------------
+_breakers: Dict[str, CircuitBreaker] = {}
+_latency: Dict[str, LatencyTracker] = {}
+
+
+def breaker(upstream: str) -> CircuitBreaker:
+    b = _breakers.get(upstream)
+    if b is None:
+        b = _breakers[upstream] = CircuitBreaker(
+            upstream,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout_s=settings.CIRCUIT_RESET_TIMEOUT_S,
+        )
+    return b
+
+
+def latency(upstream: str) -> LatencyTracker:
+    t = _latency.get(upstream)
+    if t is None:
+        t = _latency[upstream] = LatencyTracker()
+    return t
+
+
+def is_open(upstream: str) -> bool:
+    return breaker(upstream).state == OPEN
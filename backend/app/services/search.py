@@ -3,6 +3,10 @@ from __future__ import annotations
 import os
 from tavily import TavilyClient
 
+from app.settings import settings
+from app.services.resilience import breaker
+from app.services.telemetry import stage
+
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
 class SearchUnavailable(Exception):
@@ -11,7 +15,7 @@ class SearchUnavailable(Exception):
 def get_tavily_client():
     if not TAVILY_API_KEY:
         raise SearchUnavailable("TAVILY_API_KEY not set")
-    return TavilyClient(api_key=TAVILY_API_KEY)
+    return TavilyClient(api_key=TAVILY_API_KEY, api_base_url=settings.TAVILY_BASE_URL)
 
 async def search_artist_news(artist_name: str) -> list[str]:
     """
@@ -30,16 +34,22 @@ async def search_artist_news(artist_name: str) -> list[str]:
         
         query = f"{artist_name} music artist recent news background"
         
-        # Run in thread to avoid blocking event loop
-        response = await asyncio.to_thread(
-            client.search,
-            query=query,
-            search_depth="basic",
-            max_results=3,
-            include_answer=False,
-            include_raw_content=False,
-            include_images=False,
-        )
+        # Run in thread to avoid blocking event loop; bounded wait, and the
+        # breaker skips Tavily entirely while it keeps failing. The Tavily client
+        # uses requests, not httpx, so it gets its own span.
+        with stage("tavily.search", artist=artist_name):
+            response = await breaker("tavily").call(lambda: asyncio.wait_for(
+                asyncio.to_thread(
+                    client.search,
+                    query=query,
+                    search_depth="basic",
+                    max_results=3,
+                    include_answer=False,
+                    include_raw_content=False,
+                    include_images=False,
+                ),
+                settings.TAVILY_TIMEOUT_S,
+            ))
         
         results = response.get("results", [])
         snippets = [r.get("content", "") for r in results if r.get("content")]
@@ -0,0 +1,82 @@
+# app/services/session_cache.py
+"""
+Read-through cache for sessions on the feed hot path.
+
+Sessions are immutable once created, so a cached copy never goes stale. Lookups
+go process LRU -> Redis -> Postgres, and create_session populates both layers
+so the first /feed after creating a session doesn't touch the database.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.settings import settings
+from app.services.cache import get_redis
+from app.services.metrics import cache_result
+from app.repositories.sessions import get_session
+
+logger = logging.getLogger(__name__)
+
+# {"id", "user_id", "seed"}
+CachedSession = Dict[str, Any]
+
+_lru: "OrderedDict[str, CachedSession]" = OrderedDict()
+
+
+def _k_session(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def _remember(entry: CachedSession) -> None:
+    _lru[entry["id"]] = entry
+    _lru.move_to_end(entry["id"])
+    while len(_lru) > settings.SESSION_CACHE_SIZE:
+        _lru.popitem(last=False)
+
+
+async def cache_session(session_id: str, user_id: str, seed: Optional[dict]) -> CachedSession:
+    entry = {"id": session_id, "user_id": user_id, "seed": seed if isinstance(seed, dict) else {}}
+    _remember(entry)
+    try:
+        await get_redis().set(_k_session(session_id), json.dumps(entry), ex=settings.SESSION_CACHE_TTL_S)
+    except Exception as e:
+        logger.warning("session cache write failed: %s", e)
+    return entry
+
+
+async def load_session(db: AsyncSession, session_id: str) -> Optional[CachedSession]:
+    """The session's id, user_id and seed dict, or None if it doesn't exist."""
+    hit = _lru.get(session_id)
+    if hit is not None:
+        _lru.move_to_end(session_id)
+        cache_result("session", "local")
+        return hit
+
+    try:
+        raw = await get_redis().get(_k_session(session_id))
+    except Exception as e:
+        logger.warning("session cache read failed: %s", e)
+        raw = None
+    if raw:
+        try:
+            entry = json.loads(raw)
+            _remember(entry)
+            cache_result("session", "redis")
+            return entry
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    cache_result("session", "miss")
+    s = await get_session(db, session_id)
+    if s is None:
+        return None
+    return await cache_session(s.id, s.user_id, s.seed_json)
+
+
+def clear_local() -> None:
+    _lru.clear()
@@ -0,0 +1,131 @@
+# app/services/telemetry.py
+"""
+OpenTelemetry tracing.
+
+init_telemetry() installs a tracer provider (ratio sampling, pluggable exporter)
+and turns on auto-instrumentation: FastAPI for server spans, plus httpx
+(Spotify / OpenAI), SQLAlchemy and Redis client spans when those
+instrumentation packages are installed. stage() wraps a block of request
+handling in a child span - get_feed uses it for each of its stages - and
+records the stage's latency histogram in app/services/metrics.py.
+
+With OTEL_ENABLED off nothing is installed and stage() spans are no-ops.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from app.settings import settings
+from app.services.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("app")
+
+_provider: Optional[TracerProvider] = None
+_file = None
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """
+    A child span of the current request, e.g. stage("feed.search"); its duration
+    also goes to the sampler_stage_seconds histogram (whether or not tracing is on).
+    """
+    t0 = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(name, attributes=attributes or None) as span:
+            yield span
+    finally:
+        STAGE_SECONDS.labels(stage=name).observe(time.perf_counter() - t0)
+
+
+def _make_exporter(kind: str) -> Optional[SpanExporter]:
+    global _file
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_ENDPOINT) if settings.OTEL_EXPORTER_ENDPOINT else OTLPSpanExporter()
+    if kind == "otlp_http":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as HTTPSpanExporter
+        return HTTPSpanExporter(endpoint=settings.OTEL_EXPORTER_ENDPOINT) if settings.OTEL_EXPORTER_ENDPOINT else HTTPSpanExporter()
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "file":
+        _file = open(settings.OTEL_FILE_PATH, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=_file, formatter=lambda span: span.to_json(indent=None) + "\n")
+    if kind == "none":
+        return None
+    raise ValueError(f"unknown OTEL_EXPORTER {kind!r}")
+
+
+def _instrument_clients() -> None:
+    # each instrumentation is its own optional package
+    try:
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        HTTPXClientInstrumentor().instrument()
+    except ImportError:
+        logger.info("opentelemetry-instrumentation-httpx not installed; no upstream HTTP spans")
+    try:
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        RedisInstrumentor().instrument()
+    except ImportError:
+        logger.info("opentelemetry-instrumentation-redis not installed; no Redis spans")
+
+
+def init_telemetry(app) -> None:
+    """
+    Call once when the app is created: FastAPI instrumentation adds middleware,
+    which Starlette refuses once the app has started serving.
+    """
+    global _provider
+    if not settings.OTEL_ENABLED or _provider is not None:
+        return
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME, "deployment.environment": settings.APP_ENV}),
+        sampler=ParentBased(TraceIdRatioBased(settings.OTEL_SAMPLE_RATIO)),
+    )
+    exporter = _make_exporter(settings.OTEL_EXPORTER)
+    if exporter is not None:
+        # console output is for eyeballing; don't batch it
+        processor = SimpleSpanProcessor(exporter) if settings.OTEL_EXPORTER == "console" else BatchSpanProcessor(exporter)
+        _provider.add_span_processor(processor)
+    trace.set_tracer_provider(_provider)
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_provider, excluded_urls="healthz,metrics")
+    _instrument_clients()
+    logger.info("tracing on: exporter=%s sample_ratio=%s", settings.OTEL_EXPORTER, settings.OTEL_SAMPLE_RATIO)
+
+
+def instrument_engine() -> None:
+    """SQLAlchemy spans; needs the engine, so call after init_engine()."""
+    if _provider is None:
+        return
+    try:
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    except ImportError:
+        logger.info("opentelemetry-instrumentation-sqlalchemy not installed; no DB spans")
+        return
+    from app.services.db import get_engine
+    SQLAlchemyInstrumentor().instrument(engine=get_engine().sync_engine, tracer_provider=_provider)
+
+
+def shutdown_telemetry() -> None:
+    """Flush buffered spans (on shutdown)."""
+    global _provider, _file
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = None
+    if _file is not None:
+        _file.close()
+    _file = None
@@ -15,8 +15,27 @@ class Settings(BaseSettings):
     PG_USER: str = "sampler"
     PG_PASSWORD: str = "sampler"
 
+    # Connection pool. DB_POOL_MODE: "queue" (pooled, default) | "null" (connect per checkout)
+    DB_POOL_MODE: str = "queue"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements cached per connection
+    # Set when PG_HOST/PG_PORT point at PgBouncer (or another transaction pooler):
+    # prepared statements can't be cached when the server connection changes per transaction.
+    DB_PGBOUNCER: bool = False
+
     REDIS_URL: str = "redis://redis:6379/0"
 
+    # Write-behind ingestion of /feedback events (batched multi-row INSERTs)
+    EVENTS_WRITE_BEHIND: bool = True
+    EVENTS_BATCH_SIZE: int = 500
+    EVENTS_FLUSH_INTERVAL_MS: int = 250
+    EVENTS_QUEUE_MAX: int = 50000
+    EVENTS_ENQUEUE_TIMEOUT_MS: int = 50  # then fall back to a direct write
+
     SPOTIFY_CLIENT_ID: str = ""
     SPOTIFY_CLIENT_SECRET: str = ""
     SPOTIFY_REDIRECT_URI: str = "http://127.0.0.1:8080/auth/spotify/callback"
@@ -25,6 +44,59 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4o-mini"
     TAVILY_API_KEY: Optional[str] = None
 
+    # Provider endpoints; point these at backend/loadtest/fakes.py for load tests
+    SPOTIFY_API_BASE: str = "https://api.spotify.com/v1"
+    SPOTIFY_ACCOUNTS_BASE: str = "https://accounts.spotify.com"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    TAVILY_BASE_URL: Optional[str] = None  # None = the client's default
+
+    # Feed diversification (MMR): 1.0 = pure relevance, 0.0 = max diversity.
+    # Sessions can override it via seed["diversity"] (0..1, used as 1 - lambda).
+    FEED_DIVERSITY_LAMBDA: float = 0.7
+
+    # Per-user seen-track filter (Redis sorted set, newest N kept)
+    SEEN_MAX_PER_USER: int = 5000
+    SEEN_TTL_DAYS: float = 30
+    SEEN_EMPTY_TTL_S: int = 300  # how long a user with no events skips the feed_events backfill
+
+    # Session cache for the feed hot path (sessions don't change once created):
+    # process-local LRU in front of Redis in front of Postgres
+    SESSION_CACHE_SIZE: int = 10000
+    SESSION_CACHE_TTL_S: int = 86400
+
+    # Local catalog read-through (Redis -> tracks/artists tables -> Spotify)
+    CATALOG_TRACK_TTL_DAYS: float = 30
+    CATALOG_ARTIST_TTL_DAYS: float = 7  # genres / popularity drift
+    CATALOG_FEATURES_RETRY_DAYS: float = 7  # before re-asking for features Spotify didn't have
+    CATALOG_REDIS_TTL_S: int = 6 * 3600
+
+    # Upstream calls (app/services/providers/http.py): timeouts, circuit breakers, hedging
+    UPSTREAM_TIMEOUT_S: float = 15.0
+    UPSTREAM_CONNECT_TIMEOUT_S: float = 3.0
+    SPOTIFY_TIMEOUT_S: float = 8.0
+    OPENAI_TIMEOUT_S: float = 25.0
+    TAVILY_TIMEOUT_S: float = 5.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive failures before the circuit opens
+    CIRCUIT_RESET_TIMEOUT_S: float = 30.0  # open → half-open (one probe request)
+    HEDGE_ENABLED: bool = True  # kill switch for call sites that pass hedge=True (small Spotify lookups)
+    HEDGE_PERCENTILE: float = 95.0
+    ETAG_CACHE_TTL_S: int = 7 * 86400  # conditional-GET bodies for Spotify catalog endpoints
+    ETAG_CACHE_LOCAL_MAX_BYTES: int = 16 * 1024 * 1024  # per process, summed response sizes
+
+    # Response compression (brotli when brotli-asgi is installed, gzip otherwise)
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies aren't worth the CPU
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Tracing (app/services/telemetry.py). OTEL_EXPORTER: "otlp" (gRPC) | "otlp_http" |
+    # "console" | "file" (JSON lines at OTEL_FILE_PATH, for offline runs) | "none"
+    OTEL_ENABLED: bool = False
+    OTEL_SERVICE_NAME: str = "sampler-api"
+    OTEL_EXPORTER: str = "otlp"
+    OTEL_EXPORTER_ENDPOINT: str | None = None  # default: the exporter's own (localhost:4317 / :4318)
+    OTEL_FILE_PATH: str = "traces.jsonl"
+    OTEL_SAMPLE_RATIO: float = 1.0  # of new traces; children follow their parent's decision
+
     # Loads env from backend/.env (relative to compose)
     model_config = SettingsConfigDict(env_file=[".env", "../.env"], env_file_encoding="utf-8")
 
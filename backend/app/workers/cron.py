@@ -0,0 +1,33 @@
+# app/workers/cron.py
+"""
+Tiny periodic runner for maintenance jobs.
+
+    python -m app.workers.cron --interval 900
+"""
+import argparse
+import asyncio
+import logging
+
+from app.services.db import init_engine
+from app.workers import rollup
+
+log = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    p = argparse.ArgumentParser(description="run periodic maintenance jobs")
+    p.add_argument("--interval", type=int, default=900, help="seconds between runs")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    await init_engine()
+    while True:
+        try:
+            await rollup.run_once()
+        except Exception as e:
+            log.exception("rollup failed: %s", e)
+        await asyncio.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,30 +1,481 @@
 # app/workers/ingest.py
-import asyncio, json
-from app.models.track import Track
+"""
+Bulk catalog loader.
+
+Streams track / audio-feature records from JSONL, CSV or Parquet files, validates
+them a batch at a time, COPYs each batch into a temp staging table over the raw
+asyncpg connection and merges it into `tracks` with INSERT ... ON CONFLICT.
+Every committed batch is checkpointed, so an interrupted run picks up where it
+stopped.
+
+    python -m app.workers.ingest catalog.jsonl features.csv --batch-size 5000
+    python -m app.workers.ingest --spotify-playlist 37i9dQZF1DXcBWIGoYBM5M
+
+A record is either a full track (provider, provider_track_id, title, artist, plus
+optional album/duration_ms/artwork_url/features) or a feature-only update
+(provider_track_id or id plus features). Features can be nested under "features"
+or given as flat columns (tempo, energy, ...).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.services.db import init_engine
+from app.services.recsys.clip_selector import compact_analysis
 import app.services.db as db  # <-- import the module, not SessionLocal
 
+log = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_CHECKPOINT = ".ingest_checkpoint.json"
+
+# flat columns that are folded into features_json
+FEATURE_FIELDS = (
+    "tempo", "energy", "valence", "danceability", "loudness", "popularity",
+    "acousticness", "instrumentalness", "speechiness", "liveness", "key", "mode",
+)
+
+STAGING_COLUMNS = (
+    "seq", "id", "provider", "provider_track_id", "title", "artist",
+    "album", "duration_ms", "artwork_url", "features_json",
+)
+
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS tracks_staging (
+    seq bigint,
+    id varchar,
+    provider varchar,
+    provider_track_id varchar,
+    title varchar,
+    artist varchar,
+    album varchar,
+    duration_ms integer,
+    artwork_url text,
+    features_json jsonb
+) ON COMMIT DELETE ROWS
+"""
+
+# Full records: last occurrence of an id in the batch wins; missing optional
+# fields keep what's already stored, features are merged key by key.
+MERGE_TRACKS_SQL = """
+INSERT INTO tracks AS t
+    (id, provider, provider_track_id, title, artist, album, duration_ms, artwork_url, features_json)
+SELECT DISTINCT ON (id)
+    id, provider, provider_track_id, title, artist, album, duration_ms, artwork_url, features_json
+FROM tracks_staging
+WHERE title IS NOT NULL
+ORDER BY id, seq DESC
+ON CONFLICT (id) DO UPDATE SET
+    provider = EXCLUDED.provider,
+    provider_track_id = EXCLUDED.provider_track_id,
+    title = EXCLUDED.title,
+    artist = EXCLUDED.artist,
+    album = COALESCE(EXCLUDED.album, t.album),
+    duration_ms = COALESCE(EXCLUDED.duration_ms, t.duration_ms),
+    artwork_url = COALESCE(EXCLUDED.artwork_url, t.artwork_url),
+    features_json = CASE
+        WHEN EXCLUDED.features_json IS NULL THEN t.features_json
+        ELSE COALESCE(t.features_json, '{}'::jsonb) || EXCLUDED.features_json
+    END,
+    updated_at = now()
+"""
+
+# Feature-only records can't go through INSERT (title/artist are NOT NULL),
+# so they update tracks that already exist and are otherwise skipped.
+MERGE_FEATURES_SQL = """
+UPDATE tracks AS t
+SET features_json = COALESCE(t.features_json, '{}'::jsonb) || s.features_json,
+    updated_at = now()
+FROM (
+    SELECT DISTINCT ON (id) id, features_json
+    FROM tracks_staging
+    WHERE title IS NULL AND features_json IS NOT NULL
+    ORDER BY id, seq DESC
+) AS s
+WHERE t.id = s.id
+"""
+
+
+# ---------------------------
+# Readers
+# ---------------------------
+def _open_text(path: Path) -> io.TextIOBase:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _file_format(path: Path) -> str:
+    suffixes = [s for s in path.suffixes if s != ".gz"]
+    ext = suffixes[-1].lower() if suffixes else ""
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if ext in (".csv", ".tsv"):
+        return "csv"
+    if ext == ".parquet":
+        return "parquet"
+    raise ValueError(f"unsupported catalog file: {path}")
+
+
+def _iter_jsonl(path: Path) -> Iterator[Record]:
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield {"__invalid__": line[:200]}
+
+
+def _iter_csv(path: Path) -> Iterator[Record]:
+    delimiter = "\t" if ".tsv" in path.suffixes else ","
+    with _open_text(path) as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield row
+
+
+def _iter_parquet(path: Path, batch_rows: int) -> Iterator[Record]:
+    try:
+        import pyarrow.parquet as pq  # optional; only needed for .parquet input
+    except ImportError as e:
+        raise RuntimeError("reading parquet needs pyarrow (pip install pyarrow)") from e
+    pf = pq.ParquetFile(path)
+    for batch in pf.iter_batches(batch_size=batch_rows):
+        yield from batch.to_pylist()
+
+
+def iter_records(path: Path, batch_rows: int = DEFAULT_BATCH_SIZE) -> Iterator[Record]:
+    fmt = _file_format(path)
+    if fmt == "jsonl":
+        return _iter_jsonl(path)
+    if fmt == "csv":
+        return _iter_csv(path)
+    return _iter_parquet(path, batch_rows)
+
+
+def batched(it: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    batch: List[Record] = []
+    for rec in it:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------------------
+# Validation
+# ---------------------------
+def _blank(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip())
+
+
+def _opt_str(v: Any) -> Optional[str]:
+    return None if _blank(v) else str(v).strip()
+
+
+def _opt_int(v: Any) -> Optional[int]:
+    if _blank(v):
+        return None
+    return int(float(v))
+
+
+def _features(raw: Record) -> Optional[Dict[str, Any]]:
+    feats = raw.get("features") or raw.get("features_json")
+    if isinstance(feats, str) and feats.strip():
+        feats = json.loads(feats)
+    out: Dict[str, Any] = dict(feats) if isinstance(feats, dict) else {}
+    for key in FEATURE_FIELDS:
+        if key in raw and not _blank(raw[key]):
+            out[key] = float(raw[key])
+    return compact_analysis(out) if out else None
+
+
+SPOTIFY_URI_PREFIX = "spotify:track:"
+
+
+def _spotify_id(provider: Optional[str], provider_track_id: Optional[str]) -> Optional[str]:
+    """Bare Spotify id for a spotify-provider id given bare or as a spotify:track: URI."""
+    if not provider_track_id:
+        return None
+    if provider_track_id.startswith(SPOTIFY_URI_PREFIX):
+        return provider_track_id[len(SPOTIFY_URI_PREFIX):] if provider in (None, "spotify") else None
+    return provider_track_id if provider == "spotify" else None
+
+
+def _track_id(provider: Optional[str], provider_track_id: Optional[str]) -> Optional[str]:
+    # same ids the API uses: bare Spotify id, provider-qualified otherwise
+    if not provider_track_id:
+        return None
+    spotify_id = _spotify_id(provider, provider_track_id)
+    if spotify_id:
+        return spotify_id
+    return f"{provider}:{provider_track_id}" if provider else provider_track_id
+
+
+def validate_record(raw: Record) -> Tuple[Optional[Record], Optional[str]]:
+    """Normalize one input record to staging columns; returns (record, None) or (None, reason)."""
+    if "__invalid__" in raw:
+        return None, "unparseable line"
+    try:
+        provider = _opt_str(raw.get("provider"))
+        provider_track_id = _opt_str(raw.get("provider_track_id") or raw.get("uri"))
+        track_id = _opt_str(raw.get("id") or raw.get("track_id")) or _track_id(provider, provider_track_id)
+        spotify_id = _spotify_id(provider, provider_track_id)
+        if spotify_id:
+            # stored as the URI, like tracks written by the API and the catalog
+            provider_track_id = SPOTIFY_URI_PREFIX + spotify_id
+        if not track_id:
+            return None, "missing id / provider_track_id"
+        title = _opt_str(raw.get("title") or raw.get("name"))
+        artist = _opt_str(raw.get("artist"))
+        features = _features(raw)
+        duration_ms = _opt_int(raw.get("duration_ms"))
+    except (TypeError, ValueError) as e:
+        return None, f"bad value: {e}"
+
+    if title is None:
+        if features is None:
+            return None, "no title and no features"
+        return {"id": track_id, "title": None, "features_json": features}, None
+    if not provider or not provider_track_id or artist is None:
+        return None, "track needs provider, provider_track_id and artist"
+    if duration_ms is not None and duration_ms < 0:
+        return None, "negative duration_ms"
+    return {
+        "id": track_id,
+        "provider": provider,
+        "provider_track_id": provider_track_id,
+        "title": title,
+        "artist": artist,
+        "album": _opt_str(raw.get("album")),
+        "duration_ms": duration_ms,
+        "artwork_url": _opt_str(raw.get("artwork_url")),
+        "features_json": features,
+    }, None
+
+
+def validate_batch(raws: List[Record]) -> Tuple[List[Record], Dict[str, int]]:
+    records: List[Record] = []
+    rejected: Dict[str, int] = {}
+    for raw in raws:
+        rec, reason = validate_record(raw)
+        if rec is None:
+            rejected[reason or "invalid"] = rejected.get(reason or "invalid", 0) + 1
+        else:
+            records.append(rec)
+    return records, rejected
+
+
+# ---------------------------
+# COPY + merge
+# ---------------------------
+def _staging_rows(records: List[Record]) -> List[tuple]:
+    rows = []
+    for seq, r in enumerate(records):
+        feats = r.get("features_json")
+        rows.append((
+            seq,
+            r["id"],
+            r.get("provider"),
+            r.get("provider_track_id"),
+            r.get("title"),
+            r.get("artist"),
+            r.get("album"),
+            r.get("duration_ms"),
+            r.get("artwork_url"),
+            json.dumps(feats) if feats is not None else None,
+        ))
+    return rows
+
+
+async def merge_records(session: AsyncSession, records: List[Record]) -> int:
+    """
+    COPY validated records into tracks_staging and merge them into tracks in the
+    session's current transaction. Returns the number of tracks rows written.
+    Caller commits (the staging table empties itself on commit).
+    """
+    if not records:
+        return 0
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    pg = raw.driver_connection  # asyncpg.Connection
+
+    await pg.execute(CREATE_STAGING_SQL)
+    await pg.copy_records_to_table("tracks_staging", records=_staging_rows(records), columns=STAGING_COLUMNS)
+    inserted = await pg.execute(MERGE_TRACKS_SQL)
+    updated = await pg.execute(MERGE_FEATURES_SQL)
+    # asyncpg returns the command tag, e.g. "INSERT 0 4980" / "UPDATE 20"
+    return int(inserted.rsplit(" ", 1)[-1]) + int(updated.rsplit(" ", 1)[-1])
+
+
+# ---------------------------
+# Checkpoints
+# ---------------------------
+class Checkpoint:
+    """Rows already committed per input file; reset if the file changes."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if path is not None and path.exists():
+            try:
+                self.state = json.loads(path.read_text())
+            except ValueError:
+                log.warning("ignoring unreadable checkpoint %s", path)
+
+    @staticmethod
+    def _stamp(src: Path) -> Dict[str, Any]:
+        st = src.stat()
+        return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+    def done(self, src: Path) -> int:
+        entry = self.state.get(str(src.resolve()))
+        if not entry or {k: entry.get(k) for k in ("size", "mtime")} != self._stamp(src):
+            return 0
+        return int(entry.get("rows", 0))
+
+    def advance(self, src: Path, rows: int) -> None:
+        self.state[str(src.resolve())] = {**self._stamp(src), "rows": rows}
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state))
+        os.replace(tmp, self.path)  # atomic: a crash never leaves a torn checkpoint
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+async def load_file(src: Path, checkpoint: Checkpoint, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    assert db.SessionLocal is not None, "Call init_engine() first"
+    skip = checkpoint.done(src)
+    if skip:
+        log.info("%s: resuming after %d rows", src, skip)
+
+    stats: Dict[str, Any] = {"read": 0, "written": 0, "rejected": {}}
+    t0 = time.perf_counter()
+    position = 0
+    async with db.SessionLocal() as session:
+        for raws in batched(iter_records(src, batch_size), batch_size):
+            if position + len(raws) <= skip:
+                position += len(raws)
+                continue
+            if position < skip:
+                raws = raws[skip - position:]
+                position = skip
+
+            records, rejected = validate_batch(raws)
+            written = await merge_records(session, records)
+            await session.commit()
+            position += len(raws)
+            checkpoint.advance(src, position)
+
+            stats["read"] += len(raws)
+            stats["written"] += written
+            for reason, n in rejected.items():
+                stats["rejected"][reason] = stats["rejected"].get(reason, 0) + n
+            elapsed = time.perf_counter() - t0
+            log.info(
+                "%s: %d rows (%d written, %d rejected) %.0f rows/s",
+                src.name, position, stats["written"], sum(stats["rejected"].values()),
+                stats["read"] / elapsed if elapsed > 0 else 0.0,
+            )
+
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    return stats
+
+
+def _record_from_spotify(t: Record) -> Record:
+    return {
+        "provider": "spotify",
+        "provider_track_id": t.get("provider_track_uri"),
+        "title": t.get("title"),
+        "artist": t.get("artist"),
+        "album": t.get("album"),
+        "duration_ms": t.get("duration_ms"),
+        "artwork_url": t.get("artwork_url"),
+        "popularity": t.get("popularity"),
+    }
+
+
+async def import_spotify_playlist(playlist_id: str, batch_size: int = 500,
+                                  max_tracks: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Stream a Spotify playlist into the catalog a batch at a time through the same
+    validate + COPY/merge path as file loads; memory stays at one batch.
+    """
+    from app.services.providers.spotify_playlists import iter_playlist_tracks
+
+    assert db.SessionLocal is not None, "Call init_engine() first"
+    stats: Dict[str, Any] = {"read": 0, "written": 0, "rejected": {}}
+    t0 = time.perf_counter()
+    batch: List[Record] = []
+
+    async with db.SessionLocal() as session:
+        async def flush() -> None:
+            records, rejected = validate_batch(batch)
+            stats["written"] += await merge_records(session, records)
+            await session.commit()
+            stats["read"] += len(batch)
+            for reason, n in rejected.items():
+                stats["rejected"][reason] = stats["rejected"].get(reason, 0) + n
+            batch.clear()
+            elapsed = time.perf_counter() - t0
+            log.info("playlist %s: %d tracks %.0f rows/s", playlist_id, stats["read"],
+                     stats["read"] / elapsed if elapsed > 0 else 0.0)
+
+        async for t in iter_playlist_tracks(playlist_id, max_tracks=max_tracks):
+            batch.append(_record_from_spotify(t))
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    return stats
+
+
 async def main():
+    p = argparse.ArgumentParser(description="bulk-load catalog tracks / audio features")
+    p.add_argument("files", nargs="*", type=Path, help=".jsonl/.csv/.parquet (optionally .gz for text)")
+    p.add_argument("--spotify-playlist", action="append", default=[], metavar="ID",
+                   help="also import a Spotify playlist's tracks (repeatable)")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    p.add_argument("--checkpoint", type=Path, default=Path(DEFAULT_CHECKPOINT), help="resume state file")
+    p.add_argument("--no-checkpoint", action="store_true", help="always start from the top")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
     await init_engine()
     if db.SessionLocal is None:
         raise RuntimeError("DB not initialized; SessionLocal is None")
 
-    async with db.SessionLocal() as session:  # type: ignore
-        t = Track(
-            provider="spotify",
-            provider_track_id="spotify:track:3e9HZx...",
-            title="Starboy",
-            artist="The Weeknd",
-            album="Starboy",
-            duration_ms=230000,
-            artwork_url="https://i.scdn.co/image/ab67616d0000b273...",
-            features_json=json.dumps({
-                "tempo":118, "energy":0.8, "valence":0.55,
-                "danceability":0.78, "loudness":-6.1, "popularity":85
-            }),
-        )
-        session.add(t)
-        await session.commit()
+    checkpoint = Checkpoint(None if args.no_checkpoint else args.checkpoint)
+    for src in args.files:
+        stats = await load_file(src, checkpoint, args.batch_size)
+        log.info("%s: done %s", src, stats)
+    for playlist_id in args.spotify_playlist:
+        stats = await import_spotify_playlist(playlist_id, min(args.batch_size, 1000))
+        log.info("playlist %s: done %s", playlist_id, stats)
+
 
 if __name__ == "__main__":
     asyncio.run(main())
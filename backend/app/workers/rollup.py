@@ -0,0 +1,138 @@
+# app/workers/rollup.py
+"""
+Keeps feed_events partitions ahead of the clock and (re)computes the daily
+per-track / per-user rollups. Idempotent: each run recomputes the last few days
+from scratch and upserts, so late-arriving (write-behind) events are picked up.
+
+    python -m app.workers.rollup --days 2
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.db import init_engine
+import app.services.db as db
+
+log = logging.getLogger(__name__)
+
+# one month per call, so a month that can't be created doesn't block the others
+# (rows already in feed_events_default are moved into the new partition by the function)
+ENSURE_PARTITION_SQL = text("SELECT feed_events_ensure_partition(CAST(:month AS date))")
+
+# the created_at range predicate lets Postgres prune to the day's partition
+TRACK_ROLLUP_SQL = text(
+    """
+    INSERT INTO track_daily_stats AS t
+        (track_id, day, events, likes, skips, views, users, dwell_ms_sum, updated_at)
+    SELECT
+        track_id,
+        CAST(:day AS date),
+        count(*),
+        count(*) FILTER (WHERE event_type = 'like'),
+        count(*) FILTER (WHERE event_type = 'skip'),
+        count(*) FILTER (WHERE event_type = 'view'),
+        count(DISTINCT user_id),
+        COALESCE(sum(dwell_ms), 0),
+        now()
+    FROM feed_events
+    WHERE created_at >= :start AND created_at < :end
+    GROUP BY track_id
+    ON CONFLICT (track_id, day) DO UPDATE SET
+        events = EXCLUDED.events,
+        likes = EXCLUDED.likes,
+        skips = EXCLUDED.skips,
+        views = EXCLUDED.views,
+        users = EXCLUDED.users,
+        dwell_ms_sum = EXCLUDED.dwell_ms_sum,
+        updated_at = EXCLUDED.updated_at
+    """
+)
+
+USER_ROLLUP_SQL = text(
+    """
+    INSERT INTO user_daily_stats AS u
+        (user_id, day, events, likes, skips, views, sessions, dwell_ms_sum, updated_at)
+    SELECT
+        user_id,
+        CAST(:day AS date),
+        count(*),
+        count(*) FILTER (WHERE event_type = 'like'),
+        count(*) FILTER (WHERE event_type = 'skip'),
+        count(*) FILTER (WHERE event_type = 'view'),
+        count(DISTINCT session_id),
+        COALESCE(sum(dwell_ms), 0),
+        now()
+    FROM feed_events
+    WHERE created_at >= :start AND created_at < :end
+    GROUP BY user_id
+    ON CONFLICT (user_id, day) DO UPDATE SET
+        events = EXCLUDED.events,
+        likes = EXCLUDED.likes,
+        skips = EXCLUDED.skips,
+        views = EXCLUDED.views,
+        sessions = EXCLUDED.sessions,
+        dwell_ms_sum = EXCLUDED.dwell_ms_sum,
+        updated_at = EXCLUDED.updated_at
+    """
+)
+
+
+def _month_starts(today: date, months_ahead: int) -> list[date]:
+    out = []
+    y, m = today.year, today.month
+    for _ in range(months_ahead + 1):
+        out.append(date(y, m, 1))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+async def ensure_partitions(session: AsyncSession, months_ahead: int = 2) -> None:
+    """Create this month's and the next `months_ahead` partitions; failures are logged, not raised."""
+    for month in _month_starts(datetime.now(timezone.utc).date(), months_ahead):
+        try:
+            await session.execute(ENSURE_PARTITION_SQL, {"month": month})
+            await session.commit()
+        except Exception as e:
+            log.warning("could not ensure feed_events partition for %s: %s", month.strftime("%Y-%m"), e)
+            await session.rollback()
+
+
+async def rollup_day(session: AsyncSession, day: date) -> None:
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    params = {"day": day, "start": start, "end": start + timedelta(days=1)}
+    await session.execute(TRACK_ROLLUP_SQL, params)
+    await session.execute(USER_ROLLUP_SQL, params)
+    await session.commit()
+
+
+async def run_once(days: int = 2, months_ahead: int = 2) -> None:
+    """Ensure upcoming partitions, then recompute the last `days` UTC days (incl. today)."""
+    assert db.SessionLocal is not None, "Call init_engine() first"
+    today = datetime.now(timezone.utc).date()
+    async with db.SessionLocal() as session:
+        await ensure_partitions(session, months_ahead)
+        for back in range(days - 1, -1, -1):
+            day = today - timedelta(days=back)
+            t0 = time.perf_counter()
+            await rollup_day(session, day)
+            log.info("rolled up %s in %.2fs", day, time.perf_counter() - t0)
+
+
+async def main() -> None:
+    p = argparse.ArgumentParser(description="feed_events partitions + daily rollups")
+    p.add_argument("--days", type=int, default=2, help="how many recent days to recompute")
+    p.add_argument("--months-ahead", type=int, default=2, help="partitions to pre-create")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    await init_engine()
+    await run_once(args.days, args.months_ahead)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
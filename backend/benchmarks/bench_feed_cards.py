@@ -0,0 +1,79 @@
+# benchmarks/bench_feed_cards.py
+"""
+Per-card CPU cost of building and serializing a /feed page.
+
+  before: FeedCard(**card) per card, then response_model validation of the list
+          and stdlib-JSON serialization (what FastAPI's default JSONResponse does)
+  after:  build_card() dicts serialized once by ORJSONResponse
+
+Usage (from backend/):
+  python -m benchmarks.bench_feed_cards --cards 50 --repeat 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import timeit
+from typing import List
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.api.feed import FeedCard, build_card
+
+
+def make_page(n: int, seed: int = 0) -> tuple[list[dict], dict[str, dict]]:
+    rng = random.Random(seed)
+    tracks, feats = [], {}
+    for i in range(n):
+        tid = f"{i:022d}"
+        tracks.append({
+            "id": tid,
+            "provider_track_uri": f"spotify:track:{tid}",
+            "title": f"Track {i}",
+            "artist": "Artist A, Artist B",
+            "artwork_url": f"https://i.scdn.co/image/{tid}",
+            "duration_ms": rng.randint(120_000, 360_000),
+            "popularity": rng.randint(0, 100),
+            "artists_raw": [{"id": f"a{i}", "name": "Artist A"}, {"id": "b", "name": "Artist B"}],
+            "artist_genres": ["synthwave", "retrowave", "electronic"],
+        })
+        feats[tid] = {"energy": rng.random(), "valence": rng.random(), "tempo": rng.uniform(60, 180),
+                      "instrumentalness": rng.random()}
+    return tracks, feats
+
+
+def before(tracks: list[dict], feats: dict[str, dict], adapter: TypeAdapter) -> bytes:
+    cards = [FeedCard(**build_card(t, "reason", feats.get(t["id"]))) for t in tracks]
+    # what FastAPI's serialize_response does: dump the returned models, validate the
+    # result against response_model, serialize in json mode, then JSONResponse's json.dumps
+    validated = adapter.validate_python([c.model_dump() for c in cards])
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def after(tracks: list[dict], feats: dict[str, dict]) -> bytes:
+    return ORJSONResponse([build_card(t, "reason", feats.get(t["id"])) for t in tracks]).body
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark /feed card building + serialization")
+    ap.add_argument("--cards", type=int, default=50)
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args()
+
+    tracks, feats = make_page(args.cards)
+    adapter = TypeAdapter(List[FeedCard])
+    assert json.loads(before(tracks, feats, adapter)) == json.loads(after(tracks, feats))
+
+    results = {}
+    for name, fn in (("before", lambda: before(tracks, feats, adapter)), ("after", lambda: after(tracks, feats))):
+        best = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        results[name] = best
+        print(f"{name:>6}: {best * 1e6:8.1f} us/page  {best * 1e6 / args.cards:6.2f} us/card")
+    print(f"speedup: {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_hot_paths.py
+"""
+pytest-benchmark micro-benchmarks for the pure-Python feed / ranking hot paths.
+See benchmarks/README.md for saving baselines and failing on regressions.
+
+    python -m pytest benchmarks/bench_hot_paths.py --benchmark-only
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.api.feed import build_card  # noqa: E402
+from app.services.nl_seed import _heuristic_seed  # noqa: E402
+from app.services.providers.spotify_simple import _track_from_spotify_item, to_feed_card  # noqa: E402
+from app.services.recsys import rerank_bandit as rb  # noqa: E402
+from app.services.recsys.clip_selector import choose_clip_window  # noqa: E402
+from app.services.recsys.features import feature_vector, features_dict  # noqa: E402
+
+from benchmarks.data import QUERIES, SIZES, audio_features, section_analysis, spotify_items, track_rows  # noqa: E402
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_track_from_spotify_item(benchmark, n):
+    items = spotify_items(n)
+    out = benchmark(lambda: [_track_from_spotify_item(it) for it in items])
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_to_feed_card(benchmark, n):
+    tracks = [_track_from_spotify_item(it) for it in spotify_items(n)]
+    out = benchmark(lambda: [to_feed_card(t, "reason") for t in tracks])
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_feed_card_loop(benchmark, n):
+    """Step 7 of get_feed: one build_card per track on the page."""
+    tracks = [_track_from_spotify_item(it) for it in spotify_items(n)]
+    feats = audio_features([t["id"] for t in tracks])
+    for t in tracks:
+        t["artist_genres"] = ["synthwave", "electronic"]
+    out = benchmark(lambda: [build_card(t, "reason", feats.get(t["id"])) for t in tracks])
+    assert len(out) == n
+
+
+def test_heuristic_seed(benchmark):
+    out = benchmark(lambda: [_heuristic_seed(q) for q in QUERIES])
+    assert out[2]["bpm"] == 125
+
+
+@pytest.mark.parametrize("as_json", [False, True], ids=["dict", "json-string"])
+def test_features_dict(benchmark, as_json):
+    """The seed/feature coercion left after JSONB columns: dicts pass through, strings are parsed."""
+    feats = list(audio_features([str(i) for i in range(50)]).values())
+    values = [json.dumps(f) for f in feats] if as_json else feats
+    out = benchmark(lambda: [features_dict(v) for v in values])
+    assert all(out)
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_feature_vector(benchmark, n):
+    rows = track_rows(n)
+    out = benchmark(lambda: [feature_vector(r) for r in rows])
+    assert out[0].shape == (6,)
+
+
+@pytest.mark.parametrize("n", (50, 200, 1000))
+def test_rerank_bandit(benchmark, monkeypatch, n):
+    async def no_scores(user_id, ids):
+        return {}
+    monkeypatch.setattr(rb, "get_scores", no_scores)
+    rows = track_rows(n)
+    loop = asyncio.new_event_loop()
+    try:
+        out = benchmark(lambda: loop.run_until_complete(rb.rerank_bandit("u", "s", rows, k=20)))
+    finally:
+        loop.close()
+    assert len(out) == 20
+
+
+@pytest.mark.parametrize("sections", (0, 8, 32, 128))
+def test_choose_clip_window(benchmark, sections):
+    feats = section_analysis(sections) if sections else None
+    durations = [95_000, 180_000, 240_000, 60_000] * 25
+    out = benchmark(lambda: [choose_clip_window(d, feats, track_key=str(i)) for i, d in enumerate(durations)])
+    assert len(out) == 100
+
+
+def test_choose_clip_window_legacy_sections(benchmark):
+    """Rows ingested before sections were packed: parsed per call."""
+    feats = section_analysis(32, packed=False)
+    out = benchmark(lambda: [choose_clip_window(200_000, feats) for _ in range(100)])
+    assert len(out) == 100
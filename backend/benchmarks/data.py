@@ -0,0 +1,90 @@
+# benchmarks/data.py
+"""
+Deterministic, realistically shaped inputs for the micro-benchmarks: Spotify
+track items as the search / recommendations / playlist endpoints return them,
+normalized tracks, audio features, Track-like rows and section analyses.
+"""
+from __future__ import annotations
+
+import random
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from app.services.recsys.clip_selector import pack_sections
+
+SIZES = (10, 50, 200)
+
+GENRES = ["synthwave", "lofi", "house", "indie", "jazz", "hip-hop", "ambient", "techno"]
+QUERIES = [
+    "late night synthwave drive at 100 bpm", "lofi beats to study to", "gym house music 125 bpm",
+    "rainy sunday jazz and piano", "indie rock road trip", "chill r&b for cooking", "party club bangers",
+    "focus concentration instrumental", "something to cheer me up", "dark techno warehouse 135bpm",
+]
+
+
+def _id(rng: random.Random) -> str:
+    return "".join(rng.choice("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz") for _ in range(22))
+
+
+def spotify_items(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        n_artists = rng.choice((1, 1, 1, 2, 3))
+        out.append({
+            "id": _id(rng),
+            "name": f"Track {i} ({rng.choice(['Remix', 'Live', 'Radio Edit', ''])})",
+            "duration_ms": rng.randint(90_000, 420_000),
+            "popularity": rng.randint(0, 100),
+            "explicit": rng.random() < 0.2,
+            "artists": [{"id": _id(rng), "name": f"Artist {rng.randint(0, 999)}", "type": "artist"}
+                        for _ in range(n_artists)],
+            "album": {
+                "id": _id(rng),
+                "name": f"Album {rng.randint(0, 5000)}",
+                "release_date": f"{rng.randint(1970, 2025)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+                "images": [{"url": f"https://i.scdn.co/image/{_id(rng)}", "height": h, "width": h}
+                           for h in (640, 300, 64)],
+            },
+            "available_markets": ["US", "GB", "DE", "FR", "JP"] * 8,
+        })
+    return out
+
+
+def audio_features(ids: List[str], seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed + 1)
+    return {i: {
+        "danceability": rng.random(), "energy": rng.random(), "key": rng.randrange(12),
+        "loudness": rng.uniform(-20, -2), "mode": rng.randrange(2), "speechiness": rng.random() * 0.3,
+        "acousticness": rng.random(), "instrumentalness": rng.random(), "liveness": rng.random() * 0.5,
+        "valence": rng.random(), "tempo": rng.uniform(70, 175), "time_signature": 4,
+    } for i in ids}
+
+
+def section_analysis(n_sections: int, seed: int = 0, packed: bool = True) -> Dict[str, Any]:
+    rng = random.Random(seed + 2)
+    t, sections = 0.0, []
+    for _ in range(n_sections):
+        d = rng.uniform(8, 45)
+        sections.append({"start": t, "duration": d, "energy": rng.random(), "confidence": rng.random()})
+        t += d
+    analysis = {"sections_packed": pack_sections(sections)} if packed else {"sections": sections}
+    return {"energy": rng.random(), "tempo": rng.uniform(70, 175), "analysis": analysis}
+
+
+def track_rows(n: int, seed: int = 0) -> List[SimpleNamespace]:
+    """Track-like objects as retrieval hands them to rerank_bandit."""
+    rng = random.Random(seed + 3)
+    rows = []
+    for i in range(n):
+        feats = {"tempo": rng.uniform(70, 175), "energy": rng.random(), "valence": rng.random(),
+                 "danceability": rng.random(), "loudness": rng.uniform(-20, -2), "popularity": rng.randint(0, 100)}
+        rows.append(SimpleNamespace(
+            id=_id(rng),
+            features_json=feats,
+            theta_user=[rng.gauss(0, 0.1) for _ in range(6)],
+            artist=f"Artist {rng.randint(0, max(1, n // 4))}",
+            album=f"Album {rng.randint(0, max(1, n // 2))}",
+            duration_ms=rng.randint(90_000, 420_000),
+        ))
+    return rows
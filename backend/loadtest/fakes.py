@@ -0,0 +1,314 @@
+# loadtest/fakes.py
+"""
+Local stand-ins for Spotify, OpenAI and Tavily.
+
+Each fake answers the endpoints the backend calls with deterministic,
+realistic-looking payloads (ids derived from the query / playlist id, so runs
+are reproducible) and injects latency, 5xx errors and 429s per a FaultProfile:
+
+    python -m loadtest.fakes --latency-ms 80 --jitter-ms 40 --error-rate 0.01 --throttle-rate 0.02
+
+starts all three (Spotify :9101, OpenAI :9102, Tavily :9103). Point the API at them:
+
+    SPOTIFY_API_BASE=http://127.0.0.1:9101/v1 SPOTIFY_ACCOUNTS_BASE=http://127.0.0.1:9101
+    OPENAI_BASE_URL=http://127.0.0.1:9102/v1 OPENAI_API_KEY=fake
+    TAVILY_BASE_URL=http://127.0.0.1:9103 TAVILY_API_KEY=fake
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+GENRES = ["synthwave", "lofi", "house", "indie", "jazz", "hip-hop", "ambient", "techno", "r-n-b", "rock"]
+WORDS = ["neon", "midnight", "drive", "echo", "velvet", "static", "golden", "rain", "signal", "ghost", "ocean", "arcade"]
+
+
+@dataclass
+class FaultProfile:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # fraction of requests answered 503
+    throttle_rate: float = 0.0  # fraction answered 429 + Retry-After
+    retry_after_s: int = 1
+    seed: Optional[int] = None
+
+
+def _h(*parts: Any) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:12], 16)
+
+
+def _sid(*parts: Any) -> str:
+    """22-char base62-ish id, stable for the same inputs (like a Spotify id)."""
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    n, out = _h(*parts), []
+    for _ in range(22):
+        n, r = divmod(n * 2654435761 + 12345, 62)
+        out.append(alphabet[r])
+    return "".join(out)
+
+
+def _install_faults(app: FastAPI, profile: FaultProfile) -> None:
+    rng = random.Random(profile.seed)
+
+    @app.middleware("http")
+    async def faults(request: Request, call_next):
+        delay = profile.latency_ms + rng.uniform(-profile.jitter_ms, profile.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        roll = rng.random()
+        if roll < profile.throttle_rate:
+            return JSONResponse({"error": {"status": 429, "message": "API rate limit exceeded"}},
+                                status_code=429, headers={"Retry-After": str(profile.retry_after_s)})
+        if roll < profile.throttle_rate + profile.error_rate:
+            return JSONResponse({"error": {"status": 503, "message": "Service unavailable"}}, status_code=503)
+        return await call_next(request)
+
+    app.state.profile = profile
+
+
+# ---------------------------
+# Spotify
+# ---------------------------
+def fake_artist(artist_id: str) -> Dict[str, Any]:
+    n = _h("artist", artist_id)
+    return {
+        "id": artist_id,
+        "name": f"{WORDS[n % len(WORDS)].title()} {WORDS[(n >> 4) % len(WORDS)].title()}",
+        "genres": [GENRES[n % len(GENRES)], GENRES[(n >> 8) % len(GENRES)]],
+        "popularity": n % 100,
+        "type": "artist",
+        "uri": f"spotify:artist:{artist_id}",
+    }
+
+
+def fake_track(track_id: str) -> Dict[str, Any]:
+    n = _h("track", track_id)
+    artist_id = _sid("artist", n % 5000)
+    artist = fake_artist(artist_id)
+    album_id = _sid("album", n % 20000)
+    return {
+        "id": track_id,
+        "name": f"{WORDS[n % len(WORDS)].title()} {WORDS[(n >> 5) % len(WORDS)]}",
+        "uri": f"spotify:track:{track_id}",
+        "type": "track",
+        "duration_ms": 120_000 + n % 240_000,
+        "popularity": (n >> 3) % 100,
+        "explicit": bool(n & 1),
+        "artists": [{"id": artist_id, "name": artist["name"], "type": "artist", "uri": artist["uri"]}],
+        "album": {
+            "id": album_id,
+            "name": f"{WORDS[(n >> 7) % len(WORDS)].title()} Sessions",
+            "release_date": f"{2000 + n % 25}-0{1 + n % 9}-1{n % 10}",
+            "images": [{"url": f"https://i.scdn.co/image/{album_id}", "height": 640, "width": 640}],
+        },
+    }
+
+
+def fake_features(track_id: str) -> Dict[str, Any]:
+    rng = random.Random(_h("features", track_id))
+    return {
+        "id": track_id,
+        "danceability": round(rng.random(), 3),
+        "energy": round(rng.random(), 3),
+        "key": rng.randrange(12),
+        "loudness": round(rng.uniform(-20, -2), 2),
+        "mode": rng.randrange(2),
+        "speechiness": round(rng.random() * 0.3, 3),
+        "acousticness": round(rng.random(), 3),
+        "instrumentalness": round(rng.random(), 3),
+        "liveness": round(rng.random() * 0.5, 3),
+        "valence": round(rng.random(), 3),
+        "tempo": round(rng.uniform(70, 175), 3),
+        "time_signature": 4,
+        "type": "audio_features",
+    }
+
+
+def _ids(request: Request) -> List[str]:
+    return [i for i in (request.query_params.get("ids") or "").split(",") if i]
+
+
+def make_spotify_app(profile: FaultProfile, playlist_size: int = 300) -> FastAPI:
+    app = FastAPI(title="fake-spotify")
+    _install_faults(app, profile)
+
+    @app.post("/api/token")
+    async def token():
+        return {"access_token": "fake-app-token", "token_type": "Bearer", "expires_in": 3600}
+
+    @app.get("/v1/search")
+    async def search(request: Request):
+        q = request.query_params.get("q", "")
+        kind = request.query_params.get("type", "track")
+        limit = int(request.query_params.get("limit", 20))
+        if kind == "playlist":
+            items = [{"id": _sid("playlist", q, i), "name": f"{q} mix {i + 1}",
+                      "tracks": {"total": playlist_size}} for i in range(limit)]
+            return {"playlists": {"items": items, "total": limit}}
+        items = [fake_track(_sid("search", q, i)) for i in range(limit)]
+        return {"tracks": {"items": items, "total": limit}}
+
+    @app.get("/v1/playlists/{playlist_id}/tracks")
+    async def playlist_tracks(playlist_id: str, request: Request):
+        offset = int(request.query_params.get("offset", 0))
+        limit = min(int(request.query_params.get("limit", 100)), 100)
+        # playlists never change here, so the etag only depends on the page
+        etag = f'"{_sid("page", playlist_id, offset, limit)}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        end = min(offset + limit, playlist_size)
+        items = [{"track": fake_track(_sid("pl", playlist_id, i))} for i in range(offset, end)]
+        nxt = None
+        if end < playlist_size:
+            nxt = str(request.url.include_query_params(offset=end, limit=limit))
+        return JSONResponse({"items": items, "next": nxt, "total": playlist_size, "offset": offset, "limit": limit},
+                            headers={"ETag": etag})
+
+    @app.get("/v1/recommendations")
+    async def recommendations(request: Request):
+        limit = int(request.query_params.get("limit", 20))
+        key = str(sorted(request.query_params.items()))
+        return {"tracks": [fake_track(_sid("rec", key, i)) for i in range(limit)], "seeds": []}
+
+    def _etagged(payload: Dict[str, Any], request: Request) -> Response:
+        etag = f'"{_sid("ids", request.url.path, request.query_params.get("ids"))}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(payload, headers={"ETag": etag})
+
+    @app.get("/v1/tracks")
+    async def tracks(request: Request):
+        return _etagged({"tracks": [fake_track(i) for i in _ids(request)]}, request)
+
+    @app.get("/v1/artists")
+    async def artists(request: Request):
+        return _etagged({"artists": [fake_artist(i) for i in _ids(request)]}, request)
+
+    @app.get("/v1/audio-features")
+    async def audio_features(request: Request):
+        return _etagged({"audio_features": [fake_features(i) for i in _ids(request)]}, request)
+
+    return app
+
+
+# ---------------------------
+# OpenAI (chat completions, JSON mode)
+# ---------------------------
+def make_openai_app(profile: FaultProfile) -> FastAPI:
+    app = FastAPI(title="fake-openai")
+    _install_faults(app, profile)
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+        user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        if "structured JSON seed" in system:
+            # nl_seed: keep the user's text as the query
+            text = user.split("User text:", 1)[-1].split("\n", 1)[0].strip() or "new music"
+            content: Dict[str, Any] = {"query": text, "energy": 0.6, "mood": "night"}
+        elif "design playlists" in system:
+            content = {"normalized_query": "fake plan", "duration_minutes": 30,
+                       "constraints": {"genres": ["house"], "moods": ["night"], "bpm_range": [110, 128]},
+                       "slots": [{"label": "warmup", "energy": 0.5, "valence": 0.5, "bpm_range": [110, 120], "genres": ["house"]}]}
+        else:
+            content = {
+                "summary": "A moody, mid-tempo track with a wide synth bed and a restrained vocal.",
+                "lyric_themes": ["distance", "nostalgia"], "mood": ["nocturnal", "reflective"],
+                "best_for": ["late night driving"], "sonic_notes": ["mid energy", "analog synths"],
+                "because": ["energy matches the session"], "artist_context": "",
+                "original": user[:80], "normalized": user[:80], "tags": [],
+            }
+        prompt_tokens = max(1, sum(len((m.get("content") or "").split()) for m in messages))
+        text = json.dumps(content)
+        return {
+            "id": f"chatcmpl-{_sid('chat', time.time_ns())}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text.split()),
+                      "total_tokens": prompt_tokens + len(text.split())},
+        }
+
+    return app
+
+
+# ---------------------------
+# Tavily
+# ---------------------------
+def make_tavily_app(profile: FaultProfile) -> FastAPI:
+    app = FastAPI(title="fake-tavily")
+    _install_faults(app, profile)
+
+    @app.post("/search")
+    async def search(request: Request):
+        body = await request.json()
+        q = body.get("query", "")
+        n = int(body.get("max_results", 3))
+        return {
+            "query": q,
+            "results": [{"title": f"{q} #{i}", "url": f"https://news.example/{_sid('news', q, i)}",
+                         "content": f"Recent coverage {i + 1} about {q.split(' music')[0]}.", "score": 0.9 - i * 0.1}
+                        for i in range(n)],
+            "response_time": 0.01,
+        }
+
+    return app
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+async def serve(apps: Dict[str, tuple[FastAPI, int]], host: str) -> None:
+    import uvicorn
+
+    servers = [uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False))
+               for app, port in apps.values()]
+    for name, (_, port) in apps.items():
+        print(f"fake {name} on http://{host}:{port}")
+    await asyncio.gather(*(s.serve() for s in servers))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Fake Spotify / OpenAI / Tavily servers for load tests")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--spotify-port", type=int, default=9101)
+    ap.add_argument("--openai-port", type=int, default=9102)
+    ap.add_argument("--tavily-port", type=int, default=9103)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--jitter-ms", type=float, default=20.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--throttle-rate", type=float, default=0.0)
+    ap.add_argument("--retry-after-s", type=int, default=1)
+    ap.add_argument("--openai-latency-ms", type=float, default=None, help="LLM calls are slower; defaults to 10x --latency-ms")
+    ap.add_argument("--playlist-size", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=None, help="fault RNG seed, for reproducible error sequences")
+    args = ap.parse_args()
+
+    def profile(latency_ms: float) -> FaultProfile:
+        return FaultProfile(latency_ms=latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            throttle_rate=args.throttle_rate, retry_after_s=args.retry_after_s, seed=args.seed)
+
+    openai_ms = args.openai_latency_ms if args.openai_latency_ms is not None else args.latency_ms * 10
+    apps = {
+        "spotify": (make_spotify_app(profile(args.latency_ms), playlist_size=args.playlist_size), args.spotify_port),
+        "openai": (make_openai_app(profile(openai_ms)), args.openai_port),
+        "tavily": (make_tavily_app(profile(args.latency_ms)), args.tavily_port),
+    }
+    asyncio.run(serve(apps, args.host))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# loadtest/run.py
+"""
+Async load generator for the API.
+
+N virtual users run a scenario in a closed loop for --duration seconds (after
+--warmup seconds whose samples are dropped), and the run is written as JSON:
+throughput plus latency percentiles per endpoint, status-code counts, and the
+run parameters, so two runs can be diffed with --compare.
+
+    python -m loadtest.run --scenario mixed --concurrency 32 --duration 60 --out runs/mixed.json
+    python -m loadtest.run --scenario feed --compare runs/mixed.json
+
+Scenarios:
+  sessions  POST /sessions
+  feed      GET /feed on one session per user
+  feedback  POST /feedback for cards of one feed page per user
+  explain   POST /explain/track for cards of one feed page per user
+  mixed     create session -> feed -> 3 feedback events -> explain (20% of loops)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+QUERIES = [
+    "late night synthwave drive", "lofi beats to study to", "gym house music 125 bpm", "rainy sunday jazz",
+    "indie rock road trip", "chill r&b for cooking", "dark techno warehouse", "happy songs to cheer me up",
+    "ambient focus piano", "90s hip hop classics", "sad acoustic covers", "summer party bangers",
+]
+FEEDBACK_EVENTS = ("start", "skip", "like", "complete", "dislike", "save")
+SCENARIOS = ("sessions", "feed", "feedback", "explain", "mixed")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list (p in [0, 100])."""
+    if not sorted_values:
+        return 0.0
+    k = math.ceil(p / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, k))]
+
+
+@dataclass
+class Stats:
+    recording: bool = False
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    def add(self, name: str, seconds: float, status: str) -> None:
+        if self.recording:
+            self.latencies[name].append(seconds)
+            self.statuses[name][status] += 1
+
+    def summary(self, duration_s: float) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        names = sorted(set(self.latencies) | set(self.statuses))
+        for name in names + ["total"]:
+            if name == "total":
+                lat = sorted(x for n in names for x in self.latencies[n])
+                st: Counter = sum((self.statuses[n] for n in names), Counter())
+            else:
+                lat = sorted(self.latencies[name])
+                st = self.statuses[name]
+            ok = sum(v for k, v in st.items() if k.startswith("2"))
+            count = sum(st.values())
+            out[name] = {
+                "count": count,
+                "ok": ok,
+                "error_rate": round(1 - ok / count, 4) if count else 0.0,
+                "rps": round(count / duration_s, 2) if duration_s else 0.0,
+                "latency_ms": {
+                    "mean": round(1000 * sum(lat) / len(lat), 2) if lat else 0.0,
+                    **{f"p{p}": round(1000 * percentile(lat, p), 2) for p in (50, 90, 95, 99)},
+                    "max": round(1000 * lat[-1], 2) if lat else 0.0,
+                },
+                "status": dict(sorted(st.items())),
+            }
+        return out
+
+
+class User:
+    """One virtual user: its own id, RNG, and the session / cards it's working with."""
+
+    def __init__(self, idx: int, client: httpx.AsyncClient, stats: Stats, seed: int):
+        self.user_id = f"loadtest-{idx}"
+        self.client = client
+        self.stats = stats
+        self.rng = random.Random(seed * 100_003 + idx)
+        self.session_id: Optional[str] = None
+        self.cards: List[dict] = []
+
+    async def call(self, name: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, **kwargs)
+            status = str(r.status_code)
+        except httpx.HTTPError as e:
+            r, status = None, type(e).__name__
+        self.stats.add(name, time.perf_counter() - t0, status)
+        return r
+
+    async def create_session(self) -> None:
+        r = await self.call("POST /sessions", "POST", "/sessions",
+                            json={"user_id": self.user_id, "query": self.rng.choice(QUERIES)})
+        if r is not None and r.status_code == 200:
+            self.session_id = r.json()["id"]
+
+    async def feed(self) -> None:
+        if not self.session_id:
+            return
+        r = await self.call("GET /feed", "GET", "/feed",
+                            params={"session_id": self.session_id, "user_id": self.user_id, "limit": 20})
+        if r is not None and r.status_code == 200:
+            self.cards = r.json() or self.cards
+
+    async def feedback(self, n: int = 1) -> None:
+        for card in self.rng.sample(self.cards, min(n, len(self.cards))):
+            await self.call("POST /feedback", "POST", "/feedback", json={
+                "user_id": self.user_id, "session_id": self.session_id, "track_id": card["track_id"],
+                "event": self.rng.choice(FEEDBACK_EVENTS), "dwell_ms": self.rng.randint(500, 30_000),
+            })
+
+    async def explain(self) -> None:
+        if self.cards:
+            card = self.rng.choice(self.cards)
+            await self.call("POST /explain/track", "POST", "/explain/track",
+                            json={"provider": "spotify", "track_id": card["provider_track_id"]})
+
+    async def setup(self, scenario: str) -> None:
+        if scenario in ("feed", "feedback", "explain"):
+            await self.create_session()
+        if scenario in ("feedback", "explain"):
+            await self.feed()
+
+    async def step(self, scenario: str) -> None:
+        if scenario in ("feedback", "explain") and not self.cards:
+            await self.setup(scenario)  # setup failed / empty feed: try again
+            return
+        if scenario == "sessions":
+            await self.create_session()
+        elif scenario == "feed":
+            await self.feed()
+        elif scenario == "feedback":
+            await self.feedback()
+        elif scenario == "explain":
+            await self.explain()
+        else:
+            await self.create_session()
+            await self.feed()
+            await self.feedback(3)
+            if self.rng.random() < 0.2:
+                await self.explain()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        users = [User(i, client, stats, args.seed) for i in range(args.concurrency)]
+        await asyncio.gather(*(u.setup(args.scenario) for u in users))
+
+        stop_at = time.monotonic() + args.warmup + args.duration
+
+        async def loop(u: User) -> None:
+            while time.monotonic() < stop_at:
+                await u.step(args.scenario)
+                if args.think_ms:
+                    await asyncio.sleep(u.rng.uniform(0, 2 * args.think_ms) / 1000.0)
+
+        async def start_recording() -> None:
+            await asyncio.sleep(args.warmup)
+            stats.recording = True
+
+        started = time.monotonic()
+        await asyncio.gather(start_recording(), *(loop(u) for u in users))
+        measured = max(1e-9, time.monotonic() - started - args.warmup)
+
+    return {
+        "meta": {
+            "scenario": args.scenario,
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": round(measured, 2),
+            "warmup_s": args.warmup,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_rev": _git_rev(),
+        },
+        "endpoints": stats.summary(measured),
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    lines = [f"{'endpoint':<22}{'rps':>18}{'p50 ms':>22}{'p95 ms':>22}{'p99 ms':>22}"]
+    for name, cur in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+
+        def cell(a: float, b: float) -> str:
+            delta = (a - b) / b * 100 if b else 0.0
+            return f"{b:.1f}->{a:.1f} ({delta:+.0f}%)"
+
+        lines.append(f"{name:<22}{cell(cur['rps'], base['rps']):>18}"
+                     + "".join(f"{cell(cur['latency_ms'][p], base['latency_ms'][p]):>22}" for p in ("p50", "p95", "p99")))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load-test the Sampler API")
+    ap.add_argument("--base-url", default="http://127.0.0.1:8080")
+    ap.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    ap.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    ap.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    ap.add_argument("--warmup", type=float, default=5.0, help="seconds run but not recorded")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's loops")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", type=Path, default=None, help="write the JSON report here (default: stdout)")
+    ap.add_argument("--compare", type=Path, default=None, help="earlier report to diff against")
+    args = ap.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text + "\n")
+        print(f"wrote {args.out}")
+    else:
+        print(text)
+    if args.compare:
+        print(compare(report, json.loads(args.compare.read_text())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""tracks_features_jsonb
+
+Revision ID: 0e15ebf6a72f
+Revises: 993d8b38e05c
+Create Date: 2026-10-19 13:05:22.671940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0e15ebf6a72f'
+down_revision = '993d8b38e05c'
+branch_labels = None
+depends_on = None
+
+# keep in sync with app.models.track.INDEXED_FEATURE_KEYS
+FEATURE_KEYS = ("energy", "tempo", "valence", "danceability")
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE tracks ALTER COLUMN features_json TYPE jsonb "
+        "USING NULLIF(btrim(features_json), '')::jsonb"
+    )
+    op.create_index(
+        'ix_tracks_features_gin', 'tracks', ['features_json'],
+        postgresql_using='gin', postgresql_ops={'features_json': 'jsonb_path_ops'},
+    )
+    for key in FEATURE_KEYS:
+        op.create_index(
+            f'ix_tracks_feature_{key}', 'tracks',
+            [sa.text(f"CAST(features_json ->> '{key}' AS FLOAT)")],
+        )
+
+
+def downgrade() -> None:
+    for key in FEATURE_KEYS:
+        op.drop_index(f'ix_tracks_feature_{key}', table_name='tracks')
+    op.drop_index('ix_tracks_features_gin', table_name='tracks')
+    op.execute("ALTER TABLE tracks ALTER COLUMN features_json TYPE text USING features_json::text")
@@ -0,0 +1,38 @@
+"""playlist_track_positions
+
+Revision ID: 59967893e406
+Revises: c168284609d5
+Create Date: 2026-10-19 13:05:52.771390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '59967893e406'
+down_revision = 'c168284609d5'
+branch_labels = None
+depends_on = None
+
+POSITION_GAP = 1024  # keep in sync with app/repositories/playlists.py
+
+def upgrade() -> None:
+    # position was never set (all 0): give existing rows gap-spaced positions
+    # in the order they were added, so moves can take midpoints
+    op.execute(
+        f"""
+        UPDATE playlist_tracks AS pt
+        SET position = r.rn * {POSITION_GAP}
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY playlist_id ORDER BY position, created_at, id
+            ) AS rn
+            FROM playlist_tracks
+        ) AS r
+        WHERE pt.id = r.id
+        """
+    )
+
+def downgrade() -> None:
+    # positions are still a valid ordering; nothing to undo
+    pass
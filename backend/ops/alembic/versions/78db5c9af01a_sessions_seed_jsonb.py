@@ -0,0 +1,64 @@
+"""sessions_seed_jsonb
+
+Revision ID: 78db5c9af01a
+Revises: 0e15ebf6a72f
+Create Date: 2026-10-19 13:48:10.385127
+
+"""
+import ast
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '78db5c9af01a'
+down_revision = '0e15ebf6a72f'
+branch_labels = None
+depends_on = None
+
+BATCH = 1000
+
+
+def _parse_seed(text):
+    # old rows hold either JSON or a str()'d python dict; this is the only place
+    # that still has to tell them apart
+    if not text:
+        return {}
+    try:
+        v = json.loads(text)
+    except ValueError:
+        try:
+            v = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return {}
+    return v if isinstance(v, dict) else {}
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('seed', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    conn = op.get_bind()
+    sessions = sa.table('sessions', sa.column('id', sa.String), sa.column('seed_json', sa.Text),
+                        sa.column('seed', postgresql.JSONB))
+    # python-repr rows can't be cast in SQL, so convert in keyset-paged batches:
+    # memory stays at one batch however large sessions is
+    update = sessions.update().where(sessions.c.id == sa.bindparam('sid')).values(seed=sa.bindparam('seed_val'))
+    last_id = None
+    while True:
+        q = sa.select(sessions.c.id, sessions.c.seed_json).order_by(sessions.c.id).limit(BATCH)
+        if last_id is not None:
+            q = q.where(sessions.c.id > last_id)
+        rows = conn.execute(q).fetchall()
+        if not rows:
+            break
+        conn.execute(update, [{'sid': sid, 'seed_val': _parse_seed(text)} for sid, text in rows])
+        last_id = rows[-1][0]
+
+    op.drop_column('sessions', 'seed_json')
+    op.alter_column('sessions', 'seed', new_column_name='seed_json')
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE sessions ALTER COLUMN seed_json TYPE text USING seed_json::text")
@@ -0,0 +1,37 @@
+"""unique_playlist_track
+
+Revision ID: 993d8b38e05c
+Revises: 59967893e406
+Create Date: 2026-10-19 14:21:18.093556
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '993d8b38e05c'
+down_revision = '59967893e406'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # select-then-insert raced under concurrent clicks: keep the first copy of each
+    # (playlist_id, track_id) before the constraint goes on
+    op.execute(
+        """
+        DELETE FROM playlist_tracks AS pt
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY playlist_id, track_id ORDER BY position, created_at, id
+            ) AS rn
+            FROM playlist_tracks
+            WHERE track_id IS NOT NULL
+        ) AS d
+        WHERE pt.id = d.id AND d.rn > 1
+        """
+    )
+    # backed by a unique index on (playlist_id, track_id); used as the ON CONFLICT target
+    op.create_unique_constraint('uq_playlist_tracks_playlist_track', 'playlist_tracks', ['playlist_id', 'track_id'])
+
+def downgrade() -> None:
+    op.drop_constraint('uq_playlist_tracks_playlist_track', 'playlist_tracks', type_='unique')
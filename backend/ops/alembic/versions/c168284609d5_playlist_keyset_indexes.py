@@ -0,0 +1,25 @@
+"""playlist_keyset_indexes
+
+Revision ID: c168284609d5
+Revises: e2a9ddc51205
+Create Date: 2026-10-19 11:40:07.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c168284609d5'
+down_revision = 'e2a9ddc51205'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # keyset pagination: tracks by (position, id) within a playlist,
+    # playlists by (created_at, id) per user
+    op.create_index('ix_playlist_tracks_playlist_position', 'playlist_tracks', ['playlist_id', 'position', 'id'], unique=False)
+    op.create_index('ix_playlists_user_created', 'playlists', ['user_id', 'created_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_playlists_user_created', table_name='playlists')
+    op.drop_index('ix_playlist_tracks_playlist_position', table_name='playlist_tracks')
@@ -0,0 +1,41 @@
+"""catalog_artists_track_meta
+
+Revision ID: d3acde679374
+Revises: 78db5c9af01a
+Create Date: 2026-10-19 14:31:57.112904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd3acde679374'
+down_revision = '78db5c9af01a'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('artists',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('genres', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.Column('popularity', sa.Integer(), nullable=True),
+    sa.Column('meta_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_artists_name'), 'artists', ['name'], unique=False)
+    op.add_column('tracks', sa.Column('meta_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('tracks', sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tracks', sa.Column('features_fetched_at', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column('tracks', 'features_fetched_at')
+    op.drop_column('tracks', 'fetched_at')
+    op.drop_column('tracks', 'meta_json')
+    op.drop_index(op.f('ix_artists_name'), table_name='artists')
+    op.drop_table('artists')
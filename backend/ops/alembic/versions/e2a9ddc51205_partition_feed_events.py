@@ -0,0 +1,162 @@
+"""partition_feed_events
+
+Revision ID: e2a9ddc51205
+Revises: d5969a68ca93
+Create Date: 2026-10-19 09:12:41.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9ddc51205'
+down_revision = 'd5969a68ca93'
+branch_labels = None
+depends_on = None
+
+# Creates the monthly partition holding `month_start` if it doesn't exist yet.
+# Called here for existing data and by app/workers/rollup.py for upcoming months,
+# so rows only land in the default partition if the job stops running. When they
+# have, CREATE ... PARTITION OF would fail on them, so the month is built as a
+# plain table, the rows are moved over from the default partition and the table is
+# attached (the CHECK lets ATTACH skip its validation scan).
+ENSURE_PARTITION_FN = """
+CREATE OR REPLACE FUNCTION feed_events_ensure_partition(month_start date) RETURNS text AS $$
+DECLARE
+    start_d date := date_trunc('month', month_start)::date;
+    end_d   date := (date_trunc('month', month_start) + interval '1 month')::date;
+    part    text := format('feed_events_%s', to_char(start_d, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN part;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM feed_events_default WHERE created_at >= start_d AND created_at < end_d) THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF feed_events FOR VALUES FROM (%L) TO (%L)',
+            part, start_d, end_d
+        );
+        RETURN part;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE feed_events INCLUDING DEFAULTS)', part);
+    EXECUTE format(
+        'ALTER TABLE %I ADD CONSTRAINT %I CHECK (created_at >= %L AND created_at < %L)',
+        part, part || '_range', start_d, end_d
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM feed_events_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        start_d, end_d, part
+    );
+    EXECUTE format(
+        'ALTER TABLE feed_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        part, start_d, end_d
+    );
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', part, part || '_range');
+    RETURN part;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+COLUMNS = "id, user_id, track_id, session_id, event_type, dwell_ms, position, created_at, updated_at"
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE feed_events RENAME TO feed_events_legacy")
+    op.execute("ALTER TABLE feed_events_legacy RENAME CONSTRAINT feed_events_pkey TO feed_events_legacy_pkey")
+
+    # the partition key has to be part of the primary key
+    op.execute(
+        """
+        CREATE TABLE feed_events (
+            id varchar NOT NULL,
+            user_id varchar NOT NULL REFERENCES users (id),
+            track_id varchar NOT NULL REFERENCES tracks (id),
+            session_id varchar NOT NULL REFERENCES sessions (id),
+            event_type varchar NOT NULL,
+            dwell_ms integer,
+            position integer,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT feed_events_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE TABLE feed_events_default PARTITION OF feed_events DEFAULT")
+    op.execute(ENSURE_PARTITION_FN)
+
+    # one partition per month that has data, plus the current and next two months
+    op.execute(
+        """
+        SELECT feed_events_ensure_partition(m::date)
+        FROM generate_series(
+            date_trunc('month', LEAST(COALESCE((SELECT min(created_at) FROM feed_events_legacy), now()), now())),
+            date_trunc('month', now()) + interval '2 months',
+            interval '1 month'
+        ) AS m
+        """
+    )
+
+    # indexes on the parent cascade to every partition (existing and future)
+    op.create_index('ix_feed_events_user_created', 'feed_events', ['user_id', 'created_at'])
+    op.create_index('ix_feed_events_track_created', 'feed_events', ['track_id', 'created_at'])
+    op.create_index('ix_feed_events_session_created', 'feed_events', ['session_id', 'created_at'])
+
+    op.execute(f"INSERT INTO feed_events ({COLUMNS}) SELECT {COLUMNS} FROM feed_events_legacy")
+    op.drop_table('feed_events_legacy')
+
+    # daily rollups maintained by app/workers/rollup.py
+    op.create_table('track_daily_stats',
+    sa.Column('track_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('events', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('likes', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('skips', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('views', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('users', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('dwell_ms_sum', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('track_id', 'day')
+    )
+    op.create_index('ix_track_daily_stats_day', 'track_daily_stats', ['day'])
+    op.create_table('user_daily_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('events', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('likes', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('skips', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('views', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('sessions', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('dwell_ms_sum', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_index('ix_user_daily_stats_day', 'user_daily_stats', ['day'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_daily_stats_day', table_name='user_daily_stats')
+    op.drop_table('user_daily_stats')
+    op.drop_index('ix_track_daily_stats_day', table_name='track_daily_stats')
+    op.drop_table('track_daily_stats')
+
+    op.create_table('feed_events_legacy',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('track_id', sa.String(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('dwell_ms', sa.Integer(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ),
+    sa.ForeignKeyConstraint(['track_id'], ['tracks.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id', name='feed_events_legacy_pkey')
+    )
+    op.execute(f"INSERT INTO feed_events_legacy ({COLUMNS}) SELECT {COLUMNS} FROM feed_events")
+    op.execute("DROP TABLE feed_events CASCADE")  # drops every partition with it
+    op.execute("DROP FUNCTION IF EXISTS feed_events_ensure_partition(date)")
+    op.execute("ALTER TABLE feed_events_legacy RENAME TO feed_events")
+    op.execute("ALTER TABLE feed_events RENAME CONSTRAINT feed_events_legacy_pkey TO feed_events_pkey")
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from app.services import catalog
+
+
+class _FakeRedis:
+    def __init__(self, data):
+        self.data = data
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+
+@pytest.mark.asyncio
+async def test_cached_metadata_needs_neither_db_nor_spotify(monkeypatch):
+    track = catalog.trim_track({
+        "id": "t1", "name": "Song", "artists": [{"id": "a1", "name": "Band", "href": "x"}],
+        "album": {"name": "LP", "images": [{"url": "u1"}, {"url": "u2"}]},
+    })
+    redis = _FakeRedis({
+        "catalog:track:t1": json.dumps(track),
+        "catalog:features:t1": json.dumps({"tempo": 120.0, "energy": 0.8}),
+        "catalog:artist:a1": json.dumps({"id": "a1", "name": "Band", "genres": ["indie"]}),
+    })
+    monkeypatch.setattr(catalog, "get_redis", lambda: redis)
+
+    async def no_spotify(_id):
+        raise AssertionError("should not reach Spotify")
+
+    for name in ("load_track", "load_artist", "load_audio_features"):
+        monkeypatch.setattr(catalog, name, no_spotify)
+
+    meta = await catalog.track_metadata(None, "t1")  # db=None: any DB access would fail
+    assert meta["track"]["album"]["images"] == [{"url": "u1"}]
+    assert meta["artist"]["genres"] == ["indie"]
+    assert meta["features"] == {"tempo": 120.0, "energy": 0.8}
+
+
+def test_audio_features_ignores_non_spotify_keys():
+    assert catalog.audio_features({"energy": 0.5, "popularity": 80, "analysis": {}}) == {"energy": 0.5}
+    assert catalog.audio_features({"popularity": 80}) is None
+
+
+class _FakeResult:
+    def scalar_one_or_none(self):
+        return None
+
+
+class _FakeDB:
+    def __init__(self):
+        self.writes = []
+
+    async def execute(self, stmt):
+        if not stmt.is_select:
+            self.writes.append(stmt)
+        return _FakeResult()
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_failed_features_lookup_is_not_recorded_as_no_features(monkeypatch):
+    written = {}
+
+    async def cache_set_many(items):
+        written.update(items)
+
+    monkeypatch.setattr(catalog, "get_redis", lambda: _FakeRedis({}))
+    monkeypatch.setattr(catalog, "_cache_set_many", cache_set_many)
+
+    async def load_track(_id):
+        return {"id": "t1", "name": "Song", "artists": []}
+
+    async def load_audio_features(_id):
+        raise TimeoutError("spotify timed out")
+
+    monkeypatch.setattr(catalog, "load_track", load_track)
+    monkeypatch.setattr(catalog, "load_audio_features", load_audio_features)
+    db = _FakeDB()
+
+    meta = await catalog.track_metadata(db, "t1")
+    assert meta["track"]["name"] == "Song" and meta["features"] is None
+    assert "catalog:features:t1" not in written
+    (stmt,) = db.writes
+    assert "features_fetched_at" not in stmt.compile().params
+
+
+@pytest.mark.asyncio
+async def test_features_without_a_track_object_never_insert_a_blank_row():
+    db = _FakeDB()
+    await catalog._store_track(db, "t1", None, {"energy": 0.4}, True)
+    (stmt,) = db.writes
+    assert stmt.is_update
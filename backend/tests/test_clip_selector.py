@@ -0,0 +1,74 @@
+import json
+
+from app.services.recsys import clip_selector
+from app.services.recsys.clip_selector import (
+    choose_clip_window,
+    clip_window_for,
+    compact_analysis,
+)
+
+SECTIONS = [
+    {"start": 0.0, "duration": 30.0, "energy": 0.4, "confidence": 0.9},
+    {"start": 60.0, "duration": 40.0, "energy": 0.9, "confidence": 0.8},
+    {"start": 100.0, "duration": 10.0, "energy": 1.0, "confidence": 0.9},  # too short
+    {"start": 120.0, "duration": 40.0, "energy": 0.95, "confidence": 0.1},  # low confidence
+]
+
+
+class _Track:
+    def __init__(self, provider_track_id, duration_ms, features_json=None):
+        self.provider = "spotify"
+        self.provider_track_id = provider_track_id
+        self.duration_ms = duration_ms
+        self.features_json = features_json
+
+
+def test_packed_and_legacy_sections_agree():
+    legacy = {"analysis": {"sections": SECTIONS}}
+    packed = compact_analysis(legacy)
+    assert "sections" not in packed["analysis"]
+    assert choose_clip_window(200000, legacy) == (70000, 20000)
+    assert choose_clip_window(200000, packed) == (70000, 20000)
+    assert choose_clip_window(200000, json.dumps(packed)) == (70000, 20000)
+
+
+def test_fallback_is_deterministic_per_track():
+    a = [choose_clip_window(200000, None, track_key="spotify:abc") for _ in range(5)]
+    assert len(set(a)) == 1
+    start, dur = a[0]
+    assert 45000 <= start <= 75000 and dur == 20000
+    assert choose_clip_window(0, None, track_key="x") == (30000, 20000)
+
+
+def test_clip_window_for_caches_per_track(monkeypatch):
+    calls = []
+    real = clip_selector.choose_clip_window
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(clip_selector, "choose_clip_window", counting)
+    t = _Track("spotify:track:cache-test", 180000)
+    first = clip_window_for(t)
+    assert clip_window_for(t) == first
+    assert len(calls) == 1
+
+
+def test_clip_window_for_picks_up_new_analysis():
+    t = _Track("spotify:track:reingest-test", 180000, compact_analysis({"analysis": {"sections": SECTIONS}}))
+    before = clip_window_for(t)
+    t.features_json = compact_analysis({"analysis": {"sections": list(reversed(SECTIONS))[:1]}})
+    assert clip_window_for(t) != before
+
+
+def test_clip_window_for_keys_on_updated_at_when_the_row_has_one():
+    from datetime import datetime, timezone
+
+    t = _Track("spotify:track:updated-at-test", 180000, compact_analysis({"analysis": {"sections": SECTIONS}}))
+    t.updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    before = clip_window_for(t)
+    t.features_json = None
+    assert clip_window_for(t) == before  # same row version: cached
+    t.updated_at = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    assert clip_window_for(t) != before
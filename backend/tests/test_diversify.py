@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.services.recsys.diversify import mmr_select, session_lambda
+
+
+def test_mmr_pure_relevance_keeps_order():
+    rel = [0.9, 0.8, 0.7, 0.1]
+    feats = np.eye(4)
+    assert mmr_select(rel, feats, k=4, lam=1.0) == [0, 1, 2, 3]
+
+
+def test_mmr_breaks_up_same_artist_and_near_duplicates():
+    rel = [1.0, 0.95, 0.9, 0.5]
+    feats = np.array([
+        [0.9, 120.0],
+        [0.9, 121.0],   # near-duplicate of 0
+        [0.9, 120.5],   # near-duplicate of 0
+        [0.2, 80.0],    # different
+    ])
+    artists = ["a", "a", "a", "b"]
+    picked = mmr_select(rel, feats, k=2, lam=0.5, artists=artists)
+    assert picked == [0, 3]
+
+
+def test_mmr_missing_labels_never_match():
+    rel = [1.0, 0.9]
+    feats = np.zeros((2, 0))
+    assert mmr_select(rel, feats, k=2, lam=0.5, artists=[None, None]) == [0, 1]
+
+
+def test_mmr_scales_to_large_candidate_sets():
+    rng = np.random.default_rng(0)
+    n = 2000
+    rel = rng.random(n)
+    feats = rng.random((n, 6))
+    artists = [f"artist-{i % 300}" for i in range(n)]
+    t0 = time.perf_counter()
+    picked = mmr_select(rel, feats, k=50, lam=0.7, artists=artists)
+    assert time.perf_counter() - t0 < 1.0
+    assert len(picked) == len(set(picked)) == 50
+
+
+def test_session_lambda_clamps_and_defaults():
+    assert session_lambda({"diversity": 2}) == 0.0       # max variety
+    assert session_lambda({"diversity": -1}) == 1.0      # pure relevance
+    assert session_lambda({"diversity": "0.3"}) == pytest.approx(0.7)
+    assert session_lambda({}, default=0.6) == 0.6
+    assert session_lambda({"diversity": "nope"}, default=0.6) == 0.6
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from app.services.recsys.evaluation import MetricAccumulator, SessionLog, logged_ranker, replay
+
+
+def test_session_log_merges_events_per_track():
+    s = SessionLog("s1", "u1")
+    s.add("t1", "view", 5000, 0)
+    s.add("t1", "like", 21000, 0)
+    s.add("t2", "skip", 800, 1)
+    t1, t2 = s.items["t1"], s.items["t2"]
+    assert t1.liked and t1.engaged and t1.dwell_ms == 21000
+    assert t1.gain == pytest.approx(2.0)
+    assert t2.skipped and not t2.engaged and t2.gain == 0.0
+
+
+def test_metrics_perfect_and_inverted_order():
+    acc = MetricAccumulator([2])
+    best = np.array([2.0, 1.0, 0.0])
+    acc.add_batch([best, best[::-1]], [np.array([1, 1, 0]), np.array([0, 1, 1])],
+                  [np.array([1, 0, 0]), np.array([0, 0, 1])], [best, best])
+    rep = acc.report()
+    assert rep["sessions"] == 2
+    assert rep["ctr@2"] == pytest.approx((1.0 + 0.5) / 2)
+    assert rep["like_rate@2"] == pytest.approx((0.5 + 0.0) / 2)
+    inverted = (1.0 / np.log2(3)) / (2.0 + 1.0 / np.log2(3))
+    assert rep["ndcg_dwell@2"] == pytest.approx((1.0 + inverted) / 2)
+
+
+@pytest.mark.asyncio
+async def test_logged_ranker_restores_logged_positions():
+    s = SessionLog("s1", "u1")
+    s.add("b", "view", None, 1)
+    s.add("a", "view", None, 0)
+    ranked = await logged_ranker("u1", "s1", list(s.items.values()), k=2)
+    assert [c.id for c in ranked] == ["a", "b"]
+
+
+def test_ndcg_ideal_comes_from_the_logged_slate_not_the_ranked_output():
+    acc = MetricAccumulator([2])
+    # the ranker returned only the weakest item; the slate had a better one
+    acc.add_batch([np.array([1.0])], [np.array([1])], [np.array([0])], [np.array([2.0, 1.0])])
+    assert acc.report()["ndcg_dwell@2"] == pytest.approx(1.0 / (2.0 + 1.0 / np.log2(3)))
+
+
+@pytest.mark.asyncio
+async def test_replay_drops_a_session_for_every_ranker_when_one_fails(monkeypatch):
+    sessions = []
+    for sid in ("s1", "s2"):
+        s = SessionLog(sid, "u1")
+        s.add("a", "like", 20000, 0)
+        s.add("b", "skip", 500, 1)
+        sessions.append(s)
+
+    async def fake_iter_sessions(db, **kwargs):
+        for s in sessions:
+            yield s
+
+    async def flaky(user_id, session_id, candidates, k=10):
+        if session_id == "s2":
+            raise RuntimeError("boom")
+        return candidates[:k]
+
+    monkeypatch.setattr("app.services.recsys.evaluation.iter_sessions", fake_iter_sessions)
+    report = await replay(None, {"logged": logged_ranker, "flaky": flaky}, ks=(2,))
+    assert report["logged"]["sessions"] == report["flaky"]["sessions"] == 1
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.services.event_sink import EventSink, EventSinkFull, event_row
+
+
+def _rows(n):
+    return [event_row("u1", "s1", f"t{i}", "like") for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_sink_batches_rows_and_flushes_on_stop():
+    batches = []
+
+    async def writer(rows):
+        batches.append(list(rows))
+
+    sink = EventSink(writer=writer, batch_size=4, flush_interval_s=0.05)
+    sink.start()
+    assert await sink.put_many(_rows(10)) == 10
+    await asyncio.sleep(0.01)
+    await sink.stop()
+
+    assert sum(len(b) for b in batches) == 10
+    assert all(len(b) <= 4 for b in batches)
+    assert [r["track_id"] for b in batches for r in b] == [f"t{i}" for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_sink_applies_backpressure_when_full():
+    release = asyncio.Event()
+
+    async def slow_writer(rows):
+        await release.wait()
+
+    sink = EventSink(writer=slow_writer, batch_size=1, max_queue=2, enqueue_timeout_s=0.01)
+    sink.start()
+    await sink.put(_rows(1)[0])
+    await asyncio.sleep(0.01)  # first row is now stuck in the writer
+    assert await sink.put_many(_rows(5)) == 2
+    with pytest.raises(EventSinkFull):
+        await sink.put(_rows(1)[0])
+    release.set()
+    await sink.stop()
+
+
+@pytest.mark.asyncio
+async def test_one_bad_row_does_not_drop_the_rest_of_the_batch():
+    from sqlalchemy.exc import IntegrityError
+
+    stored = []
+
+    async def writer(rows):
+        if any(r["track_id"] == "t5" for r in rows):  # e.g. track not in tracks
+            raise IntegrityError("INSERT INTO feed_events", {}, Exception("fk violation"))
+        stored.extend(rows)
+
+    sink = EventSink(writer=writer, batch_size=10, flush_interval_s=0.05)
+    sink.start()
+    await sink.put_many(_rows(10))
+    await sink.stop()
+
+    assert sorted(r["track_id"] for r in stored) == sorted(f"t{i}" for i in range(10) if i != 5)
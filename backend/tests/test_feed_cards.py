@@ -0,0 +1,38 @@
+import json
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.api.feed import FeedCard, build_card
+from fastapi.responses import ORJSONResponse
+
+
+def _track(i, **extra):
+    t = {
+        "id": f"t{i}",
+        "provider_track_uri": f"spotify:track:t{i}",
+        "title": f"Song {i}",
+        "artist": "A, B",
+        "artwork_url": None,
+        "duration_ms": 200000,
+        "popularity": 30,
+        "artists_raw": [{"id": "a1", "name": "A"}],
+        "artist_genres": ["synthwave"],
+    }
+    t.update(extra)
+    return t
+
+
+def test_cards_validate_and_serialize_like_the_pydantic_path():
+    feats = {"energy": 0.7, "valence": 0.4, "tempo": 120.0, "instrumentalness": 0.1, "key": 5}
+    cards = [
+        build_card(_track(0), "why", feats),
+        build_card(_track(1, popularity="n/a", artists_raw="Solo"), "why", None),
+        build_card(_track(2, duration_ms=None, artists_raw=[]), "why", None),
+    ]
+    adapter = TypeAdapter(List[FeedCard])
+    validated = adapter.validate_python(cards)
+    assert json.loads(ORJSONResponse(cards).body) == json.loads(adapter.dump_json(validated))
+    assert cards[0]["meta"]["discovery_score"] == 70
+    assert cards[1]["meta"]["artist"]["name"] == "Solo"
+    assert cards[2]["preview"]["duration_ms"] == 30000
@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.db import get_db
+
+
+async def override_get_db():
+    yield None
+
+
+@pytest.fixture
+def no_db():
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_only_stored_events(no_db):
+    events = [{"user_id": "u1", "session_id": "s1", "track_id": f"t{i}", "event": "like"} for i in range(3)]
+
+    async def store_two(db, rows):
+        return 2
+
+    async def store_fails(db, rows):
+        raise RuntimeError("db down")
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        with patch("app.api.feedback._store_events", store_two):
+            assert (await ac.post("/feedback/batch", json={"events": events})).json()["accepted"] == 2
+        with patch("app.api.feedback._store_events", store_fails):
+            body = (await ac.post("/feedback/batch", json={"events": events})).json()
+    assert body == {"ok": True, "accepted": 0}
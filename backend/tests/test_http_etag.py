@@ -0,0 +1,57 @@
+import httpx
+import pytest
+
+from app.services.providers import http
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expired = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def expire(self, key, ttl):
+        self.expired.append(key)
+
+
+@pytest.mark.asyncio
+async def test_get_json_revalidates_with_if_none_match(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(http, "get_redis", lambda: redis)
+    http.clear_etag_cache()
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"tracks": [{"id": "t1"}]}, headers={"ETag": '"v1"'})
+
+    url = "https://api.spotify.com/v1/tracks"
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+        first = await http.get_json("spotify", url, params={"ids": "t1"}, client=c)
+        second = await http.get_json("spotify", url, params={"ids": "t1"}, client=c)
+        # another process: nothing in its LRU, body comes from Redis
+        http.clear_etag_cache()
+        third = await http.get_json("spotify", url, params={"ids": "t1"}, client=c)
+
+    assert first == second == third == {"tracks": [{"id": "t1"}]}
+    assert seen == [None, '"v1"', '"v1"']
+    assert len(redis.expired) == 2
+
+
+def test_local_etag_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(http.settings, "ETAG_CACHE_LOCAL_MAX_BYTES", 8000)
+    http.clear_etag_cache()
+    for i in range(10):
+        http._remember_etag(f"k{i}", '"v"', {}, 1000)
+    http._remember_etag("big", '"v"', {}, 5000)  # over 1/8 of the budget: Redis only
+
+    assert list(http._etag_lru) == [f"k{i}" for i in range(2, 10)]
+    assert http._etag_lru_bytes == 8000
+    http.clear_etag_cache()
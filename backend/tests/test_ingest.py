@@ -0,0 +1,48 @@
+import json
+
+from app.workers.ingest import Checkpoint, batched, iter_records, validate_batch
+
+
+def test_jsonl_and_csv_records_validate_to_staging_rows(tmp_path):
+    jl = tmp_path / "tracks.jsonl"
+    jl.write_text("\n".join([
+        json.dumps({"provider": "spotify", "provider_track_id": "spotify:track:abc", "title": "A",
+                    "artist": "X", "duration_ms": "200000", "features": {"energy": 0.7}}),
+        "{not json",
+        json.dumps({"provider": "spotify", "provider_track_id": "spotify:track:def", "artist": "Y"}),
+    ]))
+    csvf = tmp_path / "features.csv"
+    csvf.write_text("id,tempo,energy\nabc,124,0.9\n")
+
+    records, rejected = validate_batch(list(iter_records(jl)) + list(iter_records(csvf)))
+    full, feats_only = records
+    assert full["id"] == "abc" and full["duration_ms"] == 200000
+    assert full["features_json"] == {"energy": 0.7}
+    assert feats_only == {"id": "abc", "title": None, "features_json": {"tempo": 124.0, "energy": 0.9}}
+    assert rejected == {"unparseable line": 1, "no title and no features": 1}
+
+
+def test_checkpoint_resumes_until_the_file_changes(tmp_path):
+    src = tmp_path / "tracks.jsonl"
+    src.write_text("{}\n" * 5)
+    state = tmp_path / "ckpt.json"
+
+    Checkpoint(state).advance(src, 3)
+    assert Checkpoint(state).done(src) == 3
+
+    src.write_text("{}\n" * 6)
+    assert Checkpoint(state).done(src) == 0
+    assert [len(b) for b in batched(iter_records(src), 4)] == [4, 2]
+
+
+def test_bare_spotify_ids_key_tracks_like_the_api():
+    records, _ = validate_batch([
+        {"provider": "spotify", "provider_track_id": "4uLU6hMCjMI75M1A2tKUQC", "title": "A", "artist": "X"},
+        {"provider": "spotify", "provider_track_id": "spotify:track:4uLU6hMCjMI75M1A2tKUQC", "title": "A",
+         "artist": "X"},
+        {"provider": "youtube", "provider_track_id": "dQw4w9WgXcQ", "title": "B", "artist": "Y"},
+    ])
+    bare, uri, other = records
+    assert bare["id"] == uri["id"] == "4uLU6hMCjMI75M1A2tKUQC"
+    assert bare["provider_track_id"] == uri["provider_track_id"] == "spotify:track:4uLU6hMCjMI75M1A2tKUQC"
+    assert (other["id"], other["provider_track_id"]) == ("youtube:dQw4w9WgXcQ", "dQw4w9WgXcQ")
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+
+from app.settings import settings
+from app.services.providers import http, spotify_playlists as sp
+from loadtest.fakes import FaultProfile, make_spotify_app
+from loadtest.run import percentile
+
+
+@pytest.mark.asyncio
+async def test_fake_spotify_pages_and_revalidates(monkeypatch):
+    async def token():
+        return "tok"
+    monkeypatch.setattr(sp, "_get_app_token", token)
+    monkeypatch.setattr(settings, "SPOTIFY_API_BASE", "http://spotify.fake/v1")
+    http.clear_etag_cache()
+
+    app = make_spotify_app(FaultProfile(), playlist_size=250)
+    statuses = []
+
+    async def log(response):
+        statuses.append(response.status_code)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, event_hooks={"response": [log]}) as c:
+        first = [t async for t in sp.iter_playlist_tracks("p1", client=c)]
+        again = [t async for t in sp.iter_playlist_tracks("p1", client=c)]
+
+    assert len(first) == 250 and first == again
+    assert statuses == [200, 200, 200, 304, 304, 304]
+
+
+@pytest.mark.asyncio
+async def test_fault_profile_throttles():
+    app = make_spotify_app(FaultProfile(throttle_rate=1.0, retry_after_s=2, seed=1))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://spotify.fake") as c:
+        r = await c.get("/v1/tracks", params={"ids": "a,b"})
+    assert r.status_code == 429 and r.headers["Retry-After"] == "2"
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import pytest
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+from app.services import metrics  # noqa: E402
+from app.services.telemetry import stage  # noqa: E402
+
+
+def _value(name, **labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_stage_and_llm_usage_are_recorded():
+    before = _value("sampler_stage_seconds_count", stage="feed.test")
+    with stage("feed.test"):
+        pass
+    assert _value("sampler_stage_seconds_count", stage="feed.test") == before + 1
+
+    labels = dict(caller="test", model="m")
+    prompt = _value("sampler_llm_tokens_total", kind="prompt", **labels)
+    metrics.record_llm("test", "m", 0.2, {"prompt_tokens": 120, "completion_tokens": 30})
+    metrics.record_llm("test", "m", 0.1, SimpleNamespace(prompt_tokens=5, completion_tokens=None))
+    assert _value("sampler_llm_tokens_total", kind="prompt", **labels) == prompt + 125
+    assert _value("sampler_llm_seconds_count", **labels) == 2
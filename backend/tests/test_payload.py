@@ -0,0 +1,51 @@
+from app.services.payload import compact_card, compact_explain_raw, parse_fields, select_fields
+
+CARD = {
+    "track_id": "t1",
+    "provider": "spotify",
+    "provider_track_id": "spotify:track:t1",
+    "title": "Song",
+    "artist": "A",
+    "artwork_url": None,
+    "preview": {"type": "spotify_websdk", "start_ms": 0, "duration_ms": 1000},
+    "tags": [],
+    "reason": "why",
+    "meta": {
+        "features": {"energy": 0.5, "valence": 0.2, "tempo": 120.0, "instrumentalness": 0.0},
+        "discovery_score": 40,
+        "artist": {"id": "a1", "name": "A", "genres": ["x", "y"], "popularity": 60},
+    },
+}
+
+
+def test_compact_card_keeps_what_the_app_renders():
+    c = compact_card(CARD)
+    assert "tags" not in c and c["title"] == "Song"
+    assert c["meta"] == {
+        "features": {"energy": 0.5, "valence": 0.2, "tempo": 120.0},
+        "discovery_score": 40,
+        "artist": {"name": "A"},
+    }
+    assert CARD["meta"]["artist"]["genres"] == ["x", "y"]  # input untouched
+
+
+def test_select_fields_with_dotted_paths():
+    paths = parse_fields("track_id, meta.features.tempo,meta.artist.name,missing.key")
+    assert select_fields(CARD, paths) == {
+        "track_id": "t1",
+        "meta": {"features": {"tempo": 120.0}, "artist": {"name": "A"}},
+    }
+    assert parse_fields(" , ") is None
+
+
+def test_compact_explain_raw_drops_full_provider_objects():
+    raw = compact_explain_raw(
+        {"id": "t1", "name": "Song", "album": {"images": [{}] * 3}, "available_markets": ["US"] * 80},
+        {"id": "a1", "name": "A", "genres": ["x"], "followers": {"total": 3}},
+        {"energy": 0.5, "tempo": 99.0, "loudness": -5.0},
+    )
+    assert raw == {
+        "audio_features": {"energy": 0.5, "tempo": 99.0},
+        "artist": {"id": "a1", "name": "A", "genres": ["x"]},
+        "track": {"id": "t1", "name": "Song"},
+    }
@@ -0,0 +1,179 @@
+from collections import namedtuple
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.api.playlists import _decode_cursor, _encode_cursor
+from app.services.db import get_db
+
+Row = namedtuple(
+    "Row",
+    "id user_id name kind pt_id position track_id provider provider_track_id title artist artwork_url added_at",
+)
+
+
+async def override_get_db():
+    yield None
+
+
+@pytest.fixture
+def no_db():
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+def _row(i):
+    return Row("p1", "u1", "Mix", "vibe", f"pt{i}", i * 1024, f"t{i}", "spotify",
+               f"spotify:track:{i}", f"Song {i}", "Artist", None, None)
+
+
+def test_cursor_roundtrip():
+    assert _decode_cursor(_encode_cursor(2048, "pt2")) == [2048, "pt2"]
+
+
+@pytest.mark.asyncio
+async def test_playlist_page_sets_next_cursor(no_db):
+    rows = [_row(i) for i in range(3)]  # limit=2 → one extra row means "more"
+    with patch("app.api.playlists.get_playlist_page", return_value=rows) as page:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            resp = await ac.get("/playlists/p1?limit=2")
+            body = resp.json()
+            assert resp.status_code == 200
+            assert [t["track_id"] for t in body["tracks"]] == ["t0", "t1"]
+            assert _decode_cursor(body["next_cursor"]) == [1024, "pt1"]
+
+            await ac.get(f"/playlists/p1?limit=2&cursor={body['next_cursor']}")
+            assert page.call_args.args[3] == (1024, "pt1")
+
+
+@pytest.mark.asyncio
+async def test_empty_and_missing_playlists(no_db):
+    empty = Row("p1", "u1", "Mix", "vibe", *([None] * 9))
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        with patch("app.api.playlists.get_playlist_page", return_value=[empty]):
+            body = (await ac.get("/playlists/p1")).json()
+            assert body["tracks"] == [] and body["next_cursor"] is None
+        with patch("app.api.playlists.get_playlist_page", return_value=[]):
+            assert (await ac.get("/playlists/nope")).status_code == 404
+        assert (await ac.get("/playlists/p1?cursor=garbage")).status_code == 400
+
+
+class _PgError(Exception):
+    def __init__(self, constraint_name):
+        self.constraint_name = constraint_name
+
+
+def test_only_the_playlist_fk_counts_as_missing_playlist():
+    from sqlalchemy.exc import IntegrityError
+
+    from app.api.playlists import PLAYLIST_FK, _violated_constraint
+
+    wrapped = Exception("adapted")
+    wrapped.__cause__ = _PgError(PLAYLIST_FK)  # how the asyncpg adapter chains it
+    assert _violated_constraint(IntegrityError("INSERT", {}, wrapped)) == PLAYLIST_FK
+    other = IntegrityError("INSERT", {}, _PgError("playlist_tracks_track_id_fkey"))
+    assert _violated_constraint(other) != PLAYLIST_FK
+
+
+# ---------- repository: bulk add / move (scripted session, no database) ----------
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def all(self):
+        return self.value
+
+    def first(self):
+        return self.value[0] if self.value else None
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+
+class _ScriptedDB:
+    """Hands out canned results in order and records every statement."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Result(self.results.pop(0) if self.results else None)
+
+
+def _params(stmt):
+    from sqlalchemy.dialects import postgresql
+
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def _moved_to(db):
+    update = db.statements[-1]
+    assert update.is_update
+    return _params(update)["position"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_appends_after_last_position_and_counts_skips():
+    from app.repositories.playlists import POSITION_GAP, bulk_add_tracks
+
+    tracks = [{"track_id": t, "provider": "spotify", "provider_track_id": f"spotify:track:{t}"}
+              for t in ("a", "b", "a", "c")]
+    # head (playlist, last position), track stubs upsert, playlist_tracks insert
+    # returning only "a" and "c" ("b" is already in the playlist)
+    db = _ScriptedDB([("p1", 4096)], None, ["pt-a", "pt-c"])
+    assert await bulk_add_tracks(db, "p1", tracks) == (2, 2)
+
+    rows = db.statements[2].compile().params
+    positions = [rows[f"position_m{i}"] for i in range(3)]
+    assert positions == [4096 + POSITION_GAP, 4096 + 2 * POSITION_GAP, 4096 + 3 * POSITION_GAP]
+    assert await bulk_add_tracks(_ScriptedDB([]), "nope", tracks) is None
+
+
+@pytest.mark.asyncio
+async def test_move_takes_the_midpoint_of_its_new_neighbours():
+    from app.repositories.playlists import move_track
+
+    db = _ScriptedDB([("t3", 3072), ("t1", 1024)], 2048)  # positions, next track below t1
+    assert await move_track(db, "p1", "t3", "t1") is True
+    assert _moved_to(db) == 1536
+
+
+@pytest.mark.asyncio
+async def test_move_to_head_goes_one_gap_above_the_first_track():
+    from app.repositories.playlists import POSITION_GAP, move_track
+
+    db = _ScriptedDB([("t3", 3072)], 1024)
+    assert await move_track(db, "p1", "t3", None) is True
+    assert _moved_to(db) == 1024 - POSITION_GAP
+
+
+@pytest.mark.asyncio
+async def test_move_renumbers_once_when_neighbours_are_adjacent():
+    from app.repositories.playlists import move_track
+
+    db = _ScriptedDB(
+        [("t3", 3072), ("t1", 1000)], 1001,   # no room between t1 and its neighbour
+        None,                                  # renumber UPDATE
+        [("t3", 3072), ("t1", 1024)], 2048,    # re-read after renumbering
+    )
+    assert await move_track(db, "p1", "t3", "t1") is True
+    assert db.statements[2].is_update and "row_number" in str(db.statements[2])
+    assert _moved_to(db) == 1536
+
+
+@pytest.mark.asyncio
+async def test_move_with_unknown_anchor_changes_nothing():
+    from app.repositories.playlists import move_track
+
+    db = _ScriptedDB([("t3", 3072)])  # after_track_id isn't in the playlist
+    assert await move_track(db, "p1", "t3", "ghost") is False
+    assert not any(s.is_update for s in db.statements)
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.services.resilience import CircuitBreaker, CircuitOpen, LatencyTracker, hedged
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_then_probes_and_closes():
+    clock = FakeClock()
+    b = CircuitBreaker("up", failure_threshold=2, reset_timeout_s=10, clock=clock)
+
+    async def boom():
+        raise RuntimeError("502")
+
+    async def ok():
+        return "ok"
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await b.call(boom)
+    assert b.state == "open"
+    with pytest.raises(CircuitOpen):
+        await b.call(ok)
+
+    clock.now = 10
+    assert b.state == "half_open"
+    assert b.allow() and not b.allow()  # only one probe at a time
+    b.record_failure()
+    assert b.state == "open"
+
+    clock.now = 25
+    assert await b.call(ok) == "ok"
+    assert b.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_hedged_returns_faster_second_attempt():
+    delays = [0.5, 0.01]
+    started = []
+
+    async def fetch():
+        n = len(started)
+        started.append(n)
+        await asyncio.sleep(delays[n])
+        return n
+
+    assert await hedged(fetch, 0.02) == 1
+    assert started == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_caller_before_the_hedge_cancels_the_request():
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.ensure_future(hedged(fetch, 5.0))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.wait_for(cancelled.wait(), 1.0)
+
+
+def test_latency_percentile_needs_samples():
+    t = LatencyTracker(window=100, min_samples=10)
+    for i in range(9):
+        t.record(i / 100)
+    assert t.percentile(95) is None
+    t.record(1.0)
+    assert t.percentile(100) == 1.0 and t.percentile(0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_frees_the_probe_slot():
+    clock = FakeClock()
+    b = CircuitBreaker("up", failure_threshold=1, reset_timeout_s=10, clock=clock)
+    b.record_failure()
+    clock.now = 10
+
+    probe = asyncio.ensure_future(b.call(lambda: asyncio.sleep(10)))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    async def ok():
+        return "ok"
+
+    assert await b.call(ok) == "ok"  # the next call gets to probe
+    assert b.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_hedged_survives_a_cancelled_attempt():
+    started = []
+
+    async def fetch():
+        n = len(started)
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10 if n == 0 else 0.05)
+        return n
+
+    async def cancel_first():
+        await asyncio.sleep(0.03)  # after the hedge has started
+        started[0].cancel()
+
+    canceller = asyncio.ensure_future(cancel_first())
+    assert await hedged(fetch, 0.01) == 1
+    await canceller
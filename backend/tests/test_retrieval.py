@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.track import Track
+from app.services.recsys.features import FEATURE_KEYS, feature_vector
+from app.services.recsys.retrieval import feature_predicates, seed_feature_ranges
+
+
+def test_feature_vector_accepts_jsonb_dict_and_legacy_string():
+    d = {"tempo": 120, "energy": 0.8, "popularity": None}
+    a = feature_vector(SimpleNamespace(features_json=d))
+    b = feature_vector(SimpleNamespace(features_json='{"tempo": 120, "energy": 0.8}'))
+    assert np.allclose(a, b)
+    assert a[FEATURE_KEYS.index("energy")] == 0.8
+    assert not feature_vector(SimpleNamespace(features_json=None)).any()
+
+
+def test_seed_ranges_push_down_as_indexable_predicates():
+    ranges = seed_feature_ranges({"bpm": 125, "energy": 0.9})
+    assert ranges["tempo"] == (120.0, 130.0)
+    assert ranges["energy"][1] == 1.0
+
+    stmt = select(Track.id).where(*feature_predicates({**ranges, "valence": (0.5, None)}))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    # key inlined so it matches the expression index definition
+    assert "CAST(tracks.features_json ->> 'tempo' AS FLOAT) BETWEEN" in sql
+    assert "CAST(tracks.features_json ->> 'valence' AS FLOAT) >=" in sql
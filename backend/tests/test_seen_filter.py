@@ -0,0 +1,54 @@
+import pytest
+
+from app.services.recsys import seen_filter
+
+
+class _FakePipe:
+    def __init__(self, redis):
+        self.redis, self.ops = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def exists(self, *keys):
+        self.ops.append(sum(k in self.redis.data for k in keys))
+
+    def zmscore(self, key, ids):
+        self.ops.append([None] * len(ids))
+
+    async def execute(self):
+        return self.ops
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, ex)
+
+    def pipeline(self, transaction=False):
+        return _FakePipe(self)
+
+
+class _NoEvents:
+    def __init__(self):
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        return []
+
+
+@pytest.mark.asyncio
+async def test_empty_backfill_marks_the_user_so_the_next_feed_skips_it(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(seen_filter, "get_redis", lambda: redis)
+
+    assert (await seen_filter.seen_track_ids("u1", ["t1"]))[1] is False  # cold
+    assert await seen_filter.backfill_seen(_NoEvents(), "u1") == set()
+    assert redis.data["seen:empty:u1"][1] == seen_filter.settings.SEEN_EMPTY_TTL_S
+    assert await seen_filter.seen_track_ids("u1", ["t1"]) == (set(), True)
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import session_cache
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.mark.asyncio
+async def test_load_session_reads_through_and_then_skips_db(monkeypatch):
+    redis = _FakeRedis()
+    db_calls = []
+
+    async def fake_get_session(db, session_id):
+        db_calls.append(session_id)
+        return SimpleNamespace(id=session_id, user_id="u1", seed_json={"query": "synthwave"})
+
+    monkeypatch.setattr(session_cache, "get_redis", lambda: redis)
+    monkeypatch.setattr(session_cache, "get_session", fake_get_session)
+    session_cache.clear_local()
+
+    first = await session_cache.load_session(None, "s1")
+    assert first["seed"] == {"query": "synthwave"}
+    assert "session:s1" in redis.data
+
+    # process LRU, then Redis after the LRU is cleared: no further DB reads
+    assert await session_cache.load_session(None, "s1") == first
+    session_cache.clear_local()
+    assert await session_cache.load_session(None, "s1") == first
+    assert db_calls == ["s1"]
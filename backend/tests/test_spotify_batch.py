@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import resilience
+from app.services.providers.spotify_batch import FetchIncomplete, MicroBatcher, fetch_many
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_chunks_by_endpoint_limit_and_merges():
+    seen_chunks = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = request.url.params["ids"].split(",")
+        seen_chunks.append(len(ids))
+        # Spotify returns null for unknown ids
+        return httpx.Response(200, json={"audio_features": [{"id": i} if i != "t7" else None for i in ids]})
+
+    ids = [f"t{i}" for i in range(250)] + ["t1"]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+        out = await fetch_many("audio-features", ids, "tok", client=c)
+
+    assert sorted(seen_chunks) == [50, 100, 100]
+    assert len(out) == 249 and "t7" not in out
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_coalesces_concurrent_loads():
+    calls = []
+
+    async def fetch(ids):
+        calls.append(sorted(ids))
+        return {i: {"id": i} for i in ids if i != "missing"}
+
+    b = MicroBatcher(fetch, max_batch=50, window_ms=5)
+    results = await asyncio.gather(b.load("a"), b.load("b"), b.load("a"), b.load("missing"))
+
+    assert calls == [["a", "b", "missing"]]
+    assert results == [{"id": "a"}, {"id": "b"}, {"id": "a"}, None]
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_raises_with_the_other_chunks_results(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})  # keep the 503 out of the shared breaker
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = request.url.params["ids"].split(",")
+        if "t0" in ids:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"tracks": [{"id": i} if i != "t60" else None for i in ids]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+        with pytest.raises(FetchIncomplete) as exc:
+            await fetch_many("tracks", [f"t{i}" for i in range(100)], "tok", client=c)
+    assert exc.value.failed == {f"t{i}" for i in range(50)}
+    assert len(exc.value.found) == 49 and "t60" not in exc.value.found
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_fails_only_ids_from_failed_chunks():
+    async def fetch(ids):
+        raise FetchIncomplete("tracks", {"ok": {"id": "ok"}}, {"lost"}, TimeoutError("chunk timed out"))
+
+    b = MicroBatcher(fetch, max_batch=50, window_ms=5)
+    lost, ok, unknown = await asyncio.gather(b.load("lost"), b.load("ok"), b.load("unknown"),
+                                             return_exceptions=True)
+    assert isinstance(lost, TimeoutError)
+    assert ok == {"id": "ok"} and unknown is None
@@ -0,0 +1,53 @@
+import random
+
+import httpx
+import pytest
+
+from app.services.providers import http, spotify_playlists as sp
+
+
+def _handler(total, page_calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        offset, limit = int(params.get("offset", 0)), int(params["limit"])
+        assert "fields" in params
+        page_calls.append(offset)
+        items = [{"track": {"id": f"t{i}", "name": f"n{i}", "artists": [{"id": "a", "name": "A"}]}}
+                 for i in range(offset, min(offset + limit, total))]
+        items.append({"track": None})  # removed / local track
+        nxt = None
+        if offset + limit < total:
+            nxt = f"https://api.spotify.com/v1/playlists/p/tracks?offset={offset + limit}&limit={limit}&fields={params['fields']}"
+        return httpx.Response(200, json={"items": items, "next": nxt})
+    return handler
+
+
+@pytest.fixture(autouse=True)
+def _token(monkeypatch):
+    async def token():
+        return "tok"
+    monkeypatch.setattr(sp, "_get_app_token", token)
+
+
+@pytest.mark.asyncio
+async def test_iter_follows_next_links_and_stops_early():
+    calls = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_handler(250, calls))) as c:
+        all_ids = [t["id"] async for t in sp.iter_playlist_tracks("p", client=c)]
+        assert all_ids == [f"t{i}" for i in range(250)]
+        assert calls == [0, 100, 200]
+
+        calls.clear()
+        first = [t async for t in sp.iter_playlist_tracks("p", max_tracks=30, client=c)]
+        assert len(first) == 30 and calls == [0]
+
+
+@pytest.mark.asyncio
+async def test_reservoir_sample_spans_the_whole_playlist(monkeypatch):
+    calls = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler(500, calls)))
+    monkeypatch.setattr(http, "get_client", lambda: client)
+
+    sample = await sp.sample_playlist_tracks("p", k=20, rng=random.Random(7))
+    idx = sorted(int(t["id"][1:]) for t in sample)
+    assert len(set(idx)) == 20 and idx[-1] >= 100
@@ -3,8 +3,9 @@
 
 import { useEffect, useRef, useState, useCallback } from "react"
 import { useSearchParams, useRouter } from "next/navigation"
-import { Loader2 } from "lucide-react"
+import { ListPlus, Loader2 } from "lucide-react"
 import { Header } from "@/components/Header"
+import { Button } from "@/components/ui/button"
 import { FeedCard } from "@/components/FeedCard"
 import {
   useFeedQuery,
@@ -18,9 +19,13 @@ import {
   branchSession,
   ensureLikedPlaylist,
   addTrackToPlaylist,
+  addTracksToPlaylist,
   getPlaylists,
 } from "@/lib/api"
 
+// the bulk endpoint takes at most this many tracks per request
+const BULK_ADD_MAX = 500
+
 export default function FeedPage() {
   const searchParams = useSearchParams()
   const sessionId = searchParams.get("session_id") || ""
@@ -156,6 +161,38 @@ export default function FeedPage() {
 
   const allCards = data?.pages.flat() || []
 
+  // save every loaded card to the playlist picked in the header (or Liked) in one request
+  const [savingFeed, setSavingFeed] = useState(false)
+  const handleSaveFeed = async () => {
+    const target = selectedPlaylist ?? (likedPlaylistId ? { id: likedPlaylistId, name: "Liked" } : null)
+    if (!target || allCards.length === 0) return
+    setSavingFeed(true)
+    try {
+      const { added, skipped } = await addTracksToPlaylist(
+        target.id,
+        allCards.slice(0, BULK_ADD_MAX).map((card) => ({
+          provider: card.provider ?? "spotify",
+          provider_track_id: card.provider_track_id ?? `spotify:track:${card.track_id}`,
+          title: card.title,
+          artist: card.artist,
+          artwork_url: card.artwork_url,
+        })),
+      )
+      toast({
+        title: "Saved",
+        description: `Added ${added} tracks to "${target.name}"${skipped ? ` (${skipped} already there)` : ""}`,
+      })
+    } catch (err) {
+      toast({
+        title: "Error",
+        description: "Failed to save the feed",
+        variant: "destructive",
+      })
+    } finally {
+      setSavingFeed(false)
+    }
+  }
+
   if (isLoading) {
     return (
       <div className="min-h-screen flex items-center justify-center">
@@ -167,6 +204,16 @@ export default function FeedPage() {
   return (
     <div className="min-h-screen bg-background pb-20">
       <Header onSelectPlaylist={handleSelectPlaylist} />
+      <Button
+        size="sm"
+        variant="secondary"
+        className="fixed bottom-4 right-4 z-40"
+        disabled={savingFeed || allCards.length === 0 || (!selectedPlaylist && !likedPlaylistId)}
+        onClick={handleSaveFeed}
+      >
+        {savingFeed ? <Loader2 className="h-4 w-4 animate-spin" /> : <ListPlus className="h-4 w-4" />}
+        <span className="ml-2">Save feed{selectedPlaylist ? ` to ${selectedPlaylist.name}` : ""}</span>
+      </Button>
       <div
         ref={containerRef}
         className="snap-y snap-mandatory h-[calc(100vh-4rem)] overflow-y-auto pt-16"
@@ -186,7 +186,8 @@ export function FeedCard({
     setShowExplain(true)
 
     try {
-      const res = await fetch("/api/explain/track", {
+      // compact: raw carries only the audio features / artist we show
+      const res = await fetch("/api/explain/track?compact=true", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
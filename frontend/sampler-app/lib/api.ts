@@ -4,7 +4,7 @@ import type { FeedCard, FeedbackPayload, Playlist, Session } from "./types"
 const API_BASE = "/api"
 console.log("API_BASE =", API_BASE)
 
-async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T> {
+async function requestAPI(endpoint: string, options?: RequestInit): Promise<Response> {
   const url = `${API_BASE}${endpoint}`
   try {
     const res = await fetch(url, {
@@ -20,17 +20,22 @@ async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T>
       const text = await res.text().catch(() => "")
       throw new Error(`HTTP ${res.status} on ${url}: ${text || res.statusText}`)
     }
-
-    // if backend returns no body
-    if (res.status === 204) return {} as T
-
-    return (await res.json()) as T
+    return res
   } catch (err) {
     console.error("fetchAPI failed:", url, err)
     throw err instanceof Error ? err : new Error(String(err))
   }
 }
 
+async function fetchAPI<T>(endpoint: string, options?: RequestInit): Promise<T> {
+  const res = await requestAPI(endpoint, options)
+
+  // if backend returns no body
+  if (res.status === 204) return {} as T
+
+  return (await res.json()) as T
+}
+
 /* ===== feed ===== */
 export async function getFeed({
   user_id,
@@ -41,7 +46,8 @@ export async function getFeed({
   session_id: string
   cursor?: string
 }): Promise<FeedCard[]> {
-  const params = new URLSearchParams({ user_id, session_id })
+  // compact: meta trimmed to what FeedCard renders
+  const params = new URLSearchParams({ user_id, session_id, compact: "true" })
   if (cursor) params.append("cursor", cursor)
   return fetchAPI<FeedCard[]>(`/feed?${params.toString()}`)
 }
@@ -90,14 +96,34 @@ export async function branchSession(
 
 /* ===== playlists ===== */
 
-// list playlists for a user
+// list playlists for a user; the backend pages them (100 per page, next page
+// cursor in the X-Next-Cursor header), so keep following it
 export async function getPlaylists(user_id: string): Promise<Playlist[]> {
-  return fetchAPI<Playlist[]>(`/playlists?user_id=${user_id}`)
-}
-
-// get ONE playlist (with tracks)
+  const all: Playlist[] = []
+  let cursor: string | null = null
+  do {
+    const params = new URLSearchParams({ user_id })
+    if (cursor) params.append("cursor", cursor)
+    const res = await requestAPI(`/playlists?${params.toString()}`)
+    all.push(...((await res.json()) as Playlist[]))
+    cursor = res.headers.get("X-Next-Cursor")
+  } while (cursor)
+  return all
+}
+
+// get ONE playlist (with all its tracks); long playlists come back in pages
+// linked by next_cursor
 export async function getPlaylist(playlist_id: string): Promise<Playlist & { tracks: any[] }> {
-  return fetchAPI<Playlist & { tracks: any[] }>(`/playlists/${playlist_id}`)
+  type Page = Playlist & { tracks: any[]; next_cursor?: string | null }
+  const first = await fetchAPI<Page>(`/playlists/${playlist_id}`)
+  const tracks = [...(first.tracks || [])]
+  let cursor = first.next_cursor
+  while (cursor) {
+    const page = await fetchAPI<Page>(`/playlists/${playlist_id}?cursor=${encodeURIComponent(cursor)}`)
+    tracks.push(...(page.tracks || []))
+    cursor = page.next_cursor
+  }
+  return { ...first, tracks, next_cursor: null } as Playlist & { tracks: any[] }
 }
 
 // create playlist (backend gives id/name/kind)
@@ -150,9 +176,34 @@ export async function addTrackToPlaylist(opts: {
   return { ok: true }
 }
 
+// add many tracks at once (e.g. save the whole feed) in one request
+export async function addTracksToPlaylist(
+  playlist_id: string,
+  tracks: {
+    provider: string
+    provider_track_id: string
+    title?: string
+    artist?: string
+    artwork_url?: string
+  }[]
+): Promise<{ ok: boolean; added: number; skipped: number }> {
+  return fetchAPI(`/playlists/${playlist_id}/tracks/bulk`, {
+    method: "POST",
+    body: JSON.stringify({
+      tracks: tracks.map((t) => ({
+        ...t,
+        // same plain track_id derivation as addTrackToPlaylist
+        track_id: t.provider_track_id.includes(":")
+          ? t.provider_track_id.split(":").pop()!
+          : t.provider_track_id,
+      })),
+    }),
+  })
+}
+
 /* this is the name your page is calling */
 export async function getPlaylistWithTracks(id: string): Promise<Playlist & { tracks: any[] }> {
-  return fetchAPI<Playlist & { tracks: any[] }>(`/playlists/${id}`)
+  return getPlaylist(id)
 }
 
 /* delete track from playlist (only if backend route exists) */